@@ -6,18 +6,18 @@ Handles: OCR, PHI detection, and translation for Mexican medical records
 
 import os
 import re
+import sys
 import time
 import json
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from datetime import datetime
 from enum import Enum
 
 # OCR imports
 from PIL import Image
-import pytesseract
-from pdf2image import convert_from_path
 
 # Load environment
 env_file = Path('.env')
@@ -29,32 +29,249 @@ if env_file.exists():
                     key, value = line.strip().split('=', 1)
                     os.environ[key] = value.strip('"').strip("'")
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from ocr.cache import OCRCache
+from ocr.rasterize import page_windows, render_page, render_pages
+from ocr.page_analyzer import ANALYZER_VERSION, BLANK, HANDWRITTEN, SPARSE, analyze_page
+from ocr.tesseract import TesseractOCREngine, default_engine
+from pdf.page_classifier import classify_pages, extract_page_texts
+from mt.batching import MARKER_PATTERN, translate_batched
+from mt.dedup import SegmentDeduplicator, split_paragraphs
+from mt.scheduler import AsyncChunkScheduler, rate_limit_delay
+from mt.segment_cache import SegmentCache, prompt_version
 
 # Import our PHI detector
-from phi_detector_enhanced import SpanishMedicalPHIDetector, PHIType
+from phi_detector_enhanced import SpanishMedicalPHIDetector, StreamingPHIDetector, PHIType
+
+TRANSLATION_MODEL = "gpt-3.5-turbo"
+TRANSLATION_SYSTEM_PROMPT = """You are a medical translator specializing in Mexican Spanish to English.
+                        Translate accurately, preserving all placeholders like [NAME_0], [DATE_1], etc.
+                        Maintain document structure, medical terminology, and numerical values."""
+TRANSLATION_USER_PROMPT = "Translate to English, keeping all [PLACEHOLDER_N] markers:\n\n{chunk}"
+# For several paragraphs packed into one request
+TRANSLATION_BATCH_PROMPT = ("Translate to English, keeping all [PLACEHOLDER_N] markers. Keep every [#N] "
+                            "paragraph marker on its own line:\n\n{chunk}")
 
 class PageType(Enum):
     """Types of pages in medical documents"""
     DIGITAL = "born_digital"      # Text extractable PDF
     SCANNED = "scanned"           # Needs OCR
     HANDWRITTEN = "handwritten"   # Skip for now
+    BLANK = "blank"               # No content (separator sheets)
+    NEAR_BLANK = "near_blank"     # A few marks Tesseract cannot read
     MIXED = "mixed"               # Has both typed and handwritten
 
+def classify_page_image(image: Image.Image, lang: str = 'spa',
+                        engine: Optional[TesseractOCREngine] = None) -> PageType:
+    """
+    Detect the type of page content
+    Uses OCR confidence and text patterns
+    """
+    engine = engine or default_engine(lang)
+    try:
+        # Get OCR data with confidence scores
+        ocr_data = engine.image_to_data(image, config='')
+        
+        return classify_ocr_data(ocr_data)
+            
+    except Exception as e:
+        print(f"  Error detecting page type: {e}")
+        return PageType.SCANNED
+
+
+def classify_ocr_data(ocr_data: Dict) -> PageType:
+    """Page type from the word confidences of image_to_data output"""
+    # Calculate average confidence for non-empty text
+    confidences = [
+        float(conf) for conf, text in zip(ocr_data['conf'], ocr_data['text'])
+        if text.strip() and float(conf) > 0
+    ]
+    
+    if not confidences:
+        return PageType.HANDWRITTEN
+    
+    avg_confidence = sum(confidences) / len(confidences)
+    
+    # Decision logic
+    if avg_confidence > 85:
+        # High confidence = likely digital or good scan
+        return PageType.DIGITAL
+    elif avg_confidence > 60:
+        # Medium confidence = scanned document
+        return PageType.SCANNED
+    elif avg_confidence > 30:
+        # Low confidence = mixed or poor quality
+        return PageType.MIXED
+    else:
+        # Very low confidence = likely handwritten
+        return PageType.HANDWRITTEN
+
+
+def text_from_ocr_data(ocr_data: Dict) -> str:
+    """
+    Rebuild page text from image_to_data output
+    Words are joined per line, lines per paragraph, and paragraphs are
+    separated by a blank line, as in image_to_string output
+    """
+    paragraphs = []
+    current_paragraph = None
+    current_line = None
+    
+    for i, word in enumerate(ocr_data['text']):
+        if ocr_data['level'][i] != 5 or not word.strip():
+            continue
+        paragraph_key = (ocr_data['block_num'][i], ocr_data['par_num'][i])
+        line_key = paragraph_key + (ocr_data['line_num'][i],)
+        
+        if paragraph_key != current_paragraph:
+            paragraphs.append([])
+            current_paragraph = paragraph_key
+            current_line = None
+        if line_key != current_line:
+            paragraphs[-1].append([])
+            current_line = line_key
+        paragraphs[-1][-1].append(word)
+    
+    return '\n\n'.join(
+        '\n'.join(' '.join(words) for words in lines) for lines in paragraphs
+    ) + ('\n' if paragraphs else '')
+
+
+def ocr_page_single_pass(image: Image.Image, lang: str = 'spa',
+                         engine: Optional[TesseractOCREngine] = None) -> Tuple[PageType, Optional[str], Optional[str]]:
+    """
+    Classify and OCR a page with one Tesseract call
+    The page type comes from the word confidences and the text is rebuilt
+    from the same word/line output
+    Returns: (page_type, page_text, error)
+    """
+    engine = engine or default_engine(lang)
+    try:
+        ocr_data = engine.image_to_data(image, config='--psm 6')  # Uniform block of text
+    except Exception as e:
+        return PageType.SCANNED, None, str(e)
+    
+    page_type = classify_ocr_data(ocr_data)
+    if page_type == PageType.HANDWRITTEN:
+        return page_type, None, None
+    return page_type, text_from_ocr_data(ocr_data), None
+
+
+def ocr_page_image(image: Image.Image, lang: str = 'spa', single_pass: bool = True,
+                   engine: Optional[TesseractOCREngine] = None,
+                   prefilter: bool = True) -> Tuple[PageType, Optional[str], Optional[str]]:
+    """
+    Classify one page image and OCR it unless it is handwritten or blank
+    With prefilter, an ink-density analysis of a downscaled copy settles
+    blank and handwritten pages without calling Tesseract at all. Sparse
+    pages (a few words, a signature) are still OCR'd; if Tesseract reads
+    nothing on them they come back as NEAR_BLANK for manual review
+    Runs on `engine`, or on this process's default engine
+    Returns: (page_type, page_text, error); page_text is None when skipped or failed
+    """
+    verdict = analyze_page(image).verdict if prefilter else None
+    if verdict == BLANK:
+        return PageType.BLANK, None, None
+    if verdict == HANDWRITTEN:
+        return PageType.HANDWRITTEN, None, None
+    
+    engine = engine or default_engine(lang)
+    if single_pass:
+        page_type, page_text, error = ocr_page_single_pass(image, lang, engine)
+    else:
+        page_type = classify_page_image(image, lang, engine)
+        page_text = error = None
+        if page_type != PageType.HANDWRITTEN:
+            try:
+                page_text = engine.image_to_string(image, config='--psm 6')  # Uniform block of text
+            except Exception as e:
+                error = str(e)
+    
+    if verdict == SPARSE and error is None and not (page_text or '').strip():
+        return PageType.NEAR_BLANK, None, None
+    return page_type, page_text, error
+
+
+def _init_ocr_worker(threads: int):
+    """Process pool initializer: cap Tesseract's OpenMP threads per worker"""
+    os.environ['OMP_THREAD_LIMIT'] = str(threads)
+
+
+def _ocr_pdf_page(task: Tuple[str, int, int, bool, str, bool, bool]) -> Tuple[PageType, Optional[str], Optional[str]]:
+    """Process pool task: rasterize a single page and OCR it with the worker's engine"""
+    pdf_path, page_num, dpi, grayscale, lang, single_pass, prefilter = task
+    try:
+        image = render_page(pdf_path, page_num, dpi, grayscale)
+    except Exception as e:
+        return PageType.SCANNED, None, f"rasterization failed: {e}"
+    return ocr_page_image(image, lang, single_pass, prefilter=prefilter)
+
+
 class MedicalDocumentProcessor:
     """
     Complete pipeline for processing Mexican medical documents
     """
     
-    def __init__(self):
+    def __init__(self, ocr_workers: int = 1, ocr_threads_per_worker: int = 1,
+                 single_pass_ocr: bool = True, ocr_grayscale: bool = True,
+                 raster_window: int = 1, ocr_cache: Optional[OCRCache] = None,
+                 use_ocr_cache: bool = False, force_ocr: bool = False,
+                 translation_concurrency: int = 4, requests_per_minute: int = 3500,
+                 tokens_per_minute: int = 160000,
+                 translation_cache: Optional[SegmentCache] = None,
+                 use_translation_cache: bool = False):
+        """
+        Args:
+            ocr_workers: Worker processes for page-parallel OCR (1 = sequential)
+            ocr_threads_per_worker: Tesseract threads per worker (OMP_THREAD_LIMIT),
+                                    keeps workers x threads within the core count
+            single_pass_ocr: Classify and OCR each page with one image_to_data
+                             call; False runs classification and image_to_string
+                             as separate Tesseract passes
+            ocr_grayscale: Render pages as 8-bit grayscale instead of RGB
+            raster_window: Pages rendered at a time in sequential OCR; peak
+                           memory is bounded by this, not by the page count
+            ocr_cache: OCR result cache (default: OCRCache() when use_ocr_cache)
+            use_ocr_cache: Reuse OCR results of unchanged pages across runs
+                           (stores page text on disk; see ENFERMERA_OCR_CACHE_KEY)
+            force_ocr: Send every page to Tesseract, skipping the ink-density
+                       prefilter that skips blank and handwritten pages
+            translation_concurrency: Translation requests in flight at once
+            requests_per_minute: OpenAI request budget for this process
+            tokens_per_minute: OpenAI token budget for this process
+            translation_cache: Segment cache (default: the shared on-disk cache
+                               when use_translation_cache)
+            use_translation_cache: Reuse translated paragraphs across runs and backends
+                                   (stores translations unencrypted on disk)
+        """
         # Initialize components
         self.phi_detector = SpanishMedicalPHIDetector()
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        # The scheduler owns retries and 429 backoff, so the SDK must not retry
+        self.openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+        if translation_cache is None and use_translation_cache:
+            translation_cache = SegmentCache.shared()
+        self.translation_cache = translation_cache
+        self.translation_scheduler = AsyncChunkScheduler(
+            max_concurrency=translation_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute
+        )
         
         # Configuration
         self.chunk_size = 20  # Lines per translation chunk
         self.max_tokens = 2000  # Safe limit for GPT-3.5
         self.ocr_lang = 'spa'  # Spanish OCR
+        self.ocr_dpi = 200
+        self.ocr_workers = max(1, ocr_workers)
+        self.ocr_threads_per_worker = max(1, ocr_threads_per_worker)
+        self.single_pass_ocr = single_pass_ocr
+        self.ocr_grayscale = ocr_grayscale
+        self.raster_window = max(1, raster_window)
+        self.ocr_cache = ocr_cache or (OCRCache() if use_ocr_cache else None)
+        self._ocr_engine = None
+        self.ink_prefilter = not force_ocr
         
         # Tracking
         self.audit_log = []
@@ -62,141 +279,370 @@ class MedicalDocumentProcessor:
         
         print("✓ Medical Document Processor initialized")
         print("  • PHI detection: Enabled")
-        print("  • OCR support: Enabled (Tesseract)")
-        print("  • Translation: OpenAI GPT-3.5")
+        print(f"  • OCR support: Enabled (Tesseract, {self.ocr_workers} worker(s))")
+        print(f"  • Translation: OpenAI GPT-3.5 ({translation_concurrency} concurrent requests)")
+    
+    def close(self):
+        """Stop the OCR workers and the translation event loop"""
+        if self._ocr_engine is not None:
+            self._ocr_engine.close()
+            self._ocr_engine = None
+        self.translation_scheduler.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
     
     def detect_page_type(self, image: Image.Image) -> PageType:
         """
         Detect the type of page content
         Uses OCR confidence and text patterns
         """
-        try:
-            # Get OCR data with confidence scores
-            ocr_data = pytesseract.image_to_data(
-                image, 
+        return classify_page_image(image, self.ocr_lang, self.ocr_engine)
+    
+    @property
+    def ocr_engine(self) -> TesseractOCREngine:
+        """Persistent OCR worker for sequential OCR, started on first use"""
+        if self._ocr_engine is None:
+            self._ocr_engine = TesseractOCREngine(
                 lang=self.ocr_lang,
-                output_type=pytesseract.Output.DICT
+                config='',
+                workers=1
             )
-            
-            # Calculate average confidence for non-empty text
-            confidences = [
-                conf for conf, text in zip(ocr_data['conf'], ocr_data['text'])
-                if text.strip() and conf > 0
-            ]
-            
-            if not confidences:
-                return PageType.HANDWRITTEN
-            
-            avg_confidence = sum(confidences) / len(confidences)
-            
-            # Decision logic
-            if avg_confidence > 85:
-                # High confidence = likely digital or good scan
-                return PageType.DIGITAL
-            elif avg_confidence > 60:
-                # Medium confidence = scanned document
-                return PageType.SCANNED
-            elif avg_confidence > 30:
-                # Low confidence = mixed or poor quality
-                return PageType.MIXED
-            else:
-                # Very low confidence = likely handwritten
-                return PageType.HANDWRITTEN
-                
-        except Exception as e:
-            print(f"  Error detecting page type: {e}")
-            return PageType.SCANNED
+        return self._ocr_engine
     
     def extract_text_from_pdf(self, pdf_path: str) -> Tuple[str, Dict]:
         """
         Extract text from PDF, using OCR when needed
         Returns: (extracted_text, metadata)
         """
-        print(f"\n📄 Processing PDF: {pdf_path}")
+        metadata = self._new_extraction_metadata()
         
-        extracted_text = []
-        metadata = {
+        try:
+            extracted_text = list(self.iter_pdf_pages(pdf_path, metadata))
+        except Exception as e:
+            print(f"  ❌ Error processing PDF: {e}")
+            return "", metadata
+        
+        # Combine all extracted text
+        final_text = '\n'.join(extracted_text)
+        
+        self._print_extraction_summary(metadata)
+        print(f"    • Total text extracted: {len(final_text)} characters")
+        
+        return final_text, metadata
+    
+    def _new_extraction_metadata(self) -> Dict:
+        return {
             'total_pages': 0,
             'digital_pages': 0,
             'scanned_pages': 0,
             'handwritten_pages': 0,
+            'blank_pages': 0,
+            'near_blank_pages': 0,
             'ocr_applied': False,
             'processing_time': 0
         }
-        
+    
+    def _print_extraction_summary(self, metadata: Dict):
+        print(f"\n  Summary:")
+        print(f"    • Total pages: {metadata.get('total_pages', 'N/A')}")
+        print(f"    • Digital pages: {metadata['digital_pages']}")
+        print(f"    • Scanned pages: {metadata['scanned_pages']}")
+        print(f"    • Handwritten pages: {metadata['handwritten_pages']}")
+        print(f"    • Blank pages: {metadata['blank_pages']}")
+        print(f"    • Near-blank pages: {metadata['near_blank_pages']}")
+        print(f"    • Processing time: {metadata['processing_time']:.1f}s")
+    
+    def iter_pdf_pages(self, pdf_path: str, metadata: Dict) -> Iterator[str]:
+        """
+        Extract text from PDF page by page, using OCR when needed
+        Yields page text as soon as it is available and fills in metadata
+        """
+        print(f"\n📄 Processing PDF: {pdf_path}")
         start_time = time.time()
         
-        # First try direct text extraction
+        # Decide per page whether the text layer is usable or OCR is needed
+        layers = classify_pages(pdf_path)
+        metadata['total_pages'] = len(layers)
+        metadata['page_routing'] = [layer.to_dict() for layer in layers]
+        ocr_pages = [layer.page_num for layer in layers if layer.needs_ocr]
+        text_pages = []
+        if len(ocr_pages) < len(layers):
+            text_pages = self._extract_text_layer(pdf_path, len(layers))
+        
+        if not ocr_pages:
+            # Fully digital document
+            metadata['digital_pages'] = len(layers)
+            print(f"  ✓ Extracted text from {metadata['digital_pages']} digital pages")
+            yield '\f'.join(text_pages)
+            metadata['processing_time'] = time.time() - start_time
+            return
+        
+        print(f"  ℹ {len(ocr_pages)}/{len(layers)} pages have no usable text layer, using OCR...")
+        metadata['ocr_applied'] = True
+        metadata['ink_prefilter'] = self.ink_prefilter
+        metadata['ocr_pages'] = len(ocr_pages)
+        
+        # Pages OCR'd on a previous run with the same settings
+        cached = self._load_cached_ocr(pdf_path, ocr_pages)
+        metadata['ocr_cache_hits'] = len(cached)
+        pending = [page_num for page_num in ocr_pages if page_num not in cached]
+        
+        if not pending:
+            results = iter(())
+        elif self.ocr_workers > 1:
+            # Page-parallel OCR; results come back in page order
+            results = self._ocr_pages_parallel(pdf_path, metadata, pending)
+        else:
+            # Render a small window of pages at a time, OCR and release them
+            results = self._ocr_pages_sequential(pdf_path, pending)
+        
+        for layer in layers:
+            i = layer.page_num - 1
+            print(f"  Processing page {i+1}/{metadata['total_pages']}...")
+            
+            if not layer.needs_ocr:
+                metadata['digital_pages'] += 1
+                print(f"    ✓ Page {i+1}: text layer, {layer.char_count} chars")
+                yield text_pages[i]
+                continue
+            
+            if layer.page_num in cached:
+                page_type, page_text, error = cached[layer.page_num]
+            else:
+                page_type, page_text, error = next(results)
+                if error is None:
+                    self._store_cached_ocr(pdf_path, layer.page_num, page_type, page_text)
+            metadata['page_routing'][i]['page_type'] = page_type.value
+            
+            if page_type == PageType.BLANK:
+                metadata['blank_pages'] += 1
+                print(f"    ○ Page {i+1}: Blank, skipping")
+                yield ""
+            elif page_type == PageType.HANDWRITTEN:
+                metadata['handwritten_pages'] += 1
+                print(f"    ⚠️ Page {i+1}: Handwritten, skipping")
+                yield f"\n[PAGE {i+1}: HANDWRITTEN - MANUAL REVIEW REQUIRED]\n"
+            elif page_type == PageType.NEAR_BLANK:
+                metadata['near_blank_pages'] += 1
+                print(f"    ⚠️ Page {i+1}: Near-blank, no readable text")
+                yield f"\n[PAGE {i+1}: NEAR-BLANK - MANUAL REVIEW REQUIRED]\n"
+            else:
+                # Apply OCR
+                if page_type == PageType.SCANNED:
+                    metadata['scanned_pages'] += 1
+                else:
+                    metadata['digital_pages'] += 1
+                
+                if error is None:
+                    print(f"    ✓ Page {i+1}: {page_type.value}, {len(page_text)} chars")
+                else:
+                    print(f"    ❌ Page {i+1}: OCR failed - {error}")
+                    page_text = f"\n[PAGE {i+1}: OCR FAILED]\n"
+                yield page_text
+        
+        metadata['processing_time'] = time.time() - start_time
+    
+    def _ocr_cache_key(self, pdf_path: str, page_num: int) -> str:
+        """Cache key covering every setting that changes a page's OCR output"""
+        return self.ocr_cache.key_for_pdf_page(
+            pdf_path, page_num,
+            dpi=self.ocr_dpi,
+            grayscale=self.ocr_grayscale,
+            lang=self.ocr_lang,
+            config='--psm 6' if self.single_pass_ocr else '',
+            single_pass=self.single_pass_ocr,
+            prefilter=self.ink_prefilter and ANALYZER_VERSION
+        )
+    
+    def _load_cached_ocr(self, pdf_path: str,
+                         pages: List[int]) -> Dict[int, Tuple[PageType, Optional[str], None]]:
+        """Cached (page_type, text, error) results for the given pages"""
+        if self.ocr_cache is None:
+            return {}
+        
+        cached = {}
+        for page_num in pages:
+            entry = self.ocr_cache.get_json(self._ocr_cache_key(pdf_path, page_num))
+            if entry is not None:
+                cached[page_num] = (PageType(entry['page_type']), entry['text'], None)
+        return cached
+    
+    def _store_cached_ocr(self, pdf_path: str, page_num: int,
+                          page_type: PageType, page_text: Optional[str]):
+        if self.ocr_cache is None:
+            return
+        try:
+            self.ocr_cache.put_json(self._ocr_cache_key(pdf_path, page_num),
+                                    {'page_type': page_type.value, 'text': page_text})
+        except OSError as e:
+            print(f"    ⚠️ Could not cache OCR result for page {page_num}: {e}")
+    
+    def _extract_text_layer(self, pdf_path: str, page_count: int) -> List[str]:
+        """
+        Text layer of every page, in one pdftotext run
+        pdftotext ends each page with a form feed, so the output splits into
+        pages; falls back to PyMuPDF if pdftotext is unavailable or fails
+        """
+        import subprocess
         try:
-            import subprocess
             result = subprocess.run(
                 ['pdftotext', pdf_path, '-'],
                 capture_output=True,
                 text=True,
                 timeout=30
             )
+        except (OSError, subprocess.TimeoutExpired):
+            result = None
+        
+        if result is not None and result.returncode == 0:
+            pages = result.stdout.split('\f')
+        else:
+            pages = extract_page_texts(pdf_path)
+        if len(pages) < page_count:
+            pages.extend([''] * (page_count - len(pages)))
+        return pages
+    
+    def _ocr_pages_sequential(self, pdf_path: str,
+                              pages: List[int]) -> Iterator[Tuple[PageType, Optional[str], Optional[str]]]:
+        """
+        OCR the given pages (1-based) in this process, rendering raster_window pages at a time
+        A page that cannot be rasterized is reported as an OCR failure, as in _ocr_pdf_page
+        """
+        for first, last in page_windows(pages, self.raster_window):
+            try:
+                images = render_pages(pdf_path, first, last, self.ocr_dpi, self.ocr_grayscale)
+            except Exception as e:
+                if first == last:
+                    yield PageType.SCANNED, None, f"rasterization failed: {e}"
+                    continue
+                # Render the window page by page so one bad page does not fail the rest
+                images = [None] * (last - first + 1)
+            
+            for offset in range(last - first + 1):
+                image = None
+                if offset < len(images):
+                    image, images[offset] = images[offset], None  # Release with our reference
+                if image is None:
+                    try:
+                        image = render_page(pdf_path, first + offset, self.ocr_dpi, self.ocr_grayscale)
+                    except Exception as e:
+                        yield PageType.SCANNED, None, f"rasterization failed: {e}"
+                        continue
+                yield ocr_page_image(image, self.ocr_lang, self.single_pass_ocr,
+                                     self.ocr_engine, self.ink_prefilter)
+                del image
+    
+    def _ocr_pages_parallel(self, pdf_path: str, metadata: Dict,
+                            pages: List[int]) -> Iterator[Tuple[PageType, Optional[str], Optional[str]]]:
+        """
+        OCR the given pages (1-based) in a process pool
+        Each worker rasterizes its own page, so only in-flight pages are held in memory
+        """
+        metadata['ocr_workers'] = self.ocr_workers
+        
+        tasks = [(pdf_path, page_num, self.ocr_dpi, self.ocr_grayscale,
+                  self.ocr_lang, self.single_pass_ocr, self.ink_prefilter)
+                 for page_num in pages]
+        
+        with ProcessPoolExecutor(
+            max_workers=min(self.ocr_workers, max(1, len(pages))),
+            initializer=_init_ocr_worker,
+            initargs=(self.ocr_threads_per_worker,)
+        ) as pool:
+            yield from pool.map(_ocr_pdf_page, tasks)
+    
+    async def _translate_chunk(self, chunk_text: str) -> Tuple[str, bool]:
+        """
+        Translate one sanitized chunk
+        Returns: (translated_text, api_called); rate-limit errors are
+        raised for the scheduler to back off and retry
+        """
+        prompt = TRANSLATION_BATCH_PROMPT if MARKER_PATTERN.search(chunk_text) else TRANSLATION_USER_PROMPT
+        try:
+            response = await self.openai_client.chat.completions.create(
+                model=TRANSLATION_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": TRANSLATION_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt.format(chunk=chunk_text)
+                    }
+                ],
+                temperature=0.1,
+                max_tokens=self.max_tokens
+            )
+            
+            return response.choices[0].message.content, True
             
-            if result.returncode == 0 and len(result.stdout.strip()) > 100:
-                # Successful text extraction
-                extracted_text.append(result.stdout)
-                metadata['digital_pages'] = len(result.stdout.split('\f'))  # Form feeds = pages
-                print(f"  ✓ Extracted text from {metadata['digital_pages']} digital pages")
-            else:
-                # Need OCR
-                print("  ℹ Text extraction failed, using OCR...")
-                metadata['ocr_applied'] = True
-                
-                # Convert PDF to images
-                images = convert_from_path(pdf_path, dpi=200)
-                metadata['total_pages'] = len(images)
-                
-                for i, image in enumerate(images):
-                    print(f"  Processing page {i+1}/{len(images)}...")
-                    
-                    # Detect page type
-                    page_type = self.detect_page_type(image)
-                    
-                    if page_type == PageType.HANDWRITTEN:
-                        metadata['handwritten_pages'] += 1
-                        print(f"    ⚠️ Page {i+1}: Handwritten, skipping")
-                        extracted_text.append(f"\n[PAGE {i+1}: HANDWRITTEN - MANUAL REVIEW REQUIRED]\n")
-                    else:
-                        # Apply OCR
-                        if page_type == PageType.SCANNED:
-                            metadata['scanned_pages'] += 1
-                        else:
-                            metadata['digital_pages'] += 1
-                        
-                        try:
-                            page_text = pytesseract.image_to_string(
-                                image,
-                                lang=self.ocr_lang,
-                                config='--psm 6'  # Uniform block of text
-                            )
-                            extracted_text.append(page_text)
-                            print(f"    ✓ Page {i+1}: {page_type.value}, {len(page_text)} chars")
-                        except Exception as e:
-                            print(f"    ❌ Page {i+1}: OCR failed - {e}")
-                            extracted_text.append(f"\n[PAGE {i+1}: OCR FAILED]\n")
-                            
         except Exception as e:
-            print(f"  ❌ Error processing PDF: {e}")
-            return "", metadata
-        
-        metadata['processing_time'] = time.time() - start_time
-        
-        # Combine all extracted text
-        final_text = '\n'.join(extracted_text)
-        
-        print(f"\n  Summary:")
-        print(f"    • Total pages: {metadata.get('total_pages', 'N/A')}")
-        print(f"    • Digital pages: {metadata['digital_pages']}")
-        print(f"    • Scanned pages: {metadata['scanned_pages']}")
-        print(f"    • Handwritten pages: {metadata['handwritten_pages']}")
-        print(f"    • Processing time: {metadata['processing_time']:.1f}s")
-        print(f"    • Total text extracted: {len(final_text)} characters")
-        
-        return final_text, metadata
+            if rate_limit_delay(e) is not None:
+                raise
+            print(f"  ⚠️ Translation error: {e}")
+            return chunk_text, False  # Keep original if translation fails
+    
+    def _translate_paragraphs(self, lines: List[str], dedup: SegmentDeduplicator,
+                              metadata: Dict) -> str:
+        """
+        Translate sanitized lines, each distinct paragraph once per document
+        Paragraphs are runs of non-blank lines cut every chunk_size lines, so
+        prose keeps its sentence context as in plain chunks, while repeated
+        headers, footers and form blocks reuse the first translation. New
+        paragraphs are packed into requests, sent concurrently, with markers
+        only between paragraphs; blank lines are kept as they are
+        """
+        def translate_many(chunks):
+            # Chunks run concurrently; None marks a chunk that failed or was
+            # still rate limited after all retries
+            results = self.translation_scheduler.map(chunks, self._translate_chunk,
+                                                     fallback=lambda chunk: (chunk, False))
+            metadata['api_calls'] += sum(api_called for _, api_called in results)
+            return [translated if api_called else None for translated, api_called in results]
+        
+        def translate_new(first):
+            segments = [paragraphs[i] for i in first]
+            translated = [self._cached_translation(segment) for segment in segments]
+            missing = [i for i, text in enumerate(translated) if text is None]
+            metadata['translation_cache_hits'] = (metadata.get('translation_cache_hits', 0)
+                                                  + len(segments) - len(missing))
+            if missing:
+                print(f"  Translating {len(missing)} new of {len(paragraphs)} paragraphs...")
+                results = translate_batched([segments[i] for i in missing], None,
+                                            translate_many=translate_many)
+                for i, text in zip(missing, results):
+                    if text is None:  # Failed: keep the original, do not cache it
+                        translated[i] = segments[i]
+                    else:
+                        translated[i] = text
+                        self._store_translation(segments[i], text)
+            return translated
+        
+        paragraphs = split_paragraphs(lines, self.chunk_size)
+        translated = dedup.translate(paragraphs, translate_new)
+        metadata['segments_total'] = dedup.stats['segments_total']
+        metadata['segments_unique'] = dedup.stats['segments_unique']
+        return '\n'.join(translated)
+    
+    def _translation_cache_version(self) -> str:
+        return prompt_version(TRANSLATION_SYSTEM_PROMPT, TRANSLATION_USER_PROMPT,
+                              TRANSLATION_BATCH_PROMPT, 0.1, self.max_tokens)
+    
+    def _cached_translation(self, segment: str) -> Optional[str]:
+        if self.translation_cache is None:
+            return None
+        return self.translation_cache.get(segment, 'openai', TRANSLATION_MODEL,
+                                          self._translation_cache_version())
+    
+    def _store_translation(self, segment: str, translation: str):
+        if self.translation_cache is not None:
+            self.translation_cache.put(segment, translation, 'openai', TRANSLATION_MODEL,
+                                       self._translation_cache_version())
     
     def translate_with_phi_protection(self, text: str) -> Tuple[str, Dict]:
         """
@@ -205,9 +651,10 @@ class MedicalDocumentProcessor:
         """
         print("\n🔒 Applying PHI protection...")
         
-        # Detect and remove PHI
-        phi_matches = self.phi_detector.detect_phi(text)
-        sanitized_text, phi_map = self.phi_detector.sanitize_text(text)
+        # Detect once, then remove PHI from the same detection result
+        detection = self.phi_detector.detect(text)
+        phi_matches = detection.matches
+        sanitized_text, phi_map = self.phi_detector.sanitize_text(detection)
         
         print(f"  • Found {len(phi_matches)} PHI items")
         print(f"  • Types: {', '.join(set(m.phi_type.value for m in phi_matches))}")
@@ -218,49 +665,11 @@ class MedicalDocumentProcessor:
         # Translate sanitized text
         print("\n🌐 Translating sanitized text...")
         lines = sanitized_text.split('\n')
-        translated_parts = []
-        api_calls = 0
-        
-        for i in range(0, len(lines), self.chunk_size):
-            chunk = lines[i:i+self.chunk_size]
-            chunk_text = '\n'.join(chunk)
-            
-            if not chunk_text.strip():
-                translated_parts.append(chunk_text)
-                continue
-            
-            progress = min(100, (i + self.chunk_size) * 100 // len(lines))
-            print(f"  Progress: {progress}% ({i}/{len(lines)} lines)")
-            
-            try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": """You are a medical translator specializing in Mexican Spanish to English.
-                            Translate accurately, preserving all placeholders like [NAME_0], [DATE_1], etc.
-                            Maintain document structure, medical terminology, and numerical values."""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Translate to English, keeping all [PLACEHOLDER_N] markers:\n\n{chunk_text}"
-                        }
-                    ],
-                    temperature=0.1,
-                    max_tokens=self.max_tokens
-                )
-                
-                translated_parts.append(response.choices[0].message.content)
-                api_calls += 1
-                time.sleep(0.5)  # Rate limiting
-                
-            except Exception as e:
-                print(f"  ⚠️ Translation error: {e}")
-                translated_parts.append(chunk_text)  # Keep original if translation fails
+        counters = {'api_calls': 0}
         
-        # Combine translated parts
-        translated_sanitized = '\n'.join(translated_parts)
+        # Repeated headers, footers and form blocks are translated once
+        translated_sanitized = self._translate_paragraphs(lines, SegmentDeduplicator(), counters)
+        print(f"  • Unique paragraphs: {counters['segments_unique']}/{counters['segments_total']}")
         
         # Restore PHI
         print("\n🔓 Restoring PHI to translated text...")
@@ -268,15 +677,78 @@ class MedicalDocumentProcessor:
         
         metadata = {
             'phi_items_protected': len(phi_matches),
-            'api_calls': api_calls,
-            'lines_processed': len(lines)
+            'api_calls': counters['api_calls'],
+            'lines_processed': len(lines),
+            'segments_total': counters['segments_total'],
+            'segments_unique': counters['segments_unique'],
+            'translation_cache_hits': counters.get('translation_cache_hits', 0)
         }
         
         return translated_final, metadata
     
-    def process_document(self, input_path: str, output_dir: str = None) -> Dict:
+    def iter_translate_with_phi_protection(self, pages: Iterable[str],
+                                           metadata: Dict) -> Iterator[str]:
+        """
+        Streaming version of translate_with_phi_protection
+        
+        Pages are joined with newlines (as in extract_text_from_pdf), PHI is
+        removed chunk by chunk as pages arrive, and translated text is
+        yielded every chunk_size lines. Fills metadata with the same keys.
+        """
+        print("\n🔒 Applying streaming PHI protection...")
+        metadata.update({'phi_items_protected': 0, 'api_calls': 0, 'lines_processed': 0,
+                         'segments_total': 0, 'segments_unique': 0, 'translation_cache_hits': 0})
+        dedup = SegmentDeduplicator()  # Shared by all chunks of the document
+        
+        def joined(pages):
+            for i, page in enumerate(pages):
+                if i:
+                    yield '\n'
+                yield page
+        
+        def translate(chunk_lines, phi_map):
+            chunk_text = '\n'.join(chunk_lines)
+            metadata['lines_processed'] += len(chunk_lines)
+            if not chunk_text.strip():
+                return chunk_text
+            print(f"  Lines {metadata['lines_processed'] - len(chunk_lines)}"
+                  f"-{metadata['lines_processed']}:")
+            translated = self._translate_paragraphs(chunk_lines, dedup, metadata)
+            return self.phi_detector.restore_phi(translated, phi_map)
+        
+        streaming = StreamingPHIDetector(self.phi_detector)
+        phi_map = {}
+        pending = []   # Complete sanitized lines awaiting translation
+        partial = ''   # Trailing line that is not finished yet
+        
+        for chunk in streaming.sanitize_stream(joined(pages)):
+            phi_map.update(chunk.phi_map)
+            metadata['phi_items_protected'] += len(chunk.phi_map)
+            self._log_phi_handling(chunk.source_text, list(chunk.phi_map.values()),
+                                   'translation_stream')
+            
+            lines = (partial + chunk.text).split('\n')
+            partial = lines.pop()
+            pending.extend(lines)
+            
+            while len(pending) >= self.chunk_size:
+                batch = pending[:self.chunk_size]
+                del pending[:self.chunk_size]
+                yield translate(batch, phi_map) + '\n'
+        
+        yield translate(pending + [partial], phi_map)
+
+    
+    def process_document(self, input_path: str, output_dir: str = None,
+                         stream: bool = False) -> Dict:
         """
         Complete processing pipeline for medical documents
+        
+        Args:
+            input_path: PDF or text file
+            output_dir: Output directory (default: medical_records/processed)
+            stream: For PDFs, detect PHI and translate page by page while
+                    extraction is still running, writing output as it goes
         """
         print("\n" + "="*70)
         print(f"MEDICAL DOCUMENT PROCESSING - PRODUCTION")
@@ -301,7 +773,20 @@ class MedicalDocumentProcessor:
         output_path = output_dir / output_name
         
         # Process based on file type
-        if input_path.suffix.lower() == '.pdf':
+        if stream and input_path.suffix.lower() == '.pdf':
+            extraction_metadata = self._new_extraction_metadata()
+            translation_metadata = {}
+            pages = self.iter_pdf_pages(str(input_path), extraction_metadata)
+            try:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    for part in self.iter_translate_with_phi_protection(pages, translation_metadata):
+                        f.write(part)
+            except Exception as e:
+                print(f"  ❌ Error processing PDF: {e}")
+                return {'status': 'failed', 'reason': str(e)}
+            self._print_extraction_summary(extraction_metadata)
+            text = None
+        elif input_path.suffix.lower() == '.pdf':
             # Extract text from PDF (with OCR if needed)
             text, extraction_metadata = self.extract_text_from_pdf(str(input_path))
         elif input_path.suffix.lower() in ['.txt', '.text']:
@@ -312,16 +797,17 @@ class MedicalDocumentProcessor:
         else:
             raise ValueError(f"Unsupported file type: {input_path.suffix}")
         
-        if not text.strip():
-            print("❌ No text extracted from document")
-            return {'status': 'failed', 'reason': 'no_text_extracted'}
-        
-        # Translate with PHI protection
-        translated_text, translation_metadata = self.translate_with_phi_protection(text)
-        
-        # Save output
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(translated_text)
+        if text is not None:
+            if not text.strip():
+                print("❌ No text extracted from document")
+                return {'status': 'failed', 'reason': 'no_text_extracted'}
+            
+            # Translate with PHI protection
+            translated_text, translation_metadata = self.translate_with_phi_protection(text)
+            
+            # Save output
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(translated_text)
         
         # Calculate final statistics
         total_time = time.time() - start_time
@@ -352,6 +838,9 @@ class MedicalDocumentProcessor:
         print(f"  • Time: {total_time:.1f} seconds")
         print(f"  • PHI Protected: {translation_metadata['phi_items_protected']} items")
         print(f"  • API Calls: {translation_metadata['api_calls']}")
+        if translation_metadata.get('segments_total'):
+            print(f"  • Unique paragraphs: {translation_metadata['segments_unique']}"
+                  f"/{translation_metadata['segments_total']}")
         print(f"  • Estimated Cost: ${translation_metadata['api_calls'] * 0.002:.2f}")
         
         if extraction_metadata.get('handwritten_pages', 0) > 0:
@@ -384,18 +873,17 @@ def main():
     print("Enfermera Elena - Production Medical Document Processor")
     print("Supports: PDF (digital & scanned), PHI protection, HIPAA compliance")
     
-    processor = MedicalDocumentProcessor()
-    
-    # Test with the existing extracted text file
-    test_file = "medical_records/extracted/mr_12_03_25_MACSMA_redacted_extracted.txt"
-    
-    if Path(test_file).exists():
-        report = processor.process_document(test_file)
-    else:
-        print(f"Test file not found: {test_file}")
-    
-    # For PDF testing (when you have a PDF ready):
-    # report = processor.process_document("path/to/medical.pdf")
+    with MedicalDocumentProcessor() as processor:
+        # Test with the existing extracted text file
+        test_file = "medical_records/extracted/mr_12_03_25_MACSMA_redacted_extracted.txt"
+        
+        if Path(test_file).exists():
+            report = processor.process_document(test_file)
+        else:
+            print(f"Test file not found: {test_file}")
+        
+        # For PDF testing (when you have a PDF ready):
+        # report = processor.process_document("path/to/medical.pdf")
 
 
 if __name__ == "__main__":
@@ -5,7 +5,8 @@ Fixes overlapping patterns and improves accuracy
 """
 
 import re
-from typing import Dict, List, Tuple, Set, Optional
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple, Set, Optional, Union
 from datetime import datetime
 import hashlib
 import json
@@ -13,6 +14,11 @@ from pathlib import Path
 from dataclasses import dataclass
 from enum import Enum
 
+# Case folding for the literal prefilter. Besides str.lower(), re.IGNORECASE
+# treats these characters as equal to plain ASCII letters, so fold them too
+# or a prefilter could skip a pattern that would have matched.
+_PREFILTER_FOLD = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's', '\u212a': 'k'})
+
 class PHIType(Enum):
     """HIPAA PHI identifier types"""
     NAME = "name"
@@ -49,6 +55,67 @@ class PHIMatch:
     confidence: float
     context: str = ""
 
+@dataclass
+class PHIDetection:
+    """Result of one detection pass, reusable for sanitization"""
+    text: str
+    matches: List[PHIMatch]
+    
+    def __len__(self) -> int:
+        return len(self.matches)
+    
+    def __iter__(self):
+        return iter(self.matches)
+
+class AcceptedSpans:
+    """
+    Disjoint accepted spans, for overlap checks in O(log m)
+    
+    Spans are indexed by their start's rank among all candidate starts,
+    known up front. Two Fenwick trees over those ranks give the number of
+    accepted spans starting in a range and the furthest end of accepted
+    spans starting before a position, so both checks and insertions cost
+    O(log m) and resolving m matches costs O(m log m).
+    """
+    
+    def __init__(self, starts: Iterable[int]):
+        self._starts = sorted(set(starts))
+        self._count = [0] * (len(self._starts) + 1)
+        self._reach = [0] * (len(self._starts) + 1)
+    
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if an accepted span shares a character with [start, end)"""
+        before = bisect_left(self._starts, start)
+        if self._furthest_end(before) > start:
+            return True  # A span starting earlier reaches into this one
+        return self._total(bisect_left(self._starts, end)) > self._total(before)
+    
+    def add(self, start: int, end: int):
+        i = bisect_left(self._starts, start) + 1
+        while i < len(self._count):
+            self._count[i] += 1
+            self._reach[i] = max(self._reach[i], end)
+            i += i & -i
+    
+    def _total(self, rank: int) -> int:
+        """Accepted spans among the first `rank` starts"""
+        total = 0
+        while rank:
+            total += self._count[rank]
+            rank -= rank & -rank
+        return total
+    
+    def _furthest_end(self, rank: int) -> int:
+        """Furthest end of accepted spans among the first `rank` starts"""
+        reach = 0
+        while rank:
+            reach = max(reach, self._reach[rank])
+            rank -= rank & -rank
+        return reach
+
+# Placeholders written by sanitize_text, e.g. [NAME_0], [NSS_IMSS_3]
+PLACEHOLDER_PATTERN = re.compile(r'\[[A-Z0-9_]+_\d+\]')
+
 class SpanishMedicalPHIDetector:
     """
     Enhanced PHI detector that handles overlapping patterns
@@ -57,8 +124,12 @@ class SpanishMedicalPHIDetector:
     
     def __init__(self):
         self.patterns = self._build_priority_patterns()
+        self.prefilters = self._build_prefilters()
         self.audit_log = []
         
+        if len(self.prefilters) != len(self.patterns):
+            raise ValueError("Every PHI pattern needs a prefilter entry")
+        
     def _build_priority_patterns(self) -> List[Tuple[PHIType, re.Pattern, float]]:
         """
         Build patterns with priority ordering to handle overlaps
@@ -235,42 +306,87 @@ class SpanishMedicalPHIDetector:
         
         return patterns
     
+    def _build_prefilters(self) -> List[Tuple[str, ...]]:
+        """
+        Literal prefilters, one per pattern in _build_priority_patterns order
+        A pattern only runs if its text contains one of its literals
+        (lowercased); an empty tuple means the pattern always runs
+        """
+        return [
+            ('curp',),                                                  # CURP
+            ('rfc',),                                                   # RFC
+            ('nss', 'imss', 'seguro'),                                  # NSS/IMSS
+            ('hc', 'historia', 'expediente', 'folio', 'ficha'),         # MRN
+            ('póliza', 'poliza', 'afiliación', 'afiliacion',
+             'certificado', 'contrato'),                                # Health plan
+            ('paciente', 'nombre', 'titular', 'beneficiario',
+             'asegurado'),                                              # Patient names
+            ('dr', 'médico', 'doctor', 'atendió'),                      # Doctor names
+            ('tel', 'cel', 'móvil', 'contacto'),                        # Phone
+            ('@',),                                                     # Email
+            ('/', '-'),                                                 # Numeric dates
+            ('enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+             'julio', 'agosto', 'septiembre', 'octubre', 'noviembre',
+             'diciembre'),                                              # Written dates
+            ('calle', 'av', 'blvd', 'boulevard', 'carretera', 'camino',
+             'calzada'),                                                # Addresses
+            ('cp', 'c.p'),                                              # ZIP codes
+            ('edad', 'años'),                                           # Age over 89
+            ('ine', 'ife', 'elector', 'credencial'),                    # INE/IFE
+            ('cédula', 'ced', 'licencia', 'matrícula'),                 # License
+            ('http',),                                                  # URLs
+            ('.',),                                                     # IP addresses
+        ]
+    
     def detect_phi(self, text: str) -> List[PHIMatch]:
         """
         Detect all PHI in text, handling overlaps intelligently
         Returns: List of PHIMatch objects, sorted by position
         """
+        return self.detect(text).matches
+    
+    def detect(self, text: str, log: bool = True) -> PHIDetection:
+        """
+        Detect all PHI in text once
+        Returns: PHIDetection that sanitize_text can consume without re-scanning
+        """
         all_matches = []
         
+        # Cheap literal prefilter: skip patterns whose keywords never occur
+        folded = text.translate(_PREFILTER_FOLD).lower()
+        
         # Find all matches
-        for phi_type, pattern, confidence in self.patterns:
+        for (phi_type, pattern, confidence), literals in zip(self.patterns, self.prefilters):
+            if literals and not any(literal in folded for literal in literals):
+                continue
             for match in pattern.finditer(text):
                 value = match.group(1) if match.groups() else match.group(0)
                 
-                # Get context around match (20 chars before and after)
-                context_start = max(0, match.start() - 20)
-                context_end = min(len(text), match.end() + 20)
-                context = text[context_start:context_end]
-                
                 all_matches.append(PHIMatch(
                     phi_type=phi_type,
                     value=value,
                     start=match.start(),
                     end=match.end(),
-                    confidence=confidence,
-                    context=context
+                    confidence=confidence
                 ))
         
         # Remove overlapping matches, keeping higher confidence ones
         filtered_matches = self._filter_overlaps(all_matches)
         
+        # Get context around surviving matches only (20 chars before and after)
+        for match in filtered_matches:
+            context_start = max(0, match.start - 20)
+            context_end = min(len(text), match.end + 20)
+            match.context = text[context_start:context_end]
+        
         # Sort by position
         filtered_matches.sort(key=lambda x: x.start)
         
         # Log detection
-        self._log_detection(text, filtered_matches)
+        if log:
+            self._log_detection(text, filtered_matches)
         
-        return filtered_matches
+        return PHIDetection(text=text, matches=filtered_matches)
     
     def _filter_overlaps(self, matches: List[PHIMatch]) -> List[PHIMatch]:
         """Remove overlapping matches, keeping higher confidence ones"""
@@ -281,42 +397,53 @@ class SpanishMedicalPHIDetector:
         matches.sort(key=lambda x: (-x.confidence, x.start))
         
         filtered = []
-        used_positions = set()
+        accepted = AcceptedSpans(match.start for match in matches)
         
         for match in matches:
-            # Check if this match overlaps with any already selected
-            positions = set(range(match.start, match.end))
-            if not positions & used_positions:
-                filtered.append(match)
-                used_positions.update(positions)
+            if match.start == match.end:
+                filtered.append(match)  # Empty spans cover no characters
+                continue
+            if accepted.overlaps(match.start, match.end):
+                continue
+            filtered.append(match)
+            accepted.add(match.start, match.end)
         
         return filtered
     
-    def sanitize_text(self, text: str) -> Tuple[str, Dict[str, PHIMatch]]:
+    def sanitize_text(self, text: Union[str, PHIDetection]) -> Tuple[str, Dict[str, PHIMatch]]:
         """
         Remove all PHI from text
+        Accepts raw text or the PHIDetection from detect() (no second scan)
         Returns: (sanitized_text, phi_map)
         """
-        matches = self.detect_phi(text)
+        detection = text if isinstance(text, PHIDetection) else self.detect(text)
+        text = detection.text
+        matches = detection.matches
         phi_map = {}
-        sanitized = text
+        segments = []
+        position = 0
         
-        # Process in reverse order to maintain indices
-        for match in reversed(matches):
-            placeholder = f"[{match.phi_type.value.upper()}_{len(phi_map)}]"
+        # Numbered in text order, as StreamingPHIDetector numbers them
+        for index, match in enumerate(matches):
+            placeholder = f"[{match.phi_type.value.upper()}_{index}]"
             phi_map[placeholder] = match
-            sanitized = sanitized[:match.start] + placeholder + sanitized[match.end:]
+            segments.append(text[position:match.start])
+            segments.append(placeholder)
+            position = match.end
+        segments.append(text[position:])
         
-        return sanitized, phi_map
+        return ''.join(segments), phi_map
     
     def restore_phi(self, sanitized_text: str, phi_map: Dict[str, PHIMatch]) -> str:
         """Restore PHI to sanitized text"""
-        restored = sanitized_text
+        if not phi_map:
+            return sanitized_text
         
-        for placeholder, match in phi_map.items():
-            restored = restored.replace(placeholder, match.value)
+        def restore(placeholder: re.Match) -> str:
+            match = phi_map.get(placeholder.group(0))
+            return match.value if match else placeholder.group(0)
         
-        return restored
+        return PLACEHOLDER_PATTERN.sub(restore, sanitized_text)
     
     def _log_detection(self, text: str, matches: List[PHIMatch]):
         """Log PHI detection for audit trail"""
@@ -360,6 +487,123 @@ class SpanishMedicalPHIDetector:
         return "\n".join(report)
 
 
+@dataclass
+class SanitizedChunk:
+    """A sanitized piece of a PHI stream"""
+    text: str                      # Sanitized text
+    phi_map: Dict[str, PHIMatch]   # Placeholders introduced in this chunk
+    start: int                     # Offset of the chunk in the whole stream
+    source_text: str = ""          # Original text of the chunk (for audit hashing)
+
+
+class StreamingPHIDetector:
+    """
+    Sanitizes a stream of pages or lines with bounded memory
+    
+    Text is buffered until chunk_chars are available, scanned, and
+    everything except the last `window` characters is emitted. Cuts are
+    moved back to a line break (or whitespace) and never split a match,
+    so results match a whole-document scan for PHI up to `window`
+    characters long. Placeholders are numbered across the whole stream.
+    """
+    
+    def __init__(self,
+                 detector: Optional[SpanishMedicalPHIDetector] = None,
+                 window: int = 512,
+                 chunk_chars: int = 16384):
+        """
+        Args:
+            detector: Detector to use (a new one by default)
+            window: Overlap carried into the next scan; must exceed the
+                    longest expected PHI match
+            chunk_chars: Characters buffered before each scan
+        """
+        self.detector = detector or SpanishMedicalPHIDetector()
+        self.window = window
+        self.chunk_chars = chunk_chars
+        self.placeholder_count = 0
+        self._buffer = ""
+        self._offset = 0
+    
+    def feed(self, piece: str) -> List[SanitizedChunk]:
+        """Add text; returns chunks that are safe to emit"""
+        self._buffer += piece
+        if len(self._buffer) < self.chunk_chars + self.window:
+            return []
+        chunk = self._emit(final=False)
+        return [chunk] if chunk else []
+    
+    def flush(self) -> List[SanitizedChunk]:
+        """Emit whatever is left at the end of the stream"""
+        chunk = self._emit(final=True)
+        return [chunk] if chunk else []
+    
+    def sanitize_stream(self, pieces: Iterable[str]) -> Iterator[SanitizedChunk]:
+        """Sanitize an iterator of pages or lines, yielding chunks as they settle"""
+        for piece in pieces:
+            yield from self.feed(piece)
+        yield from self.flush()
+    
+    def _safe_cut(self, buffer: str, matches: List[PHIMatch]) -> int:
+        """Last position before the window that splits neither a line nor a match"""
+        cut = len(buffer) - self.window
+        while cut > 0:
+            boundary = buffer.rfind('\n', 0, cut)
+            if boundary < 0:
+                boundary = max(buffer.rfind(' ', 0, cut), buffer.rfind('\t', 0, cut))
+            if boundary >= 0:
+                cut = boundary + 1
+            crossing = [m.start for m in matches if m.start < cut < m.end]
+            if not crossing:
+                return cut
+            cut = min(crossing)
+        return 0
+    
+    def _emit(self, final: bool) -> Optional[SanitizedChunk]:
+        buffer = self._buffer
+        if not buffer:
+            return None
+        
+        matches = self.detector.detect(buffer, log=False).matches
+        cut = len(buffer) if final else self._safe_cut(buffer, matches)
+        if cut == 0:
+            return None  # Keep buffering until a safe cut exists
+        
+        chunk_start = self._offset
+        source_text = buffer[:cut]
+        phi_map = {}
+        segments = []
+        position = 0
+        committed = []
+        
+        for match in matches:
+            if match.start >= cut:
+                break
+            placeholder = f"[{match.phi_type.value.upper()}_{self.placeholder_count}]"
+            self.placeholder_count += 1
+            segments.append(source_text[position:match.start])
+            segments.append(placeholder)
+            position = match.end
+            
+            # Report positions relative to the whole stream
+            match.start += chunk_start
+            match.end += chunk_start
+            phi_map[placeholder] = match
+            committed.append(match)
+        segments.append(source_text[position:])
+        
+        self.detector._log_detection(source_text, committed)
+        self._buffer = buffer[cut:]
+        self._offset += cut
+        
+        return SanitizedChunk(
+            text=''.join(segments),
+            phi_map=phi_map,
+            start=chunk_start,
+            source_text=source_text
+        )
+
+
 def test_enhanced_detector():
     """Test the enhanced PHI detector"""
     
@@ -20,6 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 from pdf.extractor import extract_page_texts
 from pdf.classifier import classify_pages
 from ocr.tesseract import TesseractOCREngine
+from ocr.cache import OCRCache
 from deid.rules_mexico import MexicanPHIDeidentifier
 from mt.libretranslate_adapter import LibreTranslateAdapter
 from mt.alia_adapter import ALIAMedicalTranslator
@@ -44,7 +45,8 @@ class MedicalPDFProcessor:
                  umls_glossary_path: str,
                  translation_backend: str = "libretranslate",
                  use_ocr: bool = True,
-                 max_pages: Optional[int] = None):
+                 max_pages: Optional[int] = None,
+                 use_ocr_cache: bool = False):
         """
         Initialize the processor
         
@@ -53,11 +55,14 @@ class MedicalPDFProcessor:
             translation_backend: 'libretranslate', 'alia', or 'openai'
             use_ocr: Whether to OCR scanned pages
             max_pages: Maximum pages to process (None for all)
+            use_ocr_cache: Reuse OCR text of unchanged pages across runs
+                           (stores page text on disk; see ENFERMERA_OCR_CACHE_KEY)
         """
         self.umls_glossary_path = Path(umls_glossary_path)
         self.translation_backend = translation_backend
         self.use_ocr = use_ocr
         self.max_pages = max_pages
+        self.use_ocr_cache = use_ocr_cache
         
         # Validate glossary exists
         if not self.umls_glossary_path.exists():
@@ -73,6 +78,7 @@ class MedicalPDFProcessor:
         # OCR engine for scanned pages
         if self.use_ocr:
             self.ocr = TesseractOCREngine()
+            self.ocr_cache = OCRCache() if self.use_ocr_cache else None
             
         # PHI de-identification
         self.deid = MexicanPHIDeidentifier()
@@ -121,6 +127,7 @@ class MedicalPDFProcessor:
             'pages_processed': 0,
             'pages_ocr': 0,
             'pages_digital': 0,
+            'ocr_cache_hits': 0,
             'phi_tokens_found': 0,
             'translation_time': 0,
             'total_time': 0,
@@ -149,9 +156,10 @@ class MedicalPDFProcessor:
                 for i, page_type in enumerate(page_types):
                     if page_type == 'scanned':
                         logger.info(f"  OCR page {i+1}...")
-                        # OCR this page
-                        ocr_text = self.ocr.ocr_page(input_path, i)
+                        # OCR this page (or reuse the text from a previous run)
+                        ocr_text, cached = self._ocr_page(input_path, i)
                         page_texts[i] = ocr_text
+                        stats['ocr_cache_hits'] += cached
             else:
                 logger.info("Step 2: OCR skipped (no scanned pages or OCR disabled)")
                 
@@ -189,6 +197,9 @@ class MedicalPDFProcessor:
                         batch,
                         mode='medical'
                     )
+                elif isinstance(self.translator, LibreTranslateAdapter):
+                    # One array request per batch instead of one per page
+                    batch_translated = self.translator.translate_batch(batch)
                 else:
                     # Other backends process one by one
                     batch_translated = []
@@ -243,6 +254,34 @@ class MedicalPDFProcessor:
             
         return stats
         
+    def _ocr_page(self, input_path: str, page_index: int) -> Tuple[str, bool]:
+        """
+        OCR one page through the content-addressed cache
+        
+        Returns:
+            Tuple of (page_text, served_from_cache)
+        """
+        if self.ocr_cache is None:
+            return self.ocr.ocr_page(input_path, page_index), False
+            
+        key = self.ocr_cache.key_for_pdf_page(
+            input_path, page_index,
+            engine=type(self.ocr).__name__,
+            lang=getattr(self.ocr, 'lang', None),
+            dpi=getattr(self.ocr, 'dpi', None),
+            config=getattr(self.ocr, 'config', None)
+        )
+        cached = self.ocr_cache.get(key)
+        if cached is not None:
+            return cached.decode('utf-8'), True
+            
+        ocr_text = self.ocr.ocr_page(input_path, page_index)
+        try:
+            self.ocr_cache.put(key, ocr_text.encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not cache OCR text for page {page_index + 1}: {e}")
+        return ocr_text, False
+        
     def process_batch(self, pdf_files: List[str], output_dir: str) -> List[Dict]:
         """
         Process multiple PDFs
@@ -358,6 +397,11 @@ def main():
         action='store_true',
         help='Skip OCR for scanned pages'
     )
+    parser.add_argument(
+        '--ocr-cache',
+        action='store_true',
+        help='Reuse cached OCR page text across runs (set ENFERMERA_OCR_CACHE_KEY to encrypt it)'
+    )
     parser.add_argument(
         '--validate',
         action='store_true',
@@ -399,7 +443,8 @@ def main():
         umls_glossary_path=args.glossary,
         translation_backend=args.backend,
         use_ocr=not args.no_ocr,
-        max_pages=args.max_pages
+        max_pages=args.max_pages,
+        use_ocr_cache=args.ocr_cache
     )
     
     # Process input
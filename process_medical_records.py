@@ -191,13 +191,9 @@ class MedicalRecordProcessor:
             glossary_path = "data/glossaries/glossary_es_en_production.csv"
         self.log(f"Loading glossary: {glossary_path}")
         
-        self.glossary = {}
-        with open(glossary_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                es_term = row['es_term'].lower()
-                en_term = row['en_term']
-                self.glossary[es_term] = en_term
+        # Served by the glossary service when it is running, else loaded here
+        from translate_medical_record import load_glossary
+        self.glossary = load_glossary(glossary_path)
                 
         self.log(f"  Loaded {len(self.glossary)} terms")
         
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Chunk Scheduler Benchmark for Enfermera Elena
+Compares serial chunk translation (fixed 0.5s sleeps) with the async scheduler, against a local stub
+
+Usage:
+    python scripts/benchmark_chunk_scheduler.py [--chunks 40] [--latency 0.8] [--concurrency 8]
+    python scripts/benchmark_chunk_scheduler.py --skip-serial --rpm 30 [--client-rpm 30]
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+from mt.scheduler import AsyncChunkScheduler, RateLimited
+from openai_stub_server import start_stub_server
+
+
+def chat_completion(base_url: str, text: str) -> str:
+    """One chat-completions request with the standard library (raises RateLimited on 429)"""
+    request = urllib.request.Request(
+        f"{base_url}/chat/completions",
+        data=json.dumps({'model': 'gpt-3.5-turbo',
+                         'messages': [{'role': 'user', 'content': text}]}).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'Authorization': 'Bearer stub'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return json.loads(response.read())['choices'][0]['message']['content']
+    except urllib.error.HTTPError as e:
+        if e.code == 429:
+            raise RateLimited(float(e.headers.get('Retry-After') or 0))
+        raise
+
+
+def serial(base_url: str, chunks):
+    """Previous behaviour: one request at a time, sleeping 0.5s after each"""
+    results = []
+    for chunk in chunks:
+        results.append(chat_completion(base_url, chunk))
+        time.sleep(0.5)
+    return results
+
+
+def scheduled(base_url: str, chunks, scheduler: AsyncChunkScheduler):
+    async def call(chunk):
+        return await asyncio.to_thread(chat_completion, base_url, chunk)
+    return scheduler.map(chunks, call)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark async chunk scheduling")
+    parser.add_argument('--chunks', type=int, default=40, help='20-line chunks to translate')
+    parser.add_argument('--latency', type=float, default=0.8, help='Stub seconds per request')
+    parser.add_argument('--concurrency', type=int, default=8, help='Scheduler requests in flight')
+    parser.add_argument('--rpm', type=int, help='Stub per-minute limit (exercises 429 backoff)')
+    parser.add_argument('--client-rpm', type=int, help='Scheduler request budget (paces before the stub says 429)')
+    parser.add_argument('--skip-serial', action='store_true', help='Only run the scheduler')
+    args = parser.parse_args()
+
+    chunks = [f"Chunk {i}\n" + "\n".join(f"Línea {i}.{j}: glucosa 110 mg/dL" for j in range(20))
+              for i in range(args.chunks)]
+
+    print("=" * 60)
+    print("Chunk Scheduler Benchmark")
+    print("=" * 60)
+    print(f"  {args.chunks} chunks, {args.latency}s stub latency"
+          + (f", {args.rpm} rpm limit" if args.rpm else ""))
+
+    if not args.skip_serial:
+        server, base_url = start_stub_server(latency=args.latency, jitter=0.0)
+        start = time.perf_counter()
+        serial(base_url, chunks)
+        old = time.perf_counter() - start
+        server.shutdown()
+        print(f"  serial + sleep: {old:7.1f}s")
+
+    server, base_url = start_stub_server(latency=args.latency, jitter=args.latency / 4, rpm=args.rpm)
+    scheduler = AsyncChunkScheduler(max_concurrency=args.concurrency,
+                                    requests_per_minute=args.client_rpm, backoff=0.5)
+    start = time.perf_counter()
+    results = scheduled(base_url, chunks, scheduler)
+    new = time.perf_counter() - start
+    server.shutdown()
+    scheduler.close()
+
+    if results != chunks:
+        print("❌ Results out of order or missing")
+        sys.exit(1)
+    print(f"  ✓ All {len(results)} chunks back in order")
+    print(f"  scheduler:      {new:7.1f}s" + ("" if args.skip_serial else f" ({old / new:.1f}x)"))
+    print(f"  stub: {server.stats['requests']} requests, {server.stats['rate_limited']} answered 429, "
+          f"{server.stats['max_in_flight']} max in flight")
+    print(f"  scheduler: {scheduler.stats}")
+
+
+if __name__ == "__main__":
+    main()
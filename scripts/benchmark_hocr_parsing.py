@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+hOCR Parsing Benchmark for Enfermera Elena
+Compares the streaming hOCR reader with the previous BeautifulSoup tree walk
+
+Usage:
+    python scripts/benchmark_hocr_parsing.py [--pages 50] [--lines 60]
+    python scripts/benchmark_hocr_parsing.py --hocr stored_pages/
+"""
+
+import sys
+import time
+import random
+import argparse
+from html import escape
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from pdf.layout_preserving_processor import LayoutAnalyzer, TextBlock, BlockType
+
+WORDS = ["Paciente", "presenta", "dolor", "torácico", "de", "inicio", "súbito", "TA", "140/90",
+         "mmHg", "FC", "98", "lpm", "Glucosa", "110", "mg/dL", "PARACETAMOL", "500MG", "c/8h",
+         "Diagnóstico:", "Hipertensión", "arterial", "&", "<5%", "niño", "año"]
+
+
+def synthetic_hocr(lines: int, seed: int = 0) -> bytes:
+    """Tesseract-style XHTML hOCR page (carea > par > line > word)"""
+    rng = random.Random(seed)
+    out = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"\n'
+           '    "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+           '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+           ' <head>\n  <title></title>\n'
+           '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+           "  <meta name='ocr-system' content='tesseract 5.3.0'/>\n"
+           ' </head>\n <body>\n'
+           "  <div class='ocr_page' id='page_1' title='image \"page.png\"; bbox 0 0 2550 3300; ppageno 0'>\n"]
+    top = 150
+    line_id = word_id = 0
+    par_id = 0
+    remaining = lines
+    while remaining > 0:
+        par_lines = min(remaining, rng.randint(1, 8))
+        remaining -= par_lines
+        par_id += 1
+        par_bottom = top + par_lines * 45
+        out.append(f"   <div class='ocr_carea' id='block_1_{par_id}' title=\"bbox 150 {top} 2400 {par_bottom}\">\n"
+                   f"    <p class='ocr_par' id='par_1_{par_id}' lang='spa' title=\"bbox 150 {top} 2400 {par_bottom}\">\n")
+        for _ in range(par_lines):
+            line_id += 1
+            out.append(f"     <span class='ocr_line' id='line_1_{line_id}' "
+                       f"title=\"bbox 150 {top} 2400 {top + 38}; baseline 0 -8; x_size 38; x_descenders 8; x_ascenders 10\">")
+            x = 150
+            for _ in range(rng.randint(3, 12)):
+                word_id += 1
+                text = rng.choice(WORDS)
+                width = len(text) * 22
+                word = escape(text, quote=False)
+                if rng.random() < 0.1:
+                    word = f"<strong>{word}</strong>"
+                out.append(f"\n      <span class='ocrx_word' id='word_1_{word_id}' "
+                           f"title='bbox {x} {top} {x + width} {top + 38}; x_wconf {rng.randint(60, 97)}'>{word}</span> ")
+                x += width + 18
+            out.append("\n     </span>\n")
+            top += 45
+        out.append("    </p>\n   </div>\n")
+        top += 30
+    out.append("  </div>\n </body>\n</html>\n")
+    return ''.join(out).encode('utf-8')
+
+
+def previous_parse_hocr(analyzer: LayoutAnalyzer, hocr_data: bytes, page_num: int):
+    """
+    Previous BeautifulSoup implementation, kept as the reference
+
+    Joins words with a space; the original get_text(strip=True) glued them together.
+    """
+    soup = BeautifulSoup(hocr_data, 'html.parser')
+    blocks = []
+
+    for par in soup.find_all('p', class_='ocr_par'):
+        bbox = analyzer._extract_bbox_from_title(par.get('title', ''))
+        if not bbox:
+            continue
+        text = ' '.join(par.get_text(' ', strip=True).split())
+        if not text:
+            continue
+        blocks.append(TextBlock(page_num=page_num, bbox=bbox, text=text,
+                                block_type=BlockType.PARAGRAPH,
+                                confidence=analyzer._extract_confidence_from_title(par.get('title', ''))))
+
+    for line in soup.find_all('span', class_='ocr_line'):
+        bbox = analyzer._extract_bbox_from_title(line.get('title', ''))
+        text = ' '.join(line.get_text(' ', strip=True).split())
+        if bbox and text and not any(analyzer._bbox_contains(b.bbox, bbox) for b in blocks):
+            blocks.append(TextBlock(page_num=page_num, bbox=bbox, text=text,
+                                    block_type=BlockType.PARAGRAPH, confidence=0.9))
+
+    return blocks
+
+
+def load_pages(paths):
+    """hOCR files given directly or found in directories"""
+    pages = []
+    for path in map(Path, paths):
+        files = sorted(path.rglob('*.hocr')) + sorted(path.rglob('*.html')) if path.is_dir() else [path]
+        pages.extend(f.read_bytes() for f in files)
+    return pages
+
+
+def time_pages(func, pages) -> float:
+    start = time.perf_counter()
+    for page_num, hocr_data in enumerate(pages):
+        func(hocr_data, page_num)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hOCR parsing")
+    parser.add_argument('--hocr', nargs='+', help='Stored hOCR files or directories (default: synthetic pages)')
+    parser.add_argument('--pages', type=int, default=50, help='Synthetic pages per run')
+    parser.add_argument('--lines', type=int, default=60, help='Text lines per synthetic page')
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    analyzer = LayoutAnalyzer()
+    pages = load_pages(args.hocr) if args.hocr else [synthetic_hocr(args.lines, seed)
+                                                      for seed in range(args.pages)]
+    if not pages:
+        print("❌ No hOCR pages found")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("hOCR Parsing Benchmark")
+    print("=" * 60)
+    print(f"  {len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.0f} KB average")
+
+    for page_num, hocr_data in enumerate(pages):
+        expected = previous_parse_hocr(analyzer, hocr_data, page_num)
+        actual = analyzer._parse_hocr(hocr_data, page_num)
+        if [b.to_dict() for b in expected] != [b.to_dict() for b in actual]:
+            print(f"❌ TextBlocks differ on page {page_num}")
+            sys.exit(1)
+    print(f"  ✓ Identical TextBlocks on all pages")
+
+    old = min(time_pages(lambda h, p: previous_parse_hocr(analyzer, h, p), pages)
+              for _ in range(args.runs))
+    new = min(time_pages(analyzer._parse_hocr, pages) for _ in range(args.runs))
+    print(f"  BeautifulSoup: {len(pages) / old:8.1f} pages/s")
+    print(f"  streaming:     {len(pages) / new:8.1f} pages/s ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
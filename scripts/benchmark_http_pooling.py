@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+HTTP Pooling Benchmark for Enfermera Elena
+Compares per-segment latency of module-level requests.post with a pooled keep-alive session,
+and per-segment requests with LibreTranslate array requests (translate_batch)
+
+Usage:
+    python scripts/benchmark_http_pooling.py [--segments 2000] [--threads 4] [--latency 0.002]
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+from mt.libretranslate_adapter import LibreTranslateAdapter
+from mt.sessions import pooled_session
+from libretranslate_stub_server import start_stub_server
+
+SEGMENTS = ["Fecha", "Descripción", "Glucosa 110 mg/dL", "Paciente con HTA controlada",
+            "Centro Hospitalario", "Cargo por habitación", "Subtotal", "Paracetamol 500 mg c/8h"]
+
+
+def run(post, base_url: str, segments, threads: int):
+    """Per-request latencies (ms) of posting every segment"""
+    def one(text):
+        start = time.perf_counter()
+        response = post(f"{base_url}/translate",
+                        json={'q': text, 'source': 'es', 'target': 'en', 'format': 'text'},
+                        timeout=30)
+        response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one, segments))
+
+
+def report(label: str, latencies, elapsed: float, connections: int):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:<24} mean {statistics.mean(latencies):6.2f} ms  p50 {statistics.median(latencies):6.2f} ms  "
+          f"p95 {p95:6.2f} ms  {len(latencies) / elapsed:7.0f} req/s  {connections} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP connection pooling")
+    parser.add_argument('--segments', type=int, default=2000, help='Short segments to translate')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent callers sharing the session')
+    parser.add_argument('--latency', type=float, default=0.002, help='Stub seconds per request')
+    args = parser.parse_args()
+
+    segments = [f"{SEGMENTS[i % len(SEGMENTS)]} {i}" for i in range(args.segments)]  # All distinct
+
+    print("=" * 60)
+    print("HTTP Pooling Benchmark")
+    print("=" * 60)
+    print(f"  {args.segments} segments, {args.threads} threads, {args.latency * 1000:.0f} ms stub latency")
+
+    session = pooled_session(pool_size=args.threads)
+    for label, post in (("requests.post", requests.post), ("pooled session", session.post)):
+        server, base_url = start_stub_server(latency=args.latency)
+        start = time.perf_counter()
+        latencies = run(post, base_url, segments, args.threads)
+        report(label, latencies, time.perf_counter() - start, server.stats['connections'])
+        server.shutdown()
+
+    # End to end through the adapter (cache off so every segment is a request)
+    for label, keep_alive in (("adapter, no keep-alive", False), ("adapter, pooled", True)):
+        server, base_url = start_stub_server(latency=args.latency)
+        host, port = base_url.rsplit('//', 1)[1].split(':')
+        adapter = LibreTranslateAdapter(host=host, port=int(port), cache_enabled=False,
+                                        pool_size=args.threads, keep_alive=keep_alive)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(lambda text: adapter.translate(text, apply_medical=False), segments))
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<24} {args.segments / elapsed:7.0f} segments/s  "
+              f"{server.stats['connections']} connections")
+        server.shutdown()
+
+    # Array requests: one POST per LT_CHAR_LIMIT characters instead of per segment
+    server, base_url = start_stub_server(latency=args.latency)
+    host, port = base_url.rsplit('//', 1)[1].split(':')
+    adapter = LibreTranslateAdapter(host=host, port=int(port), cache_enabled=False)
+    start = time.perf_counter()
+    adapter.translate_batch(segments, apply_medical=False)
+    elapsed = time.perf_counter() - start
+    print(f"  {'adapter, translate_batch':<24} {args.segments / elapsed:7.0f} segments/s  "
+          f"{server.stats['requests']} requests")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+OCR Engine Benchmark for Enfermera Elena
+Compares pages/sec of per-call pytesseract processes with persistent Tesseract workers
+
+Usage:
+    python scripts/benchmark_ocr_engines.py [--pdf record.pdf] [--pages 20] [--workers 2]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from PIL import Image, ImageDraw
+from ocr.rasterize import render_pages
+from ocr.tesseract import TesseractOCREngine, tesserocr_available
+
+# Lines typical of a scanned Mexican lab report
+LINES = [
+    "HOSPITAL GENERAL DE MÉXICO - LABORATORIO CLÍNICO",
+    "Paciente: María González Hernández   Expediente: HC-2025-001234",
+    "Fecha de toma: 15/03/2024   Médico: Dr. Juan Pérez López",
+    "Glucosa en ayuno ........ 110 mg/dL   (70 - 100)",
+    "Hemoglobina glucosilada .. 6.8 %      (4.0 - 5.6)",
+    "Creatinina sérica ....... 1.1 mg/dL  (0.6 - 1.2)",
+    "Diagnóstico: diabetes mellitus tipo 2 con hipertensión arterial",
+    "Tratamiento: metformina 850 mg cada 12 horas, losartán 50 mg al día",
+]
+
+
+def synthetic_pages(count: int, lines_per_page: int = 40):
+    """Printed-looking grayscale pages at roughly 200 dpi"""
+    pages = []
+    for page_num in range(count):
+        image = Image.new('L', (1700, 2200), 255)
+        draw = ImageDraw.Draw(image)
+        for i in range(lines_per_page):
+            text = LINES[(page_num + i) % len(LINES)]
+            draw.text((100, 100 + i * 50), text, fill=0)
+        pages.append(image)
+    return pages
+
+
+def run(engine: TesseractOCREngine, pages, threads: int, config: str):
+    """OCR every page with `threads` concurrent callers; returns (seconds, texts)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        texts = list(pool.map(lambda page: engine.image_to_string(page, config), pages))
+    return time.perf_counter() - start, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR engine backends")
+    parser.add_argument('--pdf', help='Rasterize pages of this PDF instead of synthetic pages')
+    parser.add_argument('--pages', type=int, default=20, help='Pages to OCR')
+    parser.add_argument('--dpi', type=int, default=200, help='Rasterization resolution for --pdf')
+    parser.add_argument('--workers', type=int, default=2, help='Concurrent pages (workers)')
+    parser.add_argument('--lang', default='spa', help='Tesseract language')
+    parser.add_argument('--config', default='--psm 6', help='Tesseract options')
+    args = parser.parse_args()
+
+    if args.pdf:
+        pages = render_pages(args.pdf, 1, args.pages, args.dpi, grayscale=True)
+    else:
+        pages = synthetic_pages(args.pages)
+
+    print("=" * 60)
+    print("OCR Engine Benchmark")
+    print("=" * 60)
+    print(f"  {len(pages)} pages, {args.workers} concurrent, lang={args.lang}, config='{args.config}'")
+
+    if not tesserocr_available():
+        print("  ⚠️ tesserocr is not installed: only the subprocess backend can run")
+
+    results = {}
+    for backend in ('subprocess', 'persistent'):
+        start = time.perf_counter()
+        engine = TesseractOCREngine(lang=args.lang, config='', workers=args.workers,
+                                    backend=backend)
+        startup = time.perf_counter() - start
+        if engine.backend_name != backend:
+            print(f"  {backend:<11} skipped (fell back to {engine.backend_name})")
+            engine.close()
+            continue
+
+        try:
+            run(engine, pages[:args.workers], args.workers, args.config)  # Warm up
+            elapsed, texts = run(engine, pages, args.workers, args.config)
+        finally:
+            engine.close()
+
+        results[backend] = texts
+        print(f"  {backend:<11} {len(pages) / elapsed:6.2f} pages/s "
+              f"({elapsed:.1f}s, startup {startup:.2f}s)")
+
+    if len(results) == 2:
+        same = sum(a == b for a, b in zip(results['subprocess'], results['persistent']))
+        print(f"\n  Identical text on {same}/{len(pages)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+PHI Overlap Resolution Benchmark for Enfermera Elena
+Compares Fenwick-indexed _filter_overlaps with the set-of-positions and
+sorted-list versions, and checks that its cost grows as O(m log m)
+
+Usage:
+    python scripts/benchmark_phi_overlaps.py [--matches 5000] [--runs 5]
+"""
+
+import sys
+import time
+import random
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from phi_detector_enhanced import SpanishMedicalPHIDetector, PHIMatch, PHIType
+
+# Fragments typical of date/location-heavy billing records
+FRAGMENTS = [
+    "PACIENTE: María González Hernández",
+    "FECHA: 15/03/2024",
+    "12 de marzo de 2025",
+    "DOMICILIO: Av. Insurgentes 123, Col. Centro, C.P. 37700",
+    "Calle Morelos 45 C.P. 01000",
+    "TEL: 415-123-4567",
+    "NSS: 12345678901",
+    "NHC: HC-2025-001234",
+    "DR. Juan Pérez López",
+    "CARGO HABITACIÓN PRIVADA 1 $2,450.00",
+    "Glucosa 110 mg/dl",
+]
+
+
+def filter_overlaps_positions(matches):
+    """Previous implementation: one set of character positions per match"""
+    matches = sorted(matches, key=lambda x: (-x.confidence, x.start))
+    filtered = []
+    used_positions = set()
+    for match in matches:
+        positions = set(range(match.start, match.end))
+        if not positions & used_positions:
+            filtered.append(match)
+            used_positions.update(positions)
+    return filtered
+
+
+def filter_overlaps_sorted_lists(matches):
+    """Intermediate implementation: bisect into sorted lists, O(m) per list.insert"""
+    matches = sorted(matches, key=lambda x: (-x.confidence, x.start))
+    filtered = []
+    span_starts = []
+    span_ends = []
+    for match in matches:
+        index = bisect_right(span_starts, match.start)
+        if index and span_ends[index - 1] > match.start:
+            continue
+        if index < len(span_starts) and span_starts[index] < match.end:
+            continue
+        filtered.append(match)
+        span_starts.insert(index, match.start)
+        span_ends.insert(index, match.end)
+    return filtered
+
+
+def front_insert_matches(count: int):
+    """Disjoint spans accepted right to left: every list.insert goes to the front"""
+    return [PHIMatch(phi_type=PHIType.NAME, value="", start=i * 10, end=i * 10 + 5,
+                     confidence=0.5 + 0.5 * i / count)
+            for i in range(count)]
+
+
+def synthetic_matches(count: int, seed: int = 0):
+    """Random overlapping spans with mixed confidences"""
+    rng = random.Random(seed)
+    length = count * 12
+    matches = []
+    for _ in range(count):
+        start = rng.randrange(length)
+        end = start + rng.randint(5, 80)
+        matches.append(PHIMatch(
+            phi_type=rng.choice([PHIType.DATE, PHIType.GEOGRAPHIC, PHIType.NAME]),
+            value="",
+            start=start,
+            end=end,
+            confidence=rng.choice([0.7, 0.8, 0.85, 0.9, 0.95, 1.0])
+        ))
+    return matches
+
+
+def synthetic_document(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "\n".join(
+        " ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 4)))
+        for _ in range(lines)
+    )
+
+
+def best_of(runs: int, func, *args) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PHI overlap resolution")
+    parser.add_argument('--matches', type=int, default=5000, help='Synthetic matches per run')
+    parser.add_argument('--lines', type=int, default=2000, help='Synthetic document lines')
+    parser.add_argument('--runs', type=int, default=5, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    detector = SpanishMedicalPHIDetector()
+
+    print("=" * 60)
+    print("PHI Overlap Resolution Benchmark")
+    print("=" * 60)
+
+    # Raw spans: worst case for the position-set version
+    for count in (args.matches // 5, args.matches, args.matches * 4):
+        matches = synthetic_matches(count)
+        expected = filter_overlaps_positions(matches)
+        actual = detector._filter_overlaps(list(matches))
+        if [(m.start, m.end) for m in expected] != [(m.start, m.end) for m in actual]:
+            print(f"❌ Results differ for {count} matches")
+            sys.exit(1)
+
+        old = best_of(args.runs, filter_overlaps_positions, matches)
+        new = best_of(args.runs, lambda: detector._filter_overlaps(list(matches)))
+        print(f"  {count:>6} matches: positions {old * 1000:8.1f} ms | "
+              f"intervals {new * 1000:7.1f} ms | {old / new:5.1f}x")
+
+    # Growth on the sorted-list worst case: x4 matches should cost about
+    # x4.5 for O(m log m), x16 for O(m^2)
+    print()
+    previous = None
+    for count in (args.matches * 4, args.matches * 16, args.matches * 64):
+        matches = front_insert_matches(count)
+        lists = best_of(1, filter_overlaps_sorted_lists, matches)
+        fenwick = best_of(1, lambda: detector._filter_overlaps(list(matches)))
+        growth = (f" | growth x{lists / previous[0]:.1f} / x{fenwick / previous[1]:.1f}"
+                  if previous else "")
+        print(f"  {count:>7} front inserts: sorted lists {lists * 1000:8.1f} ms | "
+              f"fenwick {fenwick * 1000:8.1f} ms{growth}")
+        previous = (lists, fenwick)
+
+    # End to end on a PHI-dense document
+    document = synthetic_document(args.lines)
+    found = detector.detect_phi(document)
+    elapsed = best_of(args.runs, detector.detect_phi, document)
+    print(f"\n  detect_phi on {len(document):,} chars ({len(found)} PHI items): "
+          f"{elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
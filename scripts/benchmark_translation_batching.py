@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Translation Batching Benchmark for Enfermera Elena
+Counts translation requests for plain 20-line chunks, deduplicated per-line marker
+batches and deduplicated paragraph batches, with a simulated model that reflows
+wrapped sentences across markers
+
+Usage:
+    python scripts/benchmark_translation_batching.py [--pages 20] [--reflow 0,0.25,1]
+"""
+
+import sys
+import random
+import logging
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from mt.batching import MARKER_PATTERN, translate_batched
+from mt.dedup import SegmentDeduplicator, split_paragraphs
+
+CHUNK_SIZE = 20
+
+# Blocks separated by blank lines, as Tesseract returns them
+BILLING_PAGE = [
+    "Centro Hospitalario",
+    "Estado de cuenta",
+    "",
+    "Fecha        Descripción                     Cantidad    Importe",
+    "{d:02d}/03/2024   Cargo por habitación            1           $2,450.00",
+    "{d:02d}/03/2024   Paracetamol 500 mg              {n}           $   {n}8.50",
+    "{d:02d}/03/2024   Biometría hemática              1           $  380.00",
+    "Subtotal                                                   ${n},318.50",
+    "",
+    "Página {p}",
+    "",
+]
+
+NOTE_PAGE = [
+    "Nota de evolución",
+    "",
+    "Paciente femenina de {n}0 años que acude por cuadro de fiebre y tos",
+    "productiva de {d} días de evolución, sin disnea ni dolor torácico.",
+    "A la exploración se encuentra consciente, orientada, con campos",
+    "pulmonares con estertores en base derecha.",
+    "Plan: continuar antibiótico y control en {d} días.",
+    "",
+    "Página {p}",
+    "",
+]
+
+
+def document(page_lines, pages: int):
+    lines = []
+    for p in range(1, pages + 1):
+        lines.extend(line.format(d=p % 28 + 1, n=p % 9 + 1, p=p) for line in page_lines)
+    return lines
+
+
+def continues(line: str, next_line: str) -> bool:
+    """A wrapped sentence: no closing punctuation, next line starts in lowercase"""
+    return line[-1:] not in ('.', ':', ';', '') and next_line[:1].islower()
+
+
+class ReflowingModel:
+    """
+    Uppercasing "translation" that, like an LLM, sometimes joins a wrapped
+    line with the next one and drops the marker in between
+    """
+
+    def __init__(self, reflow: float, seed: int = 0):
+        self.reflow = reflow
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    def __call__(self, text: str) -> str:
+        self.requests += 1
+        markers = list(MARKER_PATTERN.finditer(text))
+        if len(markers) < 2:
+            return text.upper()
+        out = []
+        for position, marker in enumerate(markers):
+            end = markers[position + 1].start() if position + 1 < len(markers) else len(text)
+            body = text[marker.end():end].strip()
+            if out and continues(out[-1], body) and self.random.random() < self.reflow:
+                out[-1] += ' ' + body.upper()
+            else:
+                out.append(f"{marker.group(0)}\n{body.upper()}")
+        return '\n\n'.join(out)
+
+
+def chunk_requests(lines) -> int:
+    """Previous behaviour: one request per non-blank chunk of CHUNK_SIZE lines"""
+    return sum(1 for i in range(0, len(lines), CHUNK_SIZE)
+               if '\n'.join(lines[i:i + CHUNK_SIZE]).strip())
+
+
+def line_requests(lines, reflow: float):
+    """Previous behaviour: dedup lines, then one marker per line, CHUNK_SIZE lines a batch"""
+    model = ReflowingModel(reflow)
+    stats = {}
+    dedup = SegmentDeduplicator()
+    for i in range(0, len(lines), CHUNK_SIZE):
+        chunk = lines[i:i + CHUNK_SIZE]
+        dedup.translate(chunk, lambda first: translate_batched(
+            [chunk[j].strip() for j in first], model, max_segments=CHUNK_SIZE, stats=stats))
+    return model.requests, stats['fallbacks']
+
+
+def paragraph_requests(lines, reflow: float):
+    """Dedup paragraphs, then one marker per paragraph, as _translate_paragraphs does"""
+    model = ReflowingModel(reflow)
+    stats = {}
+    dedup = SegmentDeduplicator()
+    paragraphs = split_paragraphs(lines, CHUNK_SIZE)
+    dedup.translate(paragraphs, lambda first: translate_batched(
+        [paragraphs[j] for j in first], model, stats=stats))
+    return model.requests, stats['fallbacks']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark translation batching request counts")
+    parser.add_argument('--pages', type=int, default=20, help='Pages per document')
+    parser.add_argument('--reflow', default='0,0.25,1', help='Chances that a wrapped line is reflowed')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    print("=" * 60)
+    print("Translation Batching Benchmark")
+    print("=" * 60)
+    for name, page in (("billing export", BILLING_PAGE), ("clinical notes", NOTE_PAGE)):
+        lines = document(page, args.pages)
+        print(f"  {name}: {len(lines)} lines, {chunk_requests(lines)} plain chunk requests")
+        for reflow in (float(r) for r in args.reflow.split(',')):
+            by_line, line_fallbacks = line_requests(lines, reflow)
+            by_paragraph, paragraph_fallbacks = paragraph_requests(lines, reflow)
+            print(f"    reflow {reflow:4.2f}: {by_line:4d} line marker requests "
+                  f"({line_fallbacks} fallbacks) | {by_paragraph:4d} paragraph requests "
+                  f"({paragraph_fallbacks} fallbacks)")
+
+
+if __name__ == "__main__":
+    main()
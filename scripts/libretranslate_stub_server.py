@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+LibreTranslate Stub Server for Enfermera Elena
+Answers /translate and /languages with configurable latency, for testing without a model server
+
+Usage:
+    python scripts/libretranslate_stub_server.py [--port 5000] [--latency 0.005] [--char-limit 5000]
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs
+
+
+class StubLibreTranslateServer(ThreadingHTTPServer):
+    """
+    LibreTranslate stub that returns each text upper-cased
+
+    `q` may be a string or an array (answered with an array, like the real
+    server). Every request sleeps `latency` seconds; requests over
+    `char_limit` characters get a 400. Counts requests and the TCP
+    connections they arrived on, to show keep-alive reuse.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # Connection-per-request clients open many at once
+
+    def __init__(self, address, latency: float = 0.005, char_limit: Optional[int] = None):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.char_limit = char_limit
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'connections': 0, 'texts': 0}
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive unless the client asks to close
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/languages':
+            self._reply(200, [{'code': 'en', 'name': 'English'}, {'code': 'es', 'name': 'Spanish'}])
+        else:
+            self._reply(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf-8')
+        if self.path.rstrip('/') != '/translate':
+            self._reply(404, {'error': 'Not found'})
+            return
+
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            q = json.loads(body or '{}').get('q', '')
+        else:
+            q = parse_qs(body).get('q', [''])[0]
+        texts = q if isinstance(q, list) else [q]
+
+        self.server.count('requests')
+        self.server.count('texts', len(texts))
+        if self.server.char_limit and sum(map(len, texts)) > self.server.char_limit:
+            self._reply(400, {'error': f"Invalid request: request ({sum(map(len, texts))}) "
+                                       f"exceeds text limit ({self.server.char_limit})"})
+            return
+
+        time.sleep(self.server.latency)
+        translated = [text.upper() for text in texts]
+        self._reply(200, {'translatedText': translated if isinstance(q, list) else translated[0]})
+
+    def _reply(self, status: int, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')  # Echo it, as real servers do
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+
+def start_stub_server(port: int = 0, **options) -> Tuple[StubLibreTranslateServer, str]:
+    """
+    Run the stub in a background thread
+
+    Returns:
+        Tuple of (server, base_url)
+    """
+    server = StubLibreTranslateServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LibreTranslate stub server")
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds per request')
+    parser.add_argument('--char-limit', type=int, help='Characters per request before answering 400')
+    args = parser.parse_args()
+
+    server = StubLibreTranslateServer(('127.0.0.1', args.port), latency=args.latency,
+                                      char_limit=args.char_limit)
+    print(f"LibreTranslate stub listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+OpenAI-Compatible Stub Server for Enfermera Elena
+Answers /v1/chat/completions with configurable latency and rate limits, for testing without the API
+(or without vLLM: --capacity models its concurrent batch slots)
+
+Usage:
+    python scripts/openai_stub_server.py [--port 8600] [--latency 0.8] [--rpm 120] [--capacity 16]
+    OPENAI_BASE_URL=http://127.0.0.1:8600/v1 OPENAI_API_KEY=stub python medical_processor_production.py
+    python src/mt/alia_adapter.py --server http://127.0.0.1:8600 --test
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """
+    Chat-completions stub that echoes the last user message
+
+    Every request sleeps `latency` seconds (plus up to `jitter`). With
+    `rpm` set, requests beyond that many in the last minute get a 429
+    with a Retry-After header (time until a slot frees up, unless a fixed
+    `retry_after` is given), like the real API. With `capacity` set, at
+    most that many requests are served at once and the rest queue, like
+    vLLM's continuous batching with --max-num-seqs. Requests with
+    "stream": true get server-sent event chunks spread over the latency.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, latency: float = 0.8, jitter: float = 0.2,
+                 rpm: Optional[int] = None, retry_after: Optional[float] = None,
+                 capacity: Optional[int] = None):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.slots = threading.BoundedSemaphore(capacity) if capacity else None
+        self.recent = deque()
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'rate_limited': 0, 'max_in_flight': 0}
+        self._in_flight = 0
+
+    def admit(self) -> Optional[float]:
+        """Count a request against the per-minute limit; Retry-After seconds if over it"""
+        now = time.monotonic()
+        with self.lock:
+            self.stats['requests'] += 1
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if self.rpm and len(self.recent) >= self.rpm:
+                self.stats['rate_limited'] += 1
+                if self.retry_after is not None:
+                    return self.retry_after
+                return round(60 - (now - self.recent[0]), 2)
+            self.recent.append(now)
+            return None
+
+    @contextmanager
+    def serving(self):
+        """Hold one of `capacity` batch slots while generating"""
+        if self.slots:
+            self.slots.acquire()
+        with self.lock:
+            self._in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self._in_flight -= 1
+            if self.slots:
+                self.slots.release()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, as the API and vLLM do
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._reply(200, {'object': 'list', 'data': [{'id': 'stub', 'object': 'model'}]})
+        else:
+            self._reply(404, {'error': {'message': f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._reply(404, {'error': {'message': f"Unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+
+        retry_after = self.server.admit()
+        if retry_after is not None:
+            self._reply(429, {'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                        'code': 'rate_limit_exceeded'}},
+                        {'Retry-After': str(retry_after)})
+            return
+
+        messages = request.get('messages', [])
+        content = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
+        latency = self.server.latency + random.uniform(0, self.server.jitter)
+
+        with self.server.serving():
+            if request.get('stream'):
+                self._stream(request, content, latency)
+                return
+            time.sleep(latency)
+
+        prompt_tokens = sum(len(m.get('content', '')) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        self._reply(200, {
+            'id': f"chatcmpl-stub-{self.server.stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens}
+        })
+
+    def _stream(self, request: dict, content: str, latency: float, pieces: int = 8):
+        """Send content as chat.completion.chunk events over `latency` seconds"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        step = max(1, -(-len(content) // pieces))
+        deltas = [{'role': 'assistant'}] + [{'content': content[i:i + step]}
+                                            for i in range(0, len(content), step)]
+        try:
+            for n, delta in enumerate(deltas):
+                time.sleep(latency / len(deltas))
+                chunk = {'id': f"chatcmpl-stub-{self.server.stats['requests']}",
+                         'object': 'chat.completion.chunk', 'model': request.get('model', 'stub'),
+                         'choices': [{'index': 0, 'delta': delta,
+                                      'finish_reason': 'stop' if n == len(deltas) - 1 else None}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client gave up (timeout)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+    def _reply(self, status: int, body: dict, headers: Optional[dict] = None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+
+def start_stub_server(port: int = 0, **options) -> Tuple[StubOpenAIServer, str]:
+    """
+    Run the stub in a background thread
+
+    Returns:
+        Tuple of (server, base_url), base_url ending in /v1
+    """
+    server = StubOpenAIServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server")
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--latency', type=float, default=0.8, help='Seconds per request')
+    parser.add_argument('--jitter', type=float, default=0.2, help='Extra random seconds per request')
+    parser.add_argument('--rpm', type=int, help='Requests per minute before answering 429')
+    parser.add_argument('--retry-after', type=float, help='Fixed Retry-After for 429s (default: until a slot frees)')
+    parser.add_argument('--capacity', type=int, help='Requests served at once; the rest queue')
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(('127.0.0.1', args.port), latency=args.latency, jitter=args.jitter,
+                              rpm=args.rpm, retry_after=args.retry_after, capacity=args.capacity)
+    print(f"OpenAI stub listening on http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Compiled Glossary Format for Enfermera Elena
+Memory-mapped, read-only glossary tiers shared by every worker process
+
+File layout:
+    magic (8 bytes) | format version (u32 LE) | header length (u32 LE) | JSON header
+    then, per tier, 8-byte aligned sections in host byte order:
+        key offsets (u64 * (count + 1)) | key bytes (sorted UTF-8)
+        value offsets (u64 * (count + 1)) | value bytes
+
+The JSON header records the size, mtime and SHA-256 of every source CSV
+so a stale artifact is detected and rebuilt instead of silently used.
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import logging
+import tempfile
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from glossary.matcher import (
+    GlossaryMatch, SPACE_SYMBOL, GAP_SYMBOL, canonical_key, select_longest, tokenize
+)
+
+logger = logging.getLogger(__name__)
+
+# Source CSVs the tiered glossary cache is built from (inside the glossary dir)
+GLOSSARY_SOURCES = ("glossary_comprehensive.csv", "glossary_single_words.csv")
+
+MAGIC = b'EEGLOSS\x00'
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct('<8sII')
+_ALIGN = 8
+
+
+class GlossaryCacheError(Exception):
+    """Compiled glossary is missing, corrupt or unreadable"""
+
+
+class StaleGlossaryError(GlossaryCacheError):
+    """Compiled glossary no longer matches its source CSV files"""
+
+
+def source_fingerprint(path: Path) -> Dict:
+    """Size, mtime and content hash of a source file"""
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    }
+
+
+def _source_unchanged(path: Path, recorded: Dict) -> bool:
+    """Check a source against its recorded fingerprint (hash only if touched)"""
+    if not path.exists():
+        return False
+    stat = path.stat()
+    if stat.st_size != recorded['size']:
+        return False
+    if stat.st_mtime_ns == recorded['mtime_ns']:
+        return True
+    return source_fingerprint(path)['sha256'] == recorded['sha256']
+
+
+def glossary_sources(glossary_dir: Path) -> List[Path]:
+    """The GLOSSARY_SOURCES present in glossary_dir"""
+    return [Path(glossary_dir) / name for name in GLOSSARY_SOURCES
+            if (Path(glossary_dir) / name).exists()]
+
+
+def _pad(length: int) -> int:
+    return (-length) % _ALIGN
+
+
+def write_compiled_glossary(path: Path,
+                            tiers: Dict[str, Dict[str, str]],
+                            sources: Sequence[Path] = ()) -> Path:
+    """
+    Compile glossary tiers into a memory-mappable file
+
+    Args:
+        path: Output file
+        tiers: Mapping of tier name -> {es_term: en_term}
+        sources: Source CSV files the tiers were built from
+
+    Returns:
+        Path of the written artifact
+    """
+    path = Path(path)
+    base_dir = path.parent.resolve()
+
+    sections = []
+    tier_index = {}
+    unique_terms = set()
+    offset = 0  # Relative to the start of the data area
+
+    for name, entries in tiers.items():
+        canonical = {}
+        for term, value in entries.items():
+            key = canonical_key(term)
+            if key:
+                canonical[key.encode('utf-8')] = value.encode('utf-8')
+        keys = sorted(canonical)
+        unique_terms.update(keys)
+
+        tier_info = {'count': len(keys)}
+        for label, blobs in (('keys', keys), ('values', [canonical[k] for k in keys])):
+            offsets = array('Q', [0])
+            for blob in blobs:
+                offsets.append(offsets[-1] + len(blob))
+            offset_bytes = offsets.tobytes()
+            data = b''.join(blobs)
+
+            tier_info[f'{label}_index'] = offset
+            sections.append(offset_bytes)
+            offset += len(offset_bytes)
+
+            tier_info[f'{label}_data'] = offset
+            sections.append(data + b'\x00' * _pad(len(data)))
+            offset += len(data) + _pad(len(data))
+
+        tier_index[name] = tier_info
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'created': datetime.now().isoformat(),
+        'byteorder': sys.byteorder,
+        'unique_terms': len(unique_terms),
+        'sources': {
+            os.path.relpath(Path(source).resolve(), base_dir): source_fingerprint(Path(source))
+            for source in sources
+        },
+        'tiers': tier_index
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    header_bytes += b' ' * _pad(_PREAMBLE.size + len(header_bytes))
+
+    # Write atomically so concurrent workers never map a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for section in sections:
+                f.write(section)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+    logger.info(f"Compiled {len(unique_terms)} glossary terms to {path}")
+    return path
+
+
+class CompiledTier:
+    """
+    Read-only glossary tier backed by the mapped file
+
+    Supports the dict lookups the translators use (``in``, ``[]``,
+    ``get``, ``len``) plus the GlossaryMatcher ``find``/``find_all`` API,
+    all without materializing the tier in Python objects.
+    """
+
+    def __init__(self, buffer: mmap.mmap, data_start: int, info: Dict):
+        self._buffer = buffer
+        self._count = info['count']
+        view = memoryview(buffer)
+        self._key_offsets = self._offsets(view, data_start + info['keys_index'])
+        self._value_offsets = self._offsets(view, data_start + info['values_index'])
+        self._keys_base = data_start + info['keys_data']
+        self._values_base = data_start + info['values_data']
+
+    def release(self):
+        """Drop the views into the mapping so it can be closed"""
+        self._key_offsets.release()
+        self._value_offsets.release()
+
+    def _offsets(self, view: memoryview, start: int) -> memoryview:
+        end = start + (self._count + 1) * 8
+        return view[start:end].cast('Q')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, term: str) -> bool:
+        return self._find_exact(canonical_key(term).encode('utf-8')) is not None
+
+    def __getitem__(self, term: str) -> str:
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def _key(self, index: int) -> bytes:
+        start = self._keys_base + self._key_offsets[index]
+        end = self._keys_base + self._key_offsets[index + 1]
+        return self._buffer[start:end]
+
+    def _value(self, index: int) -> str:
+        start = self._values_base + self._value_offsets[index]
+        end = self._values_base + self._value_offsets[index + 1]
+        return self._buffer[start:end].decode('utf-8')
+
+    def _lower_bound(self, target: bytes) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find_exact(self, key: bytes) -> Optional[int]:
+        index = self._lower_bound(key)
+        if index < self._count and self._key(index) == key:
+            return index
+        return None
+
+    def get(self, term: str, default: Optional[str] = None) -> Optional[str]:
+        """Exact lookup of a single term"""
+        index = self._find_exact(canonical_key(term).encode('utf-8'))
+        return self._value(index) if index is not None else default
+
+    def keys(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._key(index).decode('utf-8')
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for index in range(self._count):
+            yield self._key(index).decode('utf-8'), self._value(index)
+
+    def find_all(self, text: str) -> List[GlossaryMatch]:
+        """
+        Find every glossary hit by walking the sorted key table
+
+        From each token, the phrase is extended one symbol at a time while
+        some key still starts with it, so the work per token is bounded by
+        the longest matching term, not by the glossary size.
+        """
+        symbols = list(tokenize(text))
+        hits = []
+
+        for first, (symbol, start, _) in enumerate(symbols):
+            if symbol in (SPACE_SYMBOL, GAP_SYMBOL):
+                continue
+
+            phrase = b''
+            for symbol, _, end in symbols[first:]:
+                if symbol == GAP_SYMBOL:
+                    break
+                phrase += symbol.encode('utf-8')
+                index = self._lower_bound(phrase)
+                if index >= self._count:
+                    break
+                key = self._key(index)
+                if key == phrase:
+                    hits.append(GlossaryMatch(
+                        start=start,
+                        end=end,
+                        term=key.decode('utf-8'),
+                        value=self._value(index)
+                    ))
+                elif not key.startswith(phrase):
+                    break
+
+        return hits
+
+    def find(self, text: str) -> List[GlossaryMatch]:
+        """Find non-overlapping glossary hits, longest match wins"""
+        return select_longest(self.find_all(text))
+
+
+class CompiledGlossary:
+    """Memory-mapped compiled glossary with one CompiledTier per tier"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            with open(self.path, 'rb') as f:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise GlossaryCacheError(f"cannot map {self.path}: {e}") from e
+
+        try:
+            magic, version, header_length = _PREAMBLE.unpack_from(self._buffer, 0)
+            if magic != MAGIC:
+                raise GlossaryCacheError(f"{self.path} is not a compiled glossary")
+            if version != FORMAT_VERSION:
+                raise StaleGlossaryError(
+                    f"format version {version}, expected {FORMAT_VERSION}"
+                )
+            header_end = _PREAMBLE.size + header_length
+            self.header = json.loads(self._buffer[_PREAMBLE.size:header_end])
+            if self.header.get('byteorder') != sys.byteorder:
+                raise StaleGlossaryError("compiled on a host with different byte order")
+            self.tiers = {
+                name: CompiledTier(self._buffer, header_end, info)
+                for name, info in self.header['tiers'].items()
+            }
+        except (struct.error, ValueError, KeyError) as e:
+            self._buffer.close()
+            raise GlossaryCacheError(f"corrupt compiled glossary {self.path}: {e}") from e
+        except GlossaryCacheError:
+            self._buffer.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, tier: str) -> CompiledTier:
+        return self.tiers[tier]
+
+    @property
+    def unique_terms(self) -> int:
+        return self.header.get('unique_terms', 0)
+
+    def validate_sources(self, sources: Optional[Sequence[Path]] = None):
+        """
+        Raise StaleGlossaryError if any recorded source changed
+
+        Args:
+            sources: Expected source files; adding or removing a source
+                     also invalidates the artifact
+        """
+        base_dir = self.path.parent.resolve()
+        recorded = self.header.get('sources', {})
+
+        if sources is not None:
+            expected = {os.path.relpath(Path(s).resolve(), base_dir) for s in sources}
+            if expected != set(recorded):
+                raise StaleGlossaryError(
+                    f"source set changed: {sorted(expected)} != {sorted(recorded)}"
+                )
+
+        for name, fingerprint in recorded.items():
+            if not _source_unchanged(base_dir / name, fingerprint):
+                raise StaleGlossaryError(f"source {name} changed since compilation")
+
+    def close(self):
+        for tier in self.tiers.values():
+            tier.release()
+        self.tiers = {}
+        self._buffer.close()
+
+
+def open_compiled_glossary(path: Path,
+                           sources: Optional[Sequence[Path]] = None) -> CompiledGlossary:
+    """
+    Open and validate a compiled glossary
+
+    Raises:
+        GlossaryCacheError: missing or corrupt artifact
+        StaleGlossaryError: sources changed since compilation
+    """
+    if not Path(path).exists():
+        raise GlossaryCacheError(f"no compiled glossary at {path}")
+
+    glossary = CompiledGlossary(path)
+    try:
+        glossary.validate_sources(sources)
+    except StaleGlossaryError:
+        glossary.close()
+        raise
+    return glossary
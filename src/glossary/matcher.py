@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick Glossary Matcher for Enfermera Elena
+Finds every word-bounded glossary term in a single left-to-right pass
+"""
+
+import re
+import logging
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Words (letters, digits, underscore) or single punctuation characters.
+# Placeholders such as __PRESERVE_0__ are a single token, so glossary
+# terms can never match inside them.
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+# Symbols fed to the automaton between two tokens
+SPACE_SYMBOL = ' '   # exactly one space, as in normalized glossary terms
+GAP_SYMBOL = '\n'    # newlines, tabs or runs of spaces (layout gaps)
+
+
+@dataclass
+class GlossaryMatch:
+    """Represents a glossary hit in text"""
+    start: int
+    end: int
+    term: str
+    value: str
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Turn text into automaton symbols
+
+    Yields:
+        (symbol, start, end) tuples; token symbols are lowercased and
+        separator symbols are emitted between non-adjacent tokens
+    """
+    prev_end = None
+    for match in TOKEN_PATTERN.finditer(text):
+        start = match.start()
+        if prev_end is not None and start > prev_end:
+            gap = SPACE_SYMBOL if text[prev_end:start] == ' ' else GAP_SYMBOL
+            yield gap, prev_end, start
+        yield match.group().lower(), start, match.end()
+        prev_end = match.end()
+
+
+def canonical_key(term: str) -> str:
+    """Normalized form of a term: lowercased symbols, single spaces"""
+    return ''.join(symbol for symbol, _, _ in tokenize(' '.join(term.split())))
+
+
+class GlossaryMatcher:
+    """
+    Multi-pattern matcher compiled once from a glossary
+
+    Patterns are token sequences rather than raw characters, so every hit
+    is word-bounded by construction and the automaton stays small enough
+    for the full 1.2M term UMLS glossary. Overlapping hits are resolved
+    leftmost-longest, so cost per line is independent of glossary size.
+    """
+
+    def __init__(self, glossary: Optional[Dict[str, str]] = None):
+        """
+        Initialize matcher
+
+        Args:
+            glossary: Optional mapping of Spanish term -> translation
+        """
+        self._goto: Dict[Tuple[int, str], int] = {}
+        self._children: List[List[Tuple[str, int]]] = [[]]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [-1]
+        self._depth: List[int] = [0]
+        self._terminals: Dict[int, Tuple[str, str]] = {}
+        self._compiled = True
+
+        if glossary:
+            self.add_terms(glossary.items())
+            self.compile()
+
+    def __len__(self) -> int:
+        return len(self._terminals)
+
+    def __contains__(self, term: str) -> bool:
+        return self.get(term) is not None
+
+    def __getitem__(self, term: str) -> str:
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+    def add(self, term: str, value: str):
+        """Add a single term; later additions of the same term win"""
+        symbols = [symbol for symbol, _, _ in tokenize(' '.join(term.split()))]
+        if not symbols:
+            return
+
+        node = 0
+        for symbol in symbols:
+            child = self._goto.get((node, symbol))
+            if child is None:
+                child = len(self._depth)
+                self._goto[(node, symbol)] = child
+                self._children[node].append((symbol, child))
+                self._children.append([])
+                self._fail.append(0)
+                self._output.append(-1)
+                self._depth.append(self._depth[node] + 1)
+            node = child
+
+        self._terminals[node] = (term.lower().strip(), value)
+        self._compiled = False
+
+    def add_terms(self, items: Iterable[Tuple[str, str]]):
+        """Add many (term, value) pairs"""
+        for term, value in items:
+            self.add(term, value)
+
+    def compile(self):
+        """Build failure and output links (breadth-first)"""
+        queue = deque()
+        for _, child in self._children[0]:
+            self._fail[child] = 0
+            self._output[child] = -1
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for symbol, child in self._children[node]:
+                fallback = self._fail[node]
+                while fallback and (fallback, symbol) not in self._goto:
+                    fallback = self._fail[fallback]
+                target = self._goto.get((fallback, symbol), 0)
+                self._fail[child] = target
+                self._output[child] = (
+                    target if target in self._terminals else self._output[target]
+                )
+                queue.append(child)
+
+        self._compiled = True
+        logger.debug(f"Compiled glossary automaton: {len(self._terminals)} terms, "
+                     f"{len(self._depth)} states")
+
+    def get(self, term: str, default: Optional[str] = None) -> Optional[str]:
+        """Exact lookup of a single term"""
+        node = 0
+        for symbol, _, _ in tokenize(' '.join(term.split())):
+            node = self._goto.get((node, symbol))
+            if node is None:
+                return default
+        entry = self._terminals.get(node)
+        return entry[1] if entry else default
+
+    def lookup_many(self, terms: Iterable[str]) -> List[Optional[str]]:
+        """Exact lookup of many terms (None where missing)"""
+        return [self.get(term) for term in terms]
+
+    def find_all(self, text: str) -> List[GlossaryMatch]:
+        """Find every glossary hit, including overlapping ones"""
+        if not self._compiled:
+            self.compile()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        depth = self._depth
+        terminals = self._terminals
+
+        starts: List[int] = []
+        hits: List[GlossaryMatch] = []
+        state = 0
+
+        for index, (symbol, start, end) in enumerate(tokenize(text)):
+            starts.append(start)
+            while state and (state, symbol) not in goto:
+                state = fail[state]
+            state = goto.get((state, symbol), 0)
+
+            node = state if state in terminals else output[state]
+            while node > 0:
+                term, value = terminals[node]
+                hits.append(GlossaryMatch(
+                    start=starts[index - depth[node] + 1],
+                    end=end,
+                    term=term,
+                    value=value
+                ))
+                node = output[node]
+
+        return hits
+
+    def find(self, text: str) -> List[GlossaryMatch]:
+        """
+        Find non-overlapping glossary hits, longest match wins
+
+        Returns:
+            List of GlossaryMatch objects, sorted by position
+        """
+        return select_longest(self.find_all(text))
+
+    def replace(self, text: str) -> Tuple[str, int]:
+        """
+        Replace all glossary hits with their values
+
+        Returns:
+            Tuple of (replaced_text, number_of_replacements)
+        """
+        matches = self.find(text)
+        return apply_matches(text, matches), len(matches)
+
+
+def select_longest(hits: List[GlossaryMatch]) -> List[GlossaryMatch]:
+    """Resolve overlapping hits leftmost-longest"""
+    hits = sorted(hits, key=lambda m: (m.start, -m.end))
+
+    selected = []
+    last_end = -1
+    for hit in hits:
+        if hit.start >= last_end:
+            selected.append(hit)
+            last_end = hit.end
+
+    return selected
+
+
+def merge_tiers(*tiers: List[GlossaryMatch]) -> List[GlossaryMatch]:
+    """
+    Combine raw hits (from find_all) of several matchers
+
+    Earlier tiers take priority; hits of a later tier only fill the gaps
+    left between accepted matches, again resolved leftmost-longest.
+    """
+    accepted: List[GlossaryMatch] = []
+    for hits in tiers:
+        starts = [match.start for match in accepted]
+        candidates = []
+        for hit in hits:
+            index = bisect_left(starts, hit.end)
+            if index and accepted[index - 1].end > hit.start:
+                continue  # Overlaps a higher priority match
+            candidates.append(hit)
+        accepted = sorted(accepted + select_longest(candidates),
+                          key=lambda m: m.start)
+
+    return accepted
+
+
+def apply_matches(text: str, matches: List[GlossaryMatch]) -> str:
+    """Rebuild text with every match replaced, in a single join"""
+    if not matches:
+        return text
+
+    parts = []
+    position = 0
+    for match in matches:
+        parts.append(text[position:match.start])
+        parts.append(match.value)
+        position = match.end
+    parts.append(text[position:])
+
+    return ''.join(parts)
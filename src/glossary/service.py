@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Glossary Lookup Service for Enfermera Elena
+Loads glossaries once and answers lookups over a Unix domain socket
+
+Start it before processing many small documents:
+    python src/glossary/service.py --preload data/glossaries/glossary_comprehensive.csv
+
+Translators call load_glossary(); it returns a RemoteGlossary when the
+service is running and an in-process GlossaryMatcher otherwise, both with
+the same get/find/find_all interface.
+
+The socket lives in a per-user directory ($XDG_RUNTIME_DIR, or a 0700
+directory under the temp dir), and clients only talk to a service run by
+their own user, since requests carry document text.
+
+Protocol: one JSON object per line in each direction, e.g.
+    {"op": "match", "glossary": {"path": ..., "tier": null}, "texts": [...], "mode": "longest"}
+    {"ok": true, "result": [[[start, end, term, value], ...], ...]}
+"""
+
+import os
+import sys
+import csv
+import json
+import signal
+import struct
+import socket
+import logging
+import threading
+import socketserver
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from glossary.matcher import GlossaryMatch, GlossaryMatcher
+
+logger = logging.getLogger(__name__)
+
+
+
+def default_socket_path() -> str:
+    """ENFERMERA_GLOSSARY_SOCKET, else glossary.sock in this user's runtime directory"""
+    if os.getenv('ENFERMERA_GLOSSARY_SOCKET'):
+        return os.getenv('ENFERMERA_GLOSSARY_SOCKET')
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        base = Path(runtime_dir) / 'enfermera_elena'
+    else:
+        base = Path(tempfile.gettempdir()) / f'enfermera_elena-{os.getuid()}'
+    return str(base / 'glossary.sock')
+
+
+DEFAULT_SOCKET = default_socket_path()
+
+
+class GlossaryServiceError(Exception):
+    """The glossary service rejected a request"""
+
+
+def _private_directory(path: Path):
+    """Create the socket directory (0700) or check that only this user can write to it"""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    stat = os.lstat(path)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        raise PermissionError(f"{path} must be a directory owned and writable only by this user")
+
+
+def _check_owner(sock: socket.socket, socket_path: str):
+    """Refuse a service run by another user: socket file owner and peer credentials"""
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} is owned by another user")
+    if hasattr(socket, 'SO_PEERCRED'):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, uid, _ = struct.unpack('3i', creds)
+        if uid != os.getuid():
+            raise PermissionError(f"glossary service at {socket_path} runs as uid {uid}")
+
+
+def load_local_glossary(path: str, tier: Optional[str] = None) -> GlossaryMatcher:
+    """
+    Load a glossary in-process
+
+    Args:
+        path: Glossary CSV (es_term, en_term columns) or, with tier,
+              a compiled glossary cache
+        tier: Tier name inside a compiled glossary
+    """
+    matcher = GlossaryMatcher()
+
+    if tier is not None:
+        from glossary.compiled import open_compiled_glossary
+        with open_compiled_glossary(Path(path)) as compiled:
+            matcher.add_terms(compiled[tier].items())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                es_term = (row.get('es_term') or '').lower()
+                en_term = row.get('en_term') or ''
+                if es_term.strip() and en_term:
+                    matcher.add(es_term, en_term)
+
+    matcher.compile()
+    logger.info(f"Loaded {len(matcher)} glossary terms from {path}")
+    return matcher
+
+
+class GlossaryService:
+    """Keeps loaded glossaries in memory and serves socket requests"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET):
+        self.socket_path = socket_path
+        self._glossaries: Dict[Tuple[str, Optional[str]], Tuple[Tuple[int, int], GlossaryMatcher]] = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests_served = 0
+
+    def get_glossary(self, path: str, tier: Optional[str] = None) -> GlossaryMatcher:
+        """Return a loaded glossary, (re)loading it if the file changed"""
+        resolved = str(Path(path).resolve())
+        stat = os.stat(resolved)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        key = (resolved, tier)
+
+        with self._lock:
+            cached = self._glossaries.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+            matcher = load_local_glossary(resolved, tier)
+            self._glossaries[key] = (signature, matcher)
+            return matcher
+
+    def handle(self, request: Dict) -> Any:
+        """Dispatch a single decoded request"""
+        op = request.get('op')
+        with self._stats_lock:
+            self.requests_served += 1
+            served = self.requests_served
+
+        if op == 'ping':
+            return {'glossaries': len(self._glossaries), 'requests': served}
+
+        spec = request.get('glossary') or {}
+        if 'path' not in spec:
+            raise GlossaryServiceError(f"'{op}' request without glossary path")
+        matcher = self.get_glossary(spec['path'], spec.get('tier'))
+
+        if op == 'info':
+            return {'size': len(matcher)}
+        if op == 'lookup':
+            return [matcher.get(term) for term in request.get('terms', [])]
+        if op == 'match':
+            find = matcher.find_all if request.get('mode') == 'all' else matcher.find
+            return [
+                [[m.start, m.end, m.term, m.value] for m in find(text)]
+                for text in request.get('texts', [])
+            ]
+
+        raise GlossaryServiceError(f"unknown op: {op}")
+
+    def serve_forever(self, preload: Optional[List[str]] = None):
+        """Load glossaries and serve until interrupted"""
+        for path in preload or []:
+            self.get_glossary(path)
+
+        _private_directory(Path(self.socket_path).parent)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+
+        # Requests carry document text: the socket is 0600 from the moment it exists
+        umask = os.umask(0o177)
+        try:
+            server = _UnixServer(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+        server.service = self
+        logger.info(f"Glossary service listening on {self.socket_path}")
+
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests on one connection"""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                result = self.server.service.handle(json.loads(line))
+                response = {'ok': True, 'result': result}
+            except Exception as e:
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class GlossaryClient:
+    """Persistent connection to the glossary service (thread-safe)"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 120):
+        self.socket_path = socket_path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(socket_path)
+            _check_owner(self._socket, socket_path)
+        except OSError:
+            self._socket.close()
+            raise
+        self._file = self._socket.makefile('rwb')
+        self._lock = threading.Lock()
+
+    def request(self, op: str, **params) -> Any:
+        """Send a request and wait for its result"""
+        payload = json.dumps(dict(params, op=op), ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            self._file.write(payload + b'\n')
+            self._file.flush()
+            line = self._file.readline()
+
+        if not line:
+            raise ConnectionError("glossary service closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise GlossaryServiceError(response.get('error', 'unknown error'))
+        return response['result']
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+_shared_client: Optional[GlossaryClient] = None
+
+
+def connect_service(socket_path: Optional[str] = None) -> Optional[GlossaryClient]:
+    """
+    Connect to a running glossary service
+
+    Returns:
+        GlossaryClient, or None if the service is not running or is
+        disabled with ENFERMERA_GLOSSARY_SERVICE=0
+    """
+    global _shared_client
+
+    if os.getenv('ENFERMERA_GLOSSARY_SERVICE', '1').lower() in ('0', 'false', 'off'):
+        return None
+    socket_path = socket_path or DEFAULT_SOCKET
+    if _shared_client is not None and _shared_client.socket_path == socket_path:
+        try:
+            _shared_client.request('ping')
+            return _shared_client
+        except OSError as e:
+            logger.debug(f"Glossary service connection lost: {e}")
+            drop_client(_shared_client)
+    if not os.path.exists(socket_path):
+        return None
+
+    try:
+        client = GlossaryClient(socket_path)
+        client.request('ping')
+    except PermissionError as e:
+        logger.warning(f"Not using glossary service: {e}")
+        return None
+    except OSError as e:
+        logger.debug(f"Glossary service not reachable at {socket_path}: {e}")
+        return None
+
+    _shared_client = client
+    return client
+
+
+def drop_client(client: GlossaryClient):
+    """Close a client whose connection failed, so connect_service() reconnects"""
+    global _shared_client
+
+    if _shared_client is client:
+        _shared_client = None
+    try:
+        client.close()
+    except OSError:
+        pass
+
+
+class RemoteGlossary:
+    """
+    Glossary served by the glossary service
+
+    Mirrors the GlossaryMatcher lookup API. If the service goes away
+    mid-run, the glossary is loaded in-process and work continues.
+    """
+
+    def __init__(self, client: GlossaryClient, path: str, tier: Optional[str] = None):
+        self.client = client
+        self.spec = {'path': str(Path(path).resolve()), 'tier': tier}
+        self._local: Optional[GlossaryMatcher] = None
+        info = self._call('info')
+        self._size = info['size'] if info is not None else len(self._local)
+
+    def _call(self, op: str, **params) -> Any:
+        try:
+            return self.client.request(op, glossary=self.spec, **params)
+        except OSError as e:
+            logger.warning(f"Glossary service unavailable ({e}), loading in-process")
+            drop_client(self.client)
+            self._local = load_local_glossary(self.spec['path'], self.spec['tier'])
+            return None
+
+    def __len__(self) -> int:
+        return len(self._local) if self._local else self._size
+
+    def __contains__(self, term: str) -> bool:
+        return self.get(term) is not None
+
+    def __getitem__(self, term: str) -> str:
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+    def get(self, term: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.lookup_many([term])[0]
+        return default if value is None else value
+
+    def lookup_many(self, terms: List[str]) -> List[Optional[str]]:
+        """Look up many terms in one round trip"""
+        if not self._local:
+            result = self._call('lookup', terms=list(terms))
+            if result is not None:
+                return result
+        return self._local.lookup_many(terms)
+
+    def find_many(self, texts: List[str], mode: str = 'longest') -> List[List[GlossaryMatch]]:
+        """Match many texts in one round trip ('longest' or 'all' hits)"""
+        if not self._local:
+            result = self._call('match', texts=list(texts), mode=mode)
+            if result is not None:
+                return [[GlossaryMatch(*hit) for hit in hits] for hits in result]
+        find = self._local.find_all if mode == 'all' else self._local.find
+        return [find(text) for text in texts]
+
+    def find(self, text: str) -> List[GlossaryMatch]:
+        return self.find_many([text])[0]
+
+    def find_all(self, text: str) -> List[GlossaryMatch]:
+        return self.find_many([text], mode='all')[0]
+
+
+def load_glossary(path: str,
+                  tier: Optional[str] = None,
+                  use_service: bool = True) -> Union[RemoteGlossary, GlossaryMatcher]:
+    """
+    Get a glossary from the service if it is running, else load it here
+
+    Args:
+        path: Glossary CSV, or compiled glossary cache when tier is given
+        tier: Tier name inside a compiled glossary
+        use_service: Set False to always load in-process
+    """
+    if use_service:
+        client = connect_service()
+        if client:
+            try:
+                glossary = RemoteGlossary(client, path, tier)
+                logger.info(f"Using glossary service for {path} ({len(glossary)} terms)")
+                return glossary
+            except (GlossaryServiceError, OSError) as e:
+                logger.warning(f"Glossary service could not load {path}: {e}")
+
+    return load_local_glossary(path, tier)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enfermera Elena glossary lookup service")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket path')
+    parser.add_argument('--preload', nargs='*', default=[],
+                        help='Glossary CSVs to load at startup')
+    parser.add_argument('--ping', action='store_true', help='Check a running service')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.ping:
+        client = connect_service(args.socket)
+        if client:
+            print(f"Glossary service running: {client.request('ping')}")
+        else:
+            print(f"No glossary service at {args.socket}")
+            sys.exit(1)
+    else:
+        # Exit through serve_forever's cleanup so the socket file is removed
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            GlossaryService(args.socket).serve_forever(args.preload)
+        except KeyboardInterrupt:
+            print("\nGlossary service stopped")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the Aho-Corasick glossary matcher and match resolution
+Run with: python -m pytest src
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from glossary.matcher import GlossaryMatch, GlossaryMatcher, merge_tiers, select_longest
+
+GLOSSARY = {
+    "presión arterial": "blood pressure",
+    "presión": "pressure",
+    "arterial": "arterial",
+    "diabetes mellitus": "diabetes mellitus",
+    "diabetes mellitus tipo 2": "type 2 diabetes mellitus",
+    "mg": "mg",
+}
+
+
+def hit(start, end, value=None):
+    return GlossaryMatch(start=start, end=end, term=value or f"{start}:{end}", value=value or f"{start}:{end}")
+
+
+def spans(matches):
+    return [(m.start, m.end) for m in matches]
+
+
+def test_select_longest_prefers_leftmost_then_longest():
+    hits = [hit(4, 8), hit(0, 3), hit(0, 6), hit(6, 10), hit(10, 12)]
+    assert spans(select_longest(hits)) == [(0, 6), (6, 10), (10, 12)]
+
+
+def test_select_longest_drops_contained_hits():
+    assert spans(select_longest([hit(2, 4), hit(0, 10), hit(5, 7)])) == [(0, 10)]
+    assert select_longest([]) == []
+
+
+def test_merge_tiers_gives_earlier_tiers_priority():
+    user = [hit(5, 10, "user")]
+    base = [hit(0, 12, "base long"), hit(0, 4, "base head"), hit(11, 15, "base tail")]
+    merged = merge_tiers(user, base)
+    assert [m.value for m in merged] == ["base head", "user", "base tail"]
+
+
+def test_merge_tiers_fills_gaps_leftmost_longest():
+    merged = merge_tiers([hit(10, 14)], [hit(0, 3), hit(0, 8), hit(8, 10), hit(14, 20), hit(16, 18)])
+    assert spans(merged) == [(0, 8), (8, 10), (10, 14), (14, 20)]
+
+
+def test_find_longest_match_wins():
+    matcher = GlossaryMatcher(GLOSSARY)
+    text = "Paciente con Diabetes Mellitus tipo 2 y presión arterial alta"
+    assert [(text[m.start:m.end], m.value) for m in matcher.find(text)] == [
+        ("Diabetes Mellitus tipo 2", "type 2 diabetes mellitus"),
+        ("presión arterial", "blood pressure"),
+    ]
+
+
+def test_find_is_word_bounded():
+    matcher = GlossaryMatcher(GLOSSARY)
+    assert matcher.find("10mg/dL") == []          # "mg" inside a token
+    assert matcher.find("__PRESERVE_0__mg") == []
+    assert spans(matcher.find("10 mg/dL")) == [(3, 5)]
+
+
+def test_layout_gap_does_not_join_terms():
+    matcher = GlossaryMatcher(GLOSSARY)
+    assert [m.value for m in matcher.find("presión\narterial")] == ["pressure", "arterial"]
+    assert [m.value for m in matcher.find("presión  arterial")] == ["pressure", "arterial"]
+
+
+def test_replace_and_exact_lookup():
+    matcher = GlossaryMatcher(GLOSSARY)
+    assert matcher.replace("Control de presión arterial: 130/80") == (
+        "Control de blood pressure: 130/80", 1)
+    assert matcher["Presión  Arterial"] == "blood pressure"
+    assert "presión venosa" not in matcher
+    assert len(matcher) == len(GLOSSARY)
+
+
+def test_terms_added_after_compile():
+    matcher = GlossaryMatcher(GLOSSARY)
+    matcher.add("tipo 2", "type 2")
+    assert [m.value for m in matcher.find("DM tipo 2")] == ["type 2"]
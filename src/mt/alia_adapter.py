@@ -7,17 +7,26 @@ Spanish-native LLM for medical translation via vLLM
 import re
 import json
 import logging
-import hashlib
 import time
-from typing import Dict, List, Optional, Tuple, Any
+import asyncio
+from typing import Dict, List, Optional, Tuple, Any, Union
 from datetime import datetime
 from pathlib import Path
 import requests
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from enum import Enum
 
+from mt.scheduler import AsyncChunkScheduler, rate_limit_delay
+from mt.segment_cache import SegmentCache, default_cache, prompt_version
+from mt.sessions import DEFAULT_POOL_SIZE, pooled_session
+
 logger = logging.getLogger(__name__)
 
+# Requests kept in flight by translate_batch/translate_document; vLLM's
+# continuous batching serves them together, so throughput grows with the
+# window until the server's batch slots (--max-num-seqs) are full
+DEFAULT_MAX_IN_FLIGHT = 8
+
 
 class TranslationMode(Enum):
     """Translation modes for different use cases"""
@@ -50,19 +59,37 @@ class ALIAMedicalTranslator:
                  timeout: int = 60,
                  max_retries: int = 3,
                  cache_enabled: bool = True,
-                 glossary_path: Optional[str] = None):
+                 persistent_cache: bool = False,
+                 glossary_path: Optional[str] = None,
+                 cache: Optional[SegmentCache] = None,
+                 session: Optional[requests.Session] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 keep_alive: bool = True,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 stream: bool = False):
         """
         Initialize ALIA translator
         
         Args:
             vllm_url: vLLM server URL
             model_name: Model name for API calls
-            timeout: Request timeout in seconds
-            max_retries: Maximum retry attempts
+            timeout: Request timeout in seconds (streamed: for the whole response)
+            max_retries: Maximum attempts per request (timeouts, server errors, 429s)
             cache_enabled: Enable translation caching
+            persistent_cache: Share the on-disk segment cache across runs and backends
+                              (stores translations unencrypted; default: in memory)
             glossary_path: Path to medical glossary CSV
+            cache: Segment cache (overrides persistent_cache)
+            session: HTTP session to use (default: a new pooled session)
+            pool_size: Keep-alive connections to vLLM (and concurrent requests)
+            keep_alive: Reuse connections between requests
+            max_in_flight: Concurrent requests in translate_batch/translate_document
+                           (1 = one at a time)
+            stream: Request streamed (SSE) responses
         """
         self.vllm_url = vllm_url.rstrip('/')
+        self.session = session or pooled_session(max(pool_size, max_in_flight), keep_alive=keep_alive)
+        self.stream = stream
         self.model_name = model_name
         self.timeout = timeout
         self.max_retries = max_retries
@@ -71,13 +98,19 @@ class ALIAMedicalTranslator:
         # PHI placeholder pattern
         self.phi_pattern = re.compile(r'__PHI_[A-Z]+_\d+__')
         
-        # Translation cache
-        self.cache = {} if cache_enabled else None
+        # Translation cache, optionally shared on disk with the other backends
+        self.cache = (cache if cache is not None else default_cache(persistent_cache)) if cache_enabled else None
         self.cache_hits = 0
         self.api_calls = 0
         
+        # Concurrent submission for batches; a 429 from a proxy in front of
+        # vLLM halves the window and pauses every request
+        self.scheduler = AsyncChunkScheduler(max_concurrency=max_in_flight,
+                                             max_retries=max_retries)
+        
         # Medical glossary
         self.glossary = {}
+        self.glossary_version = ''
         if glossary_path and Path(glossary_path).exists():
             self.load_glossary(glossary_path)
             
@@ -177,7 +210,7 @@ class ALIAMedicalTranslator:
     def check_server(self) -> bool:
         """Check if vLLM server is available"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.vllm_url}/v1/models",
                 timeout=5
             )
@@ -202,6 +235,7 @@ class ALIAMedicalTranslator:
                 if es_term and en_term:
                     self.glossary[es_term] = en_term
                     
+        self.glossary_version = prompt_version(self.glossary)
         logger.info(f"Loaded {len(self.glossary)} glossary entries")
         
     def create_medical_prompt(self, 
@@ -335,16 +369,19 @@ TRADUCCIÓN AL INGLÉS MÉDICO:"""
                  mode: TranslationMode = TranslationMode.MEDICAL,
                  context: Optional[MedicalContext] = None,
                  temperature: float = 0.3,
-                 max_tokens: int = 2048) -> str:
+                 max_tokens: int = 2048,
+                 raise_rate_limit: bool = False) -> str:
         """
         Translate medical text using ALIA-40b
         
         Args:
             text: Spanish medical text to translate
-            mode: Translation mode
+            mode: Translation mode (or its value, e.g. 'medical')
             context: Medical context for enhanced translation
             temperature: LLM temperature (0-1)
             max_tokens: Maximum output tokens
+            raise_rate_limit: Raise rate-limit errors instead of returning the
+                              original text (for the batch scheduler's backoff)
             
         Returns:
             Translated English text with PHI preserved
@@ -352,24 +389,27 @@ TRADUCCIÓN AL INGLÉS MÉDICO:"""
         if not text or not text.strip():
             return text
             
+        mode = TranslationMode(mode)
+        
+        # Use default context if not provided
+        if context is None:
+            context = MedicalContext()
+            
         # Use cache if enabled
         if self.cache_enabled:
-            cache_key = hashlib.md5(
-                f"{text}:{mode.value}:{temperature}".encode()
-            ).hexdigest()
-            
-            if cache_key in self.cache:
+            cache_version = prompt_version(
+                mode.value, temperature, max_tokens, asdict(context),
+                self.create_medical_prompt('', context), self.glossary_version
+            )
+            cached = self.cache.get(text, 'alia', self.model_name, cache_version)
+            if cached is not None:
                 self.cache_hits += 1
                 logger.debug(f"Cache hit ({self.cache_hits} total)")
-                return self.cache[cache_key]
+                return cached
                 
         # Extract PHI placeholders
         original_text, placeholders = self.extract_placeholders(text)
         
-        # Use default context if not provided
-        if context is None:
-            context = MedicalContext()
-            
         try:
             # Create appropriate prompt based on mode
             if mode == TranslationMode.DIRECT:
@@ -386,36 +426,10 @@ TRADUCCIÓN AL INGLÉS MÉDICO:"""
                 "temperature": temperature,
                 "max_tokens": max_tokens,
                 "stop": None,
-                "stream": False
+                "stream": self.stream
             }
             
-            # Make API call with retry logic
-            for attempt in range(self.max_retries):
-                try:
-                    response = requests.post(
-                        f"{self.vllm_url}/v1/chat/completions",
-                        json=payload,
-                        timeout=self.timeout
-                    )
-                    
-                    if response.status_code == 200:
-                        self.api_calls += 1
-                        break
-                    else:
-                        logger.warning(f"API returned {response.status_code}")
-                        if attempt < self.max_retries - 1:
-                            time.sleep(2 ** attempt)  # Exponential backoff
-                            
-                except requests.exceptions.Timeout:
-                    logger.warning(f"Request timeout on attempt {attempt + 1}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(2 ** attempt)
-                    else:
-                        raise
-                        
-            # Extract translation
-            result = response.json()
-            translated = result['choices'][0]['message']['content'].strip()
+            translated = self._complete(payload, raise_rate_limit).strip()
             
             # Validate PHI preservation
             if placeholders:
@@ -429,44 +443,111 @@ TRADUCCIÓN AL INGLÉS MÉDICO:"""
                 
             # Cache the result
             if self.cache_enabled:
-                self.cache[cache_key] = translated
+                self.cache.put(text, translated, 'alia', self.model_name, cache_version)
                 
             return translated
             
         except Exception as e:
+            if raise_rate_limit and rate_limit_delay(e) is not None:
+                raise
             logger.error(f"Translation failed: {e}")
             return text  # Return original on error
             
+    def _complete(self, payload: Dict[str, Any], raise_rate_limit: bool = False) -> str:
+        """
+        One chat completion with retry logic
+        
+        Timeouts, server errors and 429s are retried with exponential backoff
+        (at least the server's Retry-After for a 429).
+        
+        Args:
+            payload: Chat completion request body
+            raise_rate_limit: Raise a 429 straight away so the batch scheduler
+                              can back off instead
+            
+        Returns:
+            Generated text
+        """
+        for attempt in range(self.max_retries):
+            delay = 2 ** attempt
+            try:
+                deadline = time.monotonic() + self.timeout
+                response = self.session.post(
+                    f"{self.vllm_url}/v1/chat/completions",
+                    json=payload,
+                    timeout=self.timeout,
+                    stream=self.stream
+                )
+                
+                if response.status_code == 200:
+                    if self.stream:
+                        content = self._read_stream(response, deadline)
+                    else:
+                        content = response.json()['choices'][0]['message']['content']
+                    self.api_calls += 1
+                    return content
+                    
+                logger.warning(f"API returned {response.status_code}")
+                error = requests.exceptions.HTTPError(
+                    f"API returned {response.status_code}", response=response)
+                retry_after = rate_limit_delay(error)
+                if (raise_rate_limit and retry_after is not None) or attempt == self.max_retries - 1:
+                    raise error
+                delay = max(delay, retry_after or 0.0)
+                    
+            except requests.exceptions.Timeout:
+                logger.warning(f"Request timeout on attempt {attempt + 1}")
+                if attempt == self.max_retries - 1:
+                    raise
+                    
+            time.sleep(delay)  # Exponential backoff
+            
+        raise ValueError("max_retries must be at least 1")
+        
+    def _read_stream(self, response: requests.Response, deadline: float) -> str:
+        """Join the content deltas of a server-sent event stream, within the request deadline"""
+        parts = []
+        with response:
+            for line in response.iter_lines():
+                if time.monotonic() > deadline:
+                    raise requests.exceptions.Timeout(f"Stream exceeded {self.timeout}s")
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    break
+                choice = json.loads(data)['choices'][0]
+                parts.append(choice.get('delta', {}).get('content') or '')
+        return ''.join(parts)
+        
     def translate_batch(self,
                        texts: List[str],
-                       mode: TranslationMode = TranslationMode.MEDICAL,
-                       batch_size: int = 4) -> List[str]:
+                       mode: Union[TranslationMode, str] = TranslationMode.MEDICAL,
+                       context: Optional[MedicalContext] = None) -> List[str]:
         """
-        Translate multiple texts efficiently
+        Translate multiple texts concurrently
+        
+        Keeps up to max_in_flight requests open so vLLM batches them
+        together; each one gets its own timeout and retries. Results keep
+        the order of texts, and repeated texts are translated once.
         
         Args:
             texts: List of Spanish texts
             mode: Translation mode
-            batch_size: Number of texts per batch
+            context: Medical context for enhanced translation
             
         Returns:
             List of translated texts
         """
-        results = []
+        mode = TranslationMode(mode)
+        pending = [text for text in dict.fromkeys(texts) if text and text.strip()]
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
+        async def call(text):
+            return await asyncio.to_thread(self.translate, text, mode, context,
+                                           raise_rate_limit=True)
             
-            # Process batch
-            for text in batch:
-                translated = self.translate(text, mode)
-                results.append(translated)
-                
-            # Small delay between batches
-            if i + batch_size < len(texts):
-                time.sleep(0.5)
-                
-        return results
+        translated = dict(zip(pending, self.scheduler.map(pending, call, fallback=lambda text: text)))
+        return [translated.get(text, text) for text in texts]
         
     def translate_document(self,
                           document: str,
@@ -500,18 +581,12 @@ TRADUCCIÓN AL INGLÉS MÉDICO:"""
             expand_abbreviations=True
         )
         
-        # Split into paragraphs for better processing
+        # Split into paragraphs, translated in parallel and rejoined in order
         paragraphs = document.split('\n\n')
-        translated_paragraphs = []
+        translated_paragraphs = self.translate_batch(paragraphs, mode, context)
         
-        for para in paragraphs:
-            if para.strip():
-                translated = self.translate(para, mode, context)
-                translated_paragraphs.append(translated)
-            else:
-                translated_paragraphs.append('')
-                
-        return '\n\n'.join(translated_paragraphs)
+        return '\n\n'.join(translated if para.strip() else ''
+                           for para, translated in zip(paragraphs, translated_paragraphs))
         
     def get_stats(self) -> Dict[str, Any]:
         """Get translation statistics"""
@@ -520,9 +595,11 @@ TRADUCCIÓN AL INGLÉS MÉDICO:"""
         return {
             'api_calls': self.api_calls,
             'cache_hits': self.cache_hits,
-            'cache_size': len(self.cache) if self.cache else 0,
+            'cache_size': len(self.cache) if self.cache is not None else 0,
             'cache_hit_rate': self.cache_hits / total_requests if total_requests > 0 else 0,
-            'total_translations': total_requests
+            'segment_cache': self.cache.get_stats() if self.cache is not None else None,
+            'total_translations': total_requests,
+            'rate_limited': self.scheduler.stats['rate_limited']
         }
         
 
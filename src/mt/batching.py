@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Delimited Segment Batching for Enfermera Elena
+Packs many short segments into one backend request and splits the translation back
+"""
+
+import re
+import logging
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Numbered marker on its own line before each segment, e.g. "[#12]".
+# Digits and brackets survive LibreTranslate, OpenAI and ALIA untouched;
+# the parser also accepts the spacing variants models sometimes produce.
+MARKER = "[#{}]"
+MARKER_PATTERN = re.compile(r'^[ \t]*\[\s*#\s*(\d+)\s*\][ \t]*$', re.MULTILINE)
+
+# Keeps one batched request well inside backend request limits
+DEFAULT_MAX_BATCH_CHARS = 4000
+
+
+def pack_segments(texts: List[str]) -> str:
+    """Join segments into one text, each preceded by its numbered marker line"""
+    return '\n\n'.join(f"{MARKER.format(i)}\n{text.strip()}" for i, text in enumerate(texts))
+
+
+def split_segments(translated: str, count: int) -> List[Optional[str]]:
+    """
+    Split a translated batch back into its segments
+
+    A segment is accepted only when its own marker and the next one (or
+    the end of text, for the last segment) come back in order, so a
+    dropped or merged marker never shifts text into a neighbouring slot,
+    and a marker that comes back twice fails its segment.
+
+    Returns:
+        One translation per segment, None where alignment failed
+    """
+    results: List[Optional[str]] = [None] * count
+    markers = [(int(m.group(1)), m.start(), m.end()) for m in MARKER_PATTERN.finditer(translated)]
+    occurrences = Counter(index for index, _, _ in markers)
+
+    for position, (index, _, end) in enumerate(markers):
+        if index >= count or occurrences[index] > 1:  # Repeated marker: ambiguous
+            continue
+        if position + 1 < len(markers):
+            next_index, next_start, _ = markers[position + 1]
+            if next_index != index + 1:
+                continue
+        elif index != count - 1:
+            continue
+        else:
+            next_start = len(translated)
+
+        results[index] = translated[end:next_start].strip() or None
+
+    return results
+
+
+def plan_batches(texts: List[str],
+                 max_chars: int = DEFAULT_MAX_BATCH_CHARS,
+                 max_segments: Optional[int] = None) -> List[List[int]]:
+    """Group segment indexes, in order, into batches of at most max_chars packed characters"""
+    batches: List[List[int]] = []
+    size = 0
+    for i, text in enumerate(texts):
+        length = len(text) + len(MARKER.format(i)) + 3
+        if (batches and size + length <= max_chars
+                and (max_segments is None or len(batches[-1]) < max_segments)):
+            batches[-1].append(i)
+            size += length
+        else:
+            batches.append([i])
+            size = length
+    return batches
+
+
+def translate_batched(texts: List[str],
+                      translate: Optional[Callable[[str], str]],
+                      max_chars: int = DEFAULT_MAX_BATCH_CHARS,
+                      max_segments: Optional[int] = None,
+                      stats: Optional[Dict[str, int]] = None,
+                      translate_many: Optional[Callable[[List[str]], List[Optional[str]]]] = None
+                      ) -> List[Optional[str]]:
+    """
+    Translate segments with one backend call per batch
+
+    Segments whose markers do not align in the batched output are
+    retranslated one by one; everything else comes from the batch.
+    A batch that comes back exactly as sent is treated the same way:
+    the adapters return their input when a request fails, and the
+    markers of an echoed batch still align. A request the backend
+    failed (translate_many returned None) is not retried: its segments
+    come back as None.
+
+    Args:
+        texts: Segments to translate
+        translate: Backend call, text -> translated text
+        max_chars: Size bound for one batched request
+        max_segments: Optional cap on segments per batched request
+        stats: Optional counters updated in place (requests, batched, fallbacks, failed)
+        translate_many: Optional backend call for a list of requests at once
+                        (e.g. run concurrently), used instead of translate;
+                        may return None for a request that failed
+
+    Returns:
+        Translations in the same order as texts, None where the backend failed
+    """
+    stats = stats if stats is not None else {}
+    for key in ('requests', 'batched', 'fallbacks', 'failed'):
+        stats.setdefault(key, 0)
+    if translate_many is None:
+        translate_many = lambda requests: [translate(request) for request in requests]
+
+    batches = plan_batches(texts, max_chars, max_segments)
+    requests = [texts[batch[0]] if len(batch) == 1 else pack_segments([texts[i] for i in batch])
+                for batch in batches]
+    responses = translate_many(requests)
+    stats['requests'] += len(requests)
+
+    results: List[Optional[str]] = [None] * len(texts)
+    unaligned: List[int] = []
+    echoed = 0
+    for batch, request, translated in zip(batches, requests, responses):
+        if translated is None:
+            stats['failed'] += len(batch)
+        elif len(batch) == 1:
+            results[batch[0]] = translated
+        elif translated.strip() == request.strip():
+            unaligned.extend(batch)
+            echoed += 1
+        else:
+            for i, text in zip(batch, split_segments(translated, len(batch))):
+                if text is None:
+                    unaligned.append(i)
+                else:
+                    results[i] = text
+                    stats['batched'] += 1
+
+    # Retranslate one by one what did not align
+    if echoed:
+        logger.warning(f"{echoed} batched requests came back untranslated")
+    if unaligned:
+        logger.warning(f"Batch delimiter alignment failed for {len(unaligned)} segments, "
+                       f"translating them individually")
+        for i, translated in zip(unaligned, translate_many([texts[i] for i in unaligned])):
+            results[i] = translated
+            if translated is None:
+                stats['failed'] += 1
+        stats['requests'] += len(unaligned)
+        stats['fallbacks'] += len(unaligned)
+
+    return results
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Document-Scope Segment Deduplication for Enfermera Elena
+Translates each distinct header, footer or form label once per document
+"""
+
+import logging
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def segment_key(text: str) -> str:
+    """Dedup key: whitespace collapsed, case kept ("Fecha" and "FECHA" stay distinct)"""
+    return ' '.join(text.split())
+
+
+def split_paragraphs(lines: List[str], max_lines: int) -> List[str]:
+    """
+    Group lines into paragraphs (runs of non-blank lines) of at most max_lines
+
+    Runs of blank lines are kept as their own items, so joining the result
+    with newlines gives back the original text.
+    """
+    paragraphs: List[str] = []
+    run: List[str] = []
+    for line in lines:
+        if run and (bool(line.strip()) != bool(run[-1].strip())
+                    or (line.strip() and len(run) >= max_lines)):
+            paragraphs.append('\n'.join(run))
+            run = []
+        run.append(line)
+    if run:
+        paragraphs.append('\n'.join(run))
+    return paragraphs
+
+
+class SegmentDeduplicator:
+    """
+    Translation memory for one document
+
+    Repeated segments (page headers, footers, form labels, billing lines)
+    are sent to the backend only the first time they appear; later
+    occurrences reuse that translation. Keys are computed on sanitized
+    text, so segments that differ only in their PHI placeholders are
+    never merged.
+    """
+
+    def __init__(self):
+        self._translations: Dict[str, str] = {}
+        self.stats = {'segments_total': 0, 'segments_unique': 0}
+
+    def translate(self,
+                  texts: List[str],
+                  translate_many: Callable[[List[int]], List[str]]) -> List[str]:
+        """
+        Translate segments, calling the backend only for unseen ones
+
+        Args:
+            texts: Segments to translate
+            translate_many: Called with the indexes (into texts) of the first
+                            occurrence of each new segment; returns their
+                            translations in the same order
+
+        Returns:
+            Translations in the same order as texts; blank segments are
+            returned unchanged
+        """
+        keys = [segment_key(text) for text in texts]
+        first_seen: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key:
+                self.stats['segments_total'] += 1
+                if key not in self._translations and key not in first_seen:
+                    first_seen[key] = i
+
+        if first_seen:
+            new_indexes = list(first_seen.values())
+            for i, translated in zip(new_indexes, translate_many(new_indexes)):
+                self._translations[keys[i]] = translated
+            self.stats['segments_unique'] = len(self._translations)
+
+        return [self._translations[key] if key else text for key, text in zip(keys, texts)]
+
+    @property
+    def repeat_ratio(self) -> float:
+        """Share of segments served without a backend call"""
+        total = self.stats['segments_total']
+        return 1 - self.stats['segments_unique'] / total if total else 0.0
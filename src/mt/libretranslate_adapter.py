@@ -13,8 +13,57 @@ from pathlib import Path
 import hashlib
 from datetime import datetime
 
+from glossary.matcher import GlossaryMatch, GlossaryMatcher, apply_matches
+from mt.segment_cache import SegmentCache, default_cache, prompt_version
+from mt.sessions import DEFAULT_POOL_SIZE, pooled_session
+
 logger = logging.getLogger(__name__)
 
+# Matches LT_CHAR_LIMIT in the generated docker-compose.yml; the server
+# counts the characters of every text in an array request together
+DEFAULT_CHAR_LIMIT = 5000
+
+# Where a text over the character limit may be cut: after a sentence or at
+# a line break first, then between words (separators are kept)
+SENTENCE_BREAK = re.compile(r'((?<=[.!?])\s+|\s*\n\s*)')
+WORD_BREAK = re.compile(r'(\s+)')
+
+
+def split_text(text: str, limit: int,
+               breaks: Tuple[re.Pattern, ...] = (SENTENCE_BREAK, WORD_BREAK)) -> Tuple[List[str], List[str]]:
+    """
+    Cut text into pieces of at most limit characters, at the first kind of
+    break that works (a single word longer than limit is cut anywhere)
+    
+    Returns:
+        Tuple of (pieces, separators); pieces[0] + separators[0] + pieces[1] + ... == text
+    """
+    if len(text) <= limit:
+        return [text], []
+    if not breaks:
+        pieces = [text[i:i + limit] for i in range(0, len(text), limit)]
+        return pieces, [''] * (len(pieces) - 1)
+    
+    parts = breaks[0].split(text)  # text, separator, text, ...
+    pieces: List[str] = []
+    separators: List[str] = []
+    
+    def flush(piece: str):
+        sub_pieces, sub_separators = split_text(piece, limit, breaks[1:])
+        pieces.extend(sub_pieces)
+        separators.extend(sub_separators)
+    
+    current = parts[0]
+    for separator, part in zip(parts[1::2], parts[2::2]):
+        if len(current) + len(separator) + len(part) <= limit:
+            current += separator + part
+        else:
+            flush(current)
+            separators.append(separator)
+            current = part
+    flush(current)
+    return pieces, separators
+
 
 class LibreTranslateAdapter:
     """
@@ -27,7 +76,15 @@ class LibreTranslateAdapter:
                  port: int = 5000,
                  api_key: Optional[str] = None,
                  glossary_path: Optional[str] = None,
-                 timeout: int = 30):
+                 timeout: int = 30,
+                 cache_enabled: bool = True,
+                 persistent_cache: bool = False,
+                 cache: Optional[SegmentCache] = None,
+                 session: Optional[requests.Session] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 keep_alive: bool = True,
+                 char_limit: int = DEFAULT_CHAR_LIMIT,
+                 batch_limit: Optional[int] = None):
         """
         Initialize LibreTranslate adapter
         
@@ -37,10 +94,22 @@ class LibreTranslateAdapter:
             api_key: Optional API key for rate limiting
             glossary_path: Path to CSV glossary file
             timeout: Request timeout in seconds
+            cache_enabled: Reuse translations from the segment cache
+            persistent_cache: Share the on-disk segment cache across runs and backends
+                              (stores translations unencrypted; default: in memory)
+            cache: Segment cache (overrides persistent_cache)
+            session: HTTP session to use (default: a new pooled session)
+            pool_size: Keep-alive connections to the server (and concurrent requests)
+            keep_alive: Reuse connections between requests
+            char_limit: Server LT_CHAR_LIMIT, characters per request
+            batch_limit: Server LT_BATCH_LIMIT, texts per request (None = unlimited)
         """
         self.base_url = f"http://{host}:{port}"
         self.api_key = api_key
         self.timeout = timeout
+        self.char_limit = char_limit
+        self.batch_limit = batch_limit
+        self.session = session or pooled_session(pool_size, keep_alive=keep_alive)
         
         # PHI placeholder pattern
         self.phi_pattern = re.compile(r'__PHI_[A-Z]+_\d+__')
@@ -55,9 +124,17 @@ class LibreTranslateAdapter:
             re.compile(r'\bISSSTE\b'),
         ]
         
+        # Translation cache, optionally shared on disk with the other backends
+        self.cache = (cache if cache is not None else default_cache(persistent_cache)) if cache_enabled else None
+        self.cache_hits = 0
+        self.api_calls = 0
+        
         # Load glossary if provided
         self.glossary = {}
+        self.glossary_version = ''
         self.reverse_glossary = {}
+        self.glossary_matcher = GlossaryMatcher()
+        self._glossary_tokens: Dict[str, str] = {}  # es_term -> __GLOSS_*__ token
         if glossary_path and Path(glossary_path).exists():
             self.load_glossary(glossary_path)
             
@@ -94,7 +171,7 @@ class LibreTranslateAdapter:
     def check_server(self) -> bool:
         """Check if LibreTranslate server is available"""
         try:
-            response = requests.get(f"{self.base_url}/languages", timeout=5)
+            response = self.session.get(f"{self.base_url}/languages", timeout=5)
             if response.status_code == 200:
                 languages = response.json()
                 has_spanish = any(lang['code'] == 'es' for lang in languages)
@@ -126,6 +203,10 @@ class LibreTranslateAdapter:
                     # Also store reverse for validation
                     self.reverse_glossary[en_term.lower()] = es_term
                     
+        # Prebuilt token trie: one longest-match scan per chunk
+        self.glossary_matcher = GlossaryMatcher(self.glossary)
+        self._glossary_tokens = {}
+        self.glossary_version = prompt_version(self.glossary)
         logger.info(f"Loaded {len(self.glossary)} glossary entries")
         
     def expand_abbreviations(self, text: str) -> str:
@@ -186,25 +267,22 @@ class LibreTranslateAdapter:
         Returns modified text and token mapping
         """
         glossary_tokens = {}
-        modified = text.lower()
-        
-        # Sort by length to match longer phrases first
-        sorted_terms = sorted(self.glossary.keys(), key=len, reverse=True)
+        replacements = []
         
-        for es_term in sorted_terms:
-            if es_term in modified:
+        # Single longest-match scan; text outside glossary hits is untouched
+        for match in self.glossary_matcher.find(text):
+            token = self._glossary_tokens.get(match.term)
+            if token is None:
                 # Create unique token
-                token_id = hashlib.md5(es_term.encode()).hexdigest()[:8]
+                token_id = hashlib.md5(match.term.encode()).hexdigest()[:8]
                 token = f"__GLOSS_{token_id}__"
+                self._glossary_tokens[match.term] = token
                 
-                # Store the English translation
-                glossary_tokens[token] = self.glossary[es_term]
+            # Store the English translation
+            glossary_tokens[token] = match.value
+            replacements.append(GlossaryMatch(match.start, match.end, match.term, token))
                 
-                # Replace in text (case-insensitive)
-                pattern = re.compile(re.escape(es_term), re.IGNORECASE)
-                modified = pattern.sub(token, modified)
-                
-        return modified, glossary_tokens
+        return apply_matches(text, replacements), glossary_tokens
         
     def apply_glossary_post(self, text: str, glossary_tokens: Dict[str, str]) -> str:
         """Replace glossary tokens with their translations"""
@@ -240,16 +318,173 @@ class LibreTranslateAdapter:
         
     def translate_batch(self, texts: List[str], 
                        source: str = "es", 
-                       target: str = "en") -> List[str]:
-        """Translate multiple texts efficiently"""
-        results = []
+                       target: str = "en",
+                       apply_medical: bool = True) -> List[str]:
+        """
+        Translate multiple texts with array requests
         
-        for text in texts:
-            translated = self.translate(text, source, target)
-            results.append(translated)
+        Every text is pre-processed first (texts over char_limit are cut
+        into sentence pieces), then the pieces are sent as `q` arrays of
+        at most char_limit characters (and batch_limit texts) each, and
+        each text is post-processed once all its pieces are back. Pieces
+        of a failed array request are retried one by one.
+        
+        Returns:
+            Translations in the same order as texts
+        """
+        results = list(texts)
+        model = f"{source}-{target}"
+        cache_version = prompt_version(apply_medical, self.abbreviations, self.glossary_version)
+        
+        # Cache hits and blanks are done; repeated texts are sent once
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            if self.cache is not None:
+                cached = self.cache.get(text, 'libretranslate', model, cache_version)
+                if cached is not None:
+                    self.cache_hits += 1
+                    results[i] = cached
+                    continue
+            pending.setdefault(text, []).append(i)
             
+        prepared = [(text, *self._prepare(text, apply_medical)) for text in pending]
+        split = [split_text(item[2], self.char_limit) for item in prepared]
+        owners = [j for j, (pieces, _) in enumerate(split) for _ in pieces]
+        translations = self._request_pieces([piece for pieces, _ in split for piece in pieces],
+                                            source, target)
+        
+        for j, (source_text, text, _, protected_tokens, glossary_tokens) in enumerate(prepared):
+            parts = [translation for owner, translation in zip(owners, translations) if owner == j]
+            if None in parts:
+                translated = text  # As translate() does on failure
+            else:
+                translated = self._finish(text, self._join(parts, split[j][1]),
+                                          protected_tokens, glossary_tokens)
+                if self.cache is not None and translated is not text:
+                    self.cache.put(source_text, translated, 'libretranslate', model, cache_version)
+            for i in pending[source_text]:
+                results[i] = translated
+                    
         return results
         
+    def _request_pieces(self, pieces: List[str], source: str, target: str) -> List[Optional[str]]:
+        """
+        Translate prepared pieces in array requests within char_limit
+        
+        Pieces of a failed array are retried one by one, straight to the
+        server (they already missed the cache).
+        
+        Returns:
+            One translation per piece, None where the request failed
+        """
+        results: List[Optional[str]] = [None] * len(pieces)
+        for batch in self._plan_requests(pieces):
+            translations = self._request([pieces[k] for k in batch], source, target)
+            if translations is None and len(batch) > 1:
+                translations = [self._request(pieces[k], source, target) for k in batch]
+            for k, translated in zip(batch, translations or [None]):
+                results[k] = translated
+        return results
+        
+    @staticmethod
+    def _join(parts: List[str], separators: List[str]) -> str:
+        """Reassemble translated pieces with the source text's separators"""
+        return parts[0] + ''.join(separator + part for separator, part in zip(separators, parts[1:]))
+        
+    def _plan_requests(self, texts: List[str]) -> List[List[int]]:
+        """Group text indexes, in order, into requests within char_limit and batch_limit"""
+        batches: List[List[int]] = []
+        size = 0
+        for i, text in enumerate(texts):
+            if (batches and size + len(text) <= self.char_limit
+                    and (not self.batch_limit or len(batches[-1]) < self.batch_limit)):
+                batches[-1].append(i)
+                size += len(text)
+            else:
+                batches.append([i])
+                size = len(text)
+        return batches
+        
+    def _prepare(self, text: str, apply_medical: bool) -> Tuple[str, str, Dict[str, str], Dict[str, str]]:
+        """
+        Pre-process text for the server
+        
+        Returns:
+            Tuple of (expanded text, text to send, protected tokens, glossary tokens)
+        """
+        # Step 1: Expand abbreviations if medical processing enabled
+        if apply_medical:
+            text = self.expand_abbreviations(text)
+            
+        # Step 2: Extract protected tokens (PHI, special terms)
+        cleaned_text, protected_tokens = self.extract_protected_tokens(text)
+        
+        # Step 3: Apply glossary pre-processing
+        if apply_medical and self.glossary:
+            cleaned_text, glossary_tokens = self.apply_glossary_pre(cleaned_text)
+        else:
+            glossary_tokens = {}
+            
+        return text, cleaned_text, protected_tokens, glossary_tokens
+        
+    def _request(self, q, source: str, target: str):
+        """
+        POST /translate for one text or an array of texts
+        
+        Returns:
+            translatedText (same shape as q), None on failure
+        """
+        payload = {
+            "q": q,
+            "source": source,
+            "target": target,
+            "format": "text"
+        }
+        
+        if self.api_key:
+            payload["api_key"] = self.api_key
+            
+        try:
+            response = self.session.post(
+                f"{self.base_url}/translate",
+                json=payload,
+                timeout=self.timeout
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"Translation failed: {response.status_code} - {response.text}")
+                return None
+                
+            translated = response.json()["translatedText"]
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            logger.error(f"Translation error: {e}")
+            return None
+            
+        self.api_calls += 1
+        if isinstance(q, list) and (not isinstance(translated, list) or len(translated) != len(q)):
+            logger.error("Batch translation returned a different number of texts")
+            return None
+        return translated
+        
+    def _finish(self, text: str, translated: str,
+                protected_tokens: Dict[str, str], glossary_tokens: Dict[str, str]) -> str:
+        """Post-process one translation; returns text itself if validation fails"""
+        # Step 5: Apply glossary post-processing
+        if glossary_tokens:
+            translated = self.apply_glossary_post(translated, glossary_tokens)
+            
+        # Step 6: Restore protected tokens
+        translated = self.restore_protected_tokens(translated, protected_tokens)
+        
+        # Step 7: Validate translation
+        if not self.validate_translation(text, translated):
+            logger.warning("Translation validation failed, returning original")
+            return text
+            
+        return translated
+        
     def translate(self, text: str, 
                  source: str = "es", 
                  target: str = "en",
@@ -269,61 +504,50 @@ class LibreTranslateAdapter:
         if not text or not text.strip():
             return text
             
+        # Same text, language pair and medical processing: reuse the translation
+        if self.cache is not None:
+            model = f"{source}-{target}"
+            cache_version = prompt_version(apply_medical, self.abbreviations, self.glossary_version)
+            cached = self.cache.get(text, 'libretranslate', model, cache_version)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+        source_text = text
+            
         try:
-            # Step 1: Expand abbreviations if medical processing enabled
-            if apply_medical:
-                text = self.expand_abbreviations(text)
+            text, cleaned_text, protected_tokens, glossary_tokens = self._prepare(text, apply_medical)
                 
-            # Step 2: Extract protected tokens (PHI, special terms)
-            cleaned_text, protected_tokens = self.extract_protected_tokens(text)
-            
-            # Step 3: Apply glossary pre-processing
-            if apply_medical and self.glossary:
-                cleaned_text, glossary_tokens = self.apply_glossary_pre(cleaned_text)
+            # Step 4: Call LibreTranslate API (in sentence pieces above char_limit)
+            pieces, separators = split_text(cleaned_text, self.char_limit)
+            if len(pieces) == 1:
+                translated = self._request(cleaned_text, source, target)
             else:
-                glossary_tokens = {}
-                
-            # Step 4: Call LibreTranslate API
-            payload = {
-                "q": cleaned_text,
-                "source": source,
-                "target": target,
-                "format": "text"
-            }
-            
-            if self.api_key:
-                payload["api_key"] = self.api_key
-                
-            response = requests.post(
-                f"{self.base_url}/translate",
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Translation failed: {response.status_code} - {response.text}")
+                parts = self._request_pieces(pieces, source, target)
+                translated = None if None in parts else self._join(parts, separators)
+            if translated is None:
                 return text  # Return original on failure
                 
-            translated = response.json()["translatedText"]
-            
-            # Step 5: Apply glossary post-processing
-            if glossary_tokens:
-                translated = self.apply_glossary_post(translated, glossary_tokens)
-                
-            # Step 6: Restore protected tokens
-            translated = self.restore_protected_tokens(translated, protected_tokens)
-            
-            # Step 7: Validate translation
-            if not self.validate_translation(text, translated):
-                logger.warning("Translation validation failed, returning original")
-                return text
-                
+            translated = self._finish(text, translated, protected_tokens, glossary_tokens)
+            if self.cache is not None and translated is not text:
+                self.cache.put(source_text, translated, 'libretranslate', model, cache_version)
             return translated
             
         except Exception as e:
             logger.error(f"Translation error: {e}")
             return text  # Return original on error
             
+    def get_stats(self) -> Dict:
+        """Get translation statistics"""
+        total_requests = self.api_calls + self.cache_hits
+        
+        return {
+            'api_calls': self.api_calls,
+            'cache_hits': self.cache_hits,
+            'cache_size': len(self.cache) if self.cache is not None else 0,
+            'cache_hit_rate': self.cache_hits / total_requests if total_requests > 0 else 0,
+            'segment_cache': self.cache.get_stats() if self.cache is not None else None
+        }
+            
 
 class MedicalContextEnhancer:
     """Add medical context and validate terminology"""
@@ -8,11 +8,14 @@ import re
 import os
 import json
 import logging
-import hashlib
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 from pathlib import Path
 import time
+import asyncio
+
+from mt.scheduler import AsyncChunkScheduler, rate_limit_delay
+from mt.segment_cache import SegmentCache, default_cache, prompt_version
 
 # OpenAI import with fallback
 try:
@@ -125,7 +128,13 @@ class OpenAISecureAdapter:
                  max_tokens: int = 4000,
                  glossary_path: Optional[str] = None,
                  validate_phi: bool = True,
-                 require_baa: bool = False):
+                 require_baa: bool = False,
+                 max_concurrency: int = 5,
+                 requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None,
+                 cache_enabled: bool = True,
+                 persistent_cache: bool = False,
+                 cache: Optional[SegmentCache] = None):
         """
         Initialize OpenAI adapter with security controls
         
@@ -137,6 +146,13 @@ class OpenAISecureAdapter:
             glossary_path: Path to medical glossary CSV
             validate_phi: Whether to validate PHI removal
             require_baa: Whether BAA is required (set True for production)
+            max_concurrency: Requests in flight at once in translate_batch
+            requests_per_minute: Request budget for translate_batch (None = unlimited)
+            tokens_per_minute: Token budget for translate_batch (None = unlimited)
+            cache_enabled: Reuse translations from the segment cache
+            persistent_cache: Share the on-disk segment cache across runs and backends
+                              (stores translations unencrypted; default: in memory)
+            cache: Segment cache (overrides persistent_cache)
         """
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI library not installed")
@@ -163,17 +179,25 @@ class OpenAISecureAdapter:
         
         # Load glossary
         self.glossary = {}
+        self.glossary_version = ''
         if glossary_path and Path(glossary_path).exists():
             self.load_glossary(glossary_path)
             
-        # Translation cache (for cost optimization)
-        self.cache = {}
+        # Translation cache (for cost optimization), optionally shared on disk with the other backends
+        self.cache = (cache if cache is not None else default_cache(persistent_cache)) if cache_enabled else None
         self.cache_hits = 0
         self.api_calls = 0
         
         # Audit log
         self.audit_log = []
         
+        # Concurrent batch translation within the account's rate limits
+        self.scheduler = AsyncChunkScheduler(
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute
+        )
+        
         logger.info(f"OpenAI adapter initialized with model {model}")
         if self.require_baa:
             logger.warning("BAA required mode - ensure BAA is in place!")
@@ -190,6 +214,7 @@ class OpenAISecureAdapter:
                 if es_term and en_term:
                     self.glossary[es_term] = en_term
                     
+        self.glossary_version = prompt_version(self.glossary)
         logger.info(f"Loaded {len(self.glossary)} glossary entries")
         
     def create_system_prompt(self, include_glossary: bool = True) -> str:
@@ -289,7 +314,9 @@ MEDICATION NOTES:
                  text: str,
                  use_cache: bool = True,
                  retry_on_error: bool = True,
-                 max_retries: int = 3) -> str:
+                 max_retries: int = 3,
+                 raise_rate_limit: bool = False,
+                 check_cache: bool = True) -> str:
         """
         Translate medical text with PHI protection
         
@@ -298,6 +325,10 @@ MEDICATION NOTES:
             use_cache: Whether to use translation cache
             retry_on_error: Whether to retry on API errors
             max_retries: Maximum number of retry attempts
+            raise_rate_limit: Raise rate-limit errors instead of returning the
+                              original text (for callers that back off themselves)
+            check_cache: Look the text up before the request; False when the
+                         caller already missed (the result is still stored)
             
         Returns:
             Translated text with PHI placeholders preserved
@@ -306,12 +337,14 @@ MEDICATION NOTES:
             return text
             
         # Check cache
+        use_cache = use_cache and self.cache is not None
         if use_cache:
-            cache_key = hashlib.md5(text.encode()).hexdigest()
-            if cache_key in self.cache:
+            cache_version = self._cache_version()
+            cached = self.cache.get(text, 'openai', self.model, cache_version) if check_cache else None
+            if cached is not None:
                 self.cache_hits += 1
                 logger.debug(f"Cache hit (total: {self.cache_hits})")
-                return self.cache[cache_key]
+                return cached
                 
         try:
             # Validate and clean text
@@ -372,7 +405,7 @@ MEDICATION NOTES:
                 
             # Update cache
             if use_cache:
-                self.cache[cache_key] = translated
+                self.cache.put(text, translated, 'openai', self.model, cache_version)
                 
             # Log for audit
             self.audit_log.append({
@@ -386,36 +419,53 @@ MEDICATION NOTES:
             return translated
             
         except Exception as e:
+            if raise_rate_limit and rate_limit_delay(e) is not None:
+                raise
             logger.error(f"Translation failed: {e}")
             return text  # Return original on error
             
-    def translate_batch(self, 
-                       texts: List[str],
-                       batch_size: int = 5) -> List[str]:
-        """Translate multiple texts with batching for efficiency"""
-        results = []
-        
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translate multiple texts concurrently
+        
+        Requests run up to max_concurrency at a time within the
+        requests/tokens-per-minute budget; 429s pause every request and
+        are retried with backoff. Results keep the order of texts.
+        """
+        # Blank, cached and repeated texts need no request; each is looked up once
+        translated = {text: text for text in texts if not text or not text.strip()}
+        pending = [text for text in dict.fromkeys(texts) if text not in translated]
+        if self.cache is not None:
+            cache_version = self._cache_version()
+            for text in pending:
+                cached = self.cache.get(text, 'openai', self.model, cache_version)
+                if cached is not None:
+                    translated[text] = cached
+                    self.cache_hits += 1
+            pending = [text for text in pending if text not in translated]
+        
+        async def call(text):
+            return await asyncio.to_thread(self.translate, text, max_retries=0,
+                                           raise_rate_limit=True, check_cache=False)
             
-            for text in batch:
-                translated = self.translate(text)
-                results.append(translated)
-                
-            # Small delay between batches to avoid rate limits
-            if i + batch_size < len(texts):
-                time.sleep(0.5)
-                
-        return results
+        translated.update(zip(pending, self.scheduler.map(pending, call, fallback=lambda text: text)))
+        return [translated[text] for text in texts]
+        
+    def _cache_version(self) -> str:
+        """Everything besides the text that changes the output (prompt with glossary, sampling)"""
+        return prompt_version(self.create_system_prompt(), self.glossary_version,
+                              self.temperature, self.max_tokens)
         
     def get_stats(self) -> Dict[str, Any]:
         """Get usage statistics"""
         return {
             'api_calls': self.api_calls,
             'cache_hits': self.cache_hits,
-            'cache_size': len(self.cache),
+            'cache_size': len(self.cache) if self.cache is not None else 0,
             'cache_hit_rate': self.cache_hits / (self.api_calls + self.cache_hits) if (self.api_calls + self.cache_hits) > 0 else 0,
-            'audit_log_size': len(self.audit_log)
+            'segment_cache': self.cache.get_stats() if self.cache is not None else None,
+            'audit_log_size': len(self.audit_log),
+            'rate_limited': self.scheduler.stats['rate_limited']
         }
         
     def estimate_cost(self, text: str) -> float:
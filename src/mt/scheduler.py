@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Async Chunk Scheduler for Enfermera Elena
+Runs translation requests concurrently within requests- and tokens-per-minute limits
+"""
+
+import time
+import random
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimited(Exception):
+    """Raised by a call to signal HTTP 429; retry_after in seconds if the server sent one"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(f"rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+def rate_limit_delay(error: Exception) -> Optional[float]:
+    """
+    Retry-After seconds if error is a rate-limit (HTTP 429) error
+
+    Understands RateLimited, the OpenAI SDK errors (v0 and v1) and
+    requests' HTTPError.
+
+    Returns:
+        Seconds to wait (0.0 when the server gave no hint), None if not a rate limit
+    """
+    if isinstance(error, RateLimited):
+        return error.retry_after or 0.0
+
+    response = getattr(error, 'response', None)
+    status = (getattr(error, 'status_code', None) or getattr(error, 'http_status', None)
+              or getattr(response, 'status_code', None))
+    if status != 429 and type(error).__name__ != 'RateLimitError':
+        return None
+
+    headers = getattr(response, 'headers', None) or getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after') or headers.get('Retry-After') or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Prompt plus completion tokens for a translation (about 4 chars per token each way)"""
+    return max(1, len(text) // 2)
+
+
+class TokenBucket:
+    """
+    Requests- and tokens-per-minute budget shared by all in-flight calls
+
+    Both budgets refill continuously; a request waits until one request
+    and its estimated tokens fit. pause() stops all requests, e.g. after
+    a 429 from the server.
+    """
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` if available (returns 0.0), else seconds to wait"""
+        now = self.clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        elapsed = now - self._updated
+        self._updated = now
+        wait = 0.0
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self.requests_per_minute / 60)
+            if self._requests < 1:
+                wait = (1 - self._requests) * 60 / self.requests_per_minute
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)  # Oversized requests can still run
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + elapsed * self.tokens_per_minute / 60)
+            if self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+
+        if wait > 0:
+            return wait
+        if self.requests_per_minute:
+            self._requests -= 1
+        if self.tokens_per_minute:
+            self._tokens -= tokens
+        return 0.0
+
+
+class AsyncChunkScheduler:
+    """
+    Bounded-concurrency scheduler for translation requests
+
+    Items run concurrently, up to max_concurrency in flight, each one
+    waiting for the token bucket first; results come back in input order.
+    On a 429 every request pauses for the server's Retry-After (or an
+    exponential backoff with jitter) and the concurrency window halves,
+    then grows back by one after each run of successes. A burst of 429s
+    from requests already in flight halves the window only once: further
+    429s within the same pause just extend it.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 4,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 5,
+                 backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 token_estimator: Callable[[Any], int] = estimate_tokens):
+        """
+        Initialize scheduler
+
+        Args:
+            max_concurrency: Requests in flight at most
+            requests_per_minute: Request budget (None = unlimited)
+            tokens_per_minute: Token budget (None = unlimited)
+            max_retries: Retries per item after rate-limit errors
+            backoff: First backoff delay when the server sends no Retry-After
+            max_backoff: Upper bound for one backoff delay
+            token_estimator: Item -> estimated tokens for the bucket
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.bucket = TokenBucket(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.token_estimator = token_estimator
+
+        self.concurrency = self.max_concurrency  # Adaptive window
+        self._successes = 0
+        self._halved_until = 0.0  # End of the pause that last halved the window
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'failed': 0}
+
+    async def run(self,
+                  items: List[Any],
+                  call: Callable[[Any], Awaitable[Any]],
+                  fallback: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """
+        Run call(item) for every item
+
+        Args:
+            items: Work items (e.g. chunk texts)
+            call: Coroutine function doing one request
+            fallback: Result for an item whose call failed (other errors, or
+                      rate-limited past max_retries); without it the error is raised
+
+        Returns:
+            Results in the same order as items
+        """
+        window = asyncio.Condition()
+        in_flight = 0
+
+        async def run_one(item):
+            nonlocal in_flight
+            tokens = self.token_estimator(item)
+            attempt = 0
+            while True:
+                async with window:
+                    await window.wait_for(lambda: in_flight < self.concurrency)
+                    in_flight += 1
+                try:
+                    while True:
+                        wait = self.bucket.reserve(tokens)
+                        if wait <= 0:
+                            break
+                        await asyncio.sleep(wait)
+
+                    self.stats['requests'] += 1
+                    result = await call(item)
+                    self._on_success()
+                    return result
+                except Exception as e:
+                    delay = rate_limit_delay(e)
+                    if delay is None or attempt >= self.max_retries:
+                        self.stats['failed'] += 1
+                        if fallback is None:
+                            raise
+                        logger.warning(f"Request failed: {e}")
+                        return fallback(item)
+                    attempt += 1
+                    self._on_rate_limit(delay, attempt)
+                finally:
+                    async with window:
+                        in_flight -= 1
+                        window.notify_all()
+
+        return list(await asyncio.gather(*(run_one(item) for item in items)))
+
+    def map(self,
+            items: List[Any],
+            call: Callable[[Any], Awaitable[Any]],
+            fallback: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """
+        Synchronous run(), on an event loop owned by the scheduler
+
+        The loop (and with it any async HTTP client bound to it) and the
+        rate budget persist across calls, so callers can map chunk by chunk.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            # asyncio.to_thread calls (blocking clients) get one thread per slot
+            self._loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_concurrency))
+        return self._loop.run_until_complete(self.run(items, call, fallback))
+
+    def close(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self._loop.shutdown_default_executor())
+            self._loop.close()
+
+    def _on_success(self):
+        self._successes += 1
+        if self.concurrency < self.max_concurrency and self._successes >= self.concurrency:
+            self.concurrency += 1
+            self._successes = 0
+
+    def _on_rate_limit(self, retry_after: float, attempt: int):
+        self.stats['rate_limited'] += 1
+        self.stats['retries'] += 1
+        if not retry_after:
+            retry_after = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            retry_after *= random.uniform(0.5, 1.0)
+        now = self.bucket.clock()
+        if now >= self._halved_until:
+            self.concurrency = max(1, self.concurrency // 2)
+            self._halved_until = now + retry_after
+        self.bucket.pause(retry_after)
+        self._successes = 0
+        logger.warning(f"Rate limited, pausing {retry_after:.1f}s "
+                       f"(concurrency now {self.concurrency})")
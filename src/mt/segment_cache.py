@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Persistent Translation Segment Cache for Enfermera Elena
+One SQLite store shared by every backend, process and run
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from mt.dedup import segment_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'enfermera_elena' / 'translations.sqlite3'
+MEMORY = ':memory:'  # Path for a private in-memory cache, gone with the process
+DEFAULT_MAX_ENTRIES = 500_000
+DEFAULT_TTL_DAYS = 90
+
+# Evict at most every this many writes, not on every put
+EVICT_EVERY = 256
+
+_shared: Dict[str, 'SegmentCache'] = {}
+
+
+def prompt_version(*parts: Any) -> str:
+    """Short digest of everything besides the text that shapes a translation (prompt, glossary, settings)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def default_cache(persistent: bool = False) -> 'SegmentCache':
+    """The shared on-disk cache if persistent, otherwise a new in-memory one"""
+    return SegmentCache.shared() if persistent else SegmentCache(MEMORY)
+
+
+class SegmentCache:
+    """
+    SQLite cache of translated segments
+
+    Keys hash (normalized sanitized text, backend, model, prompt/glossary
+    version), so switching backend, model or prompt never serves a stale
+    translation, and the source text itself is never stored. Only
+    de-identified text should reach it, as with the backends themselves.
+
+    On disk, translations are stored unencrypted: the database and its
+    -wal/-shm files are private to the user, and callers only persist the
+    cache on request. The database runs in WAL mode with a busy timeout,
+    so worker processes can read and write it concurrently. Entries
+    expire after the TTL; above max_entries the least recently used are
+    evicted.
+    """
+
+    def __init__(self,
+                 path: Optional[Union[str, Path]] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_days: Optional[float] = DEFAULT_TTL_DAYS):
+        """
+        Initialize cache
+
+        Args:
+            path: Database file (default ENFERMERA_MT_CACHE or
+                  ~/.cache/enfermera_elena/translations.sqlite3), or MEMORY
+            max_entries: Entry bound for LRU eviction
+            ttl_days: Entry lifetime (None = never expire)
+        """
+        self.path = Path(path or os.getenv('ENFERMERA_MT_CACHE') or DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'expired': 0, 'evictions': 0}
+
+        self.in_memory = str(self.path) == MEMORY
+        if not self.in_memory:
+            logger.warning(f"Translation cache at {self.path} stores translations unencrypted; "
+                           "PHI the detector missed would persist there")
+            self._make_private()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+        with self._lock:
+            self._connection()
+
+    def _make_private(self):
+        """Create the database owner-only before SQLite opens it; its -wal and -shm files take its mode"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+        for suffix in ('', '-wal', '-shm'):
+            path = Path(f"{self.path}{suffix}")
+            if path.exists():
+                os.chmod(path, 0o600)
+
+    @classmethod
+    def shared(cls, path: Optional[Union[str, Path]] = None) -> 'SegmentCache':
+        """One instance per database file in this process, shared by all adapters"""
+        resolved = str(Path(path or os.getenv('ENFERMERA_MT_CACHE') or DEFAULT_CACHE_PATH).resolve())
+        if resolved not in _shared:
+            _shared[resolved] = cls(resolved)
+        return _shared[resolved]
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not cross fork(); reopen in each worker process
+        # (an in-memory cache starts empty there)
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(str(self.path), timeout=30,
+                                         isolation_level=None, check_same_thread=False)
+            if not self.in_memory:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                " key TEXT PRIMARY KEY,"
+                " translation TEXT NOT NULL,"
+                " backend TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used)")
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def key(text: str, backend: str, model: str, version: str = '') -> str:
+        payload = json.dumps([segment_key(text), backend, model, version], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, backend: str, model: str, version: str = '') -> Optional[str]:
+        """Cached translation, or None on a miss"""
+        key = self.key(text, backend, model, version)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT translation, created FROM segments WHERE key = ?",
+                                   (key,)).fetchone()
+                if row is not None and self.ttl and now - row[1] > self.ttl:
+                    conn.execute("DELETE FROM segments WHERE key = ?", (key,))
+                    self.stats['expired'] += 1
+                    row = None
+                if row is not None:
+                    conn.execute("UPDATE segments SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache read failed: {e}")
+            row = None
+
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return row[0]
+
+    def put(self, text: str, translation: str, backend: str, model: str, version: str = ''):
+        """Store a translation (failures only cost a future cache miss)"""
+        key = self.key(text, backend, model, version)
+        now = time.time()
+        try:
+            with self._lock:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, translation, backend, model, now, now)
+                )
+                self.stats['writes'] += 1
+                self._writes += 1
+                if self._writes % EVICT_EVERY == 0:
+                    self._evict()
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        conn = self._connection()
+        if self.ttl:
+            cursor = conn.execute("DELETE FROM segments WHERE created < ?", (time.time() - self.ttl,))
+            self.stats['expired'] += cursor.rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute("DELETE FROM segments WHERE key IN "
+                         "(SELECT key FROM segments ORDER BY last_used LIMIT ?)", (excess,))
+            self.stats['evictions'] += excess
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM segments")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0,
+            'path': str(self.path)
+        }
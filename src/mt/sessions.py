@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Sessions for Enfermera Elena
+Keep-alive connection pools for the LibreTranslate and vLLM backends
+"""
+
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open per host; also the cap on concurrent requests to it
+DEFAULT_POOL_SIZE = 10
+
+# Distinct hosts with a pool of their own (translation server, vLLM, ...)
+DEFAULT_POOL_HOSTS = 4
+
+
+def pooled_session(pool_size: int = DEFAULT_POOL_SIZE,
+                   pool_hosts: int = DEFAULT_POOL_HOSTS,
+                   keep_alive: bool = True) -> requests.Session:
+    """
+    requests.Session with a bounded keep-alive connection pool
+
+    Connections are reused across requests instead of opening one TCP
+    connection per segment. Threads may share the session: the pool is
+    thread-safe and, once pool_size connections to a host are busy,
+    further requests wait for one to free up rather than opening more.
+
+    Args:
+        pool_size: Connections kept per host (per-host concurrency limit)
+        pool_hosts: Hosts to keep pools for
+        keep_alive: False sends `Connection: close`, one connection per request
+
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size,
+                          pool_block=True, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
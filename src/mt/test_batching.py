@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for delimited segment batching
+Run with: python -m pytest src
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from mt.batching import pack_segments, plan_batches, split_segments, translate_batched
+
+SEGMENTS = ["Fecha", "Glucosa     110   mg/dL", "Paciente con HTA\ncontrolada", "500"]
+
+
+def upper(text: str) -> str:
+    return text.upper()
+
+
+def test_round_trip():
+    packed = pack_segments(SEGMENTS)
+    assert split_segments(packed, len(SEGMENTS)) == [text.strip() for text in SEGMENTS]
+
+
+def test_round_trip_through_translation():
+    translated = upper(pack_segments(SEGMENTS))
+    assert split_segments(translated, len(SEGMENTS)) == [text.upper() for text in SEGMENTS]
+
+
+def test_marker_spacing_variants():
+    translated = "[ # 0 ]\nDate\n\n  [#1]  \nGlucose\n\n[#2]\nHTA\n\n[# 3]\n500"
+    assert split_segments(translated, 4) == ["Date", "Glucose", "HTA", "500"]
+
+
+def test_dropped_marker_fails_both_neighbours_only():
+    # [#2] merged into [#1]: neither may absorb the other's text
+    translated = "[#0]\nDate\n\n[#1]\nGlucose HTA\n\n[#3]\n500"
+    assert split_segments(translated, 4) == ["Date", None, None, "500"]
+
+
+def test_repeated_and_out_of_range_markers():
+    assert split_segments("[#0]\na\n\n[#0]\nb\n\n[#1]\nc", 2) == [None, "c"]
+    assert split_segments("[#0]\na\n\n[#1]\nb\n\n[#7]\nc", 2) == ["a", None]
+
+
+def test_plan_batches_limits():
+    texts = ["x" * 30] * 5
+    assert plan_batches(texts, max_chars=100) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(texts, max_chars=4000, max_segments=2) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(["x" * 500], max_chars=100) == [[0]]  # Oversized segments still go out
+
+
+def test_translate_batched_one_request():
+    stats = {}
+    calls = []
+
+    def translate(text):
+        calls.append(text)
+        return upper(text)
+
+    assert translate_batched(SEGMENTS, translate, stats=stats) == [text.strip().upper() for text in SEGMENTS]
+    assert len(calls) == 1
+    assert stats == {'requests': 1, 'batched': 4, 'fallbacks': 0, 'failed': 0}
+
+
+def test_translate_batched_falls_back_for_misaligned_segments():
+    stats = {}
+    calls = []
+
+    def reflow(text):
+        # Joins segment 2 into segment 1, like a model reflowing a sentence
+        calls.append(text)
+        return upper(text.replace("\n\n[#2]\n", " "))
+
+    texts = ["uno", "dos", "tres", "cuatro"]
+    assert translate_batched(texts, reflow, stats=stats) == ["UNO", "DOS", "TRES", "CUATRO"]
+    assert calls[1:] == ["dos", "tres"]
+    assert stats == {'requests': 3, 'batched': 2, 'fallbacks': 2, 'failed': 0}
+
+
+def test_translate_batched_does_not_retry_failed_requests():
+    stats = {}
+    calls = []
+
+    def translate_many(requests):
+        calls.extend(requests)
+        return [None if "dos" in request else upper(request) for request in requests]
+
+    results = translate_batched(["uno", "dos", "tres"], None, max_segments=2,
+                                stats=stats, translate_many=translate_many)
+    assert results == [None, None, "TRES"]
+    assert len(calls) == 2
+    assert stats['failed'] == 2 and stats['fallbacks'] == 0
+
+
+def test_translate_batched_retries_echoed_batches():
+    # Adapters return their input on failure; the echoed markers still align
+    stats = {}
+    calls = []
+
+    def failing_batches(text):
+        calls.append(text)
+        return text if "[#" in text else upper(text)
+
+    assert translate_batched(["uno", "dos"], failing_batches, stats=stats) == ["UNO", "DOS"]
+    assert calls[1:] == ["uno", "dos"]
+    assert stats == {'requests': 3, 'batched': 0, 'fallbacks': 2, 'failed': 0}
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for document-scope segment deduplication
+Run with: python -m pytest src
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from mt.dedup import SegmentDeduplicator, segment_key, split_paragraphs
+
+
+def test_segment_key():
+    assert segment_key("  Centro   Hospitalario\t") == "Centro Hospitalario"
+    assert segment_key("FECHA") != segment_key("Fecha")
+    assert segment_key(" \t ") == ""
+
+
+def test_each_distinct_segment_translated_once():
+    dedup = SegmentDeduplicator()
+    calls = []
+
+    def translate_many(indexes):
+        calls.append(indexes)
+        return [f"T({texts[i].strip()})" for i in indexes]
+
+    texts = ["Fecha", "Centro  Hospitalario", "", "Fecha ", "FECHA", "Centro Hospitalario"]
+    assert dedup.translate(texts, translate_many) == [
+        "T(Fecha)", "T(Centro  Hospitalario)", "", "T(Fecha)", "T(FECHA)", "T(Centro  Hospitalario)"]
+    assert calls == [[0, 1, 4]]
+    assert dedup.stats == {'segments_total': 5, 'segments_unique': 3}
+    assert dedup.repeat_ratio == 0.4
+
+
+def test_memory_spans_calls():
+    dedup = SegmentDeduplicator()
+    calls = []
+
+    def translate_many(indexes):
+        calls.append([texts[i] for i in indexes])
+        return [texts[i].upper() for i in indexes]
+
+    texts = ["Fecha", "Subtotal"]
+    dedup.translate(texts, translate_many)
+    texts = ["Subtotal", "Página 2"]
+    assert dedup.translate(texts, translate_many) == ["SUBTOTAL", "PÁGINA 2"]
+    assert calls == [["Fecha", "Subtotal"], ["Página 2"]]
+
+
+def test_placeholders_keep_segments_apart():
+    dedup = SegmentDeduplicator()
+    texts = ["Paciente [NAME_0]", "Paciente [NAME_1]"]
+    assert dedup.translate(texts, lambda indexes: [str(i) for i in indexes]) == ["0", "1"]
+
+
+def test_split_paragraphs():
+    lines = ["Centro Hospitalario", "", "Paciente con tos", "productiva.", "Plan: control", "", "", "Página 1"]
+    paragraphs = split_paragraphs(lines, max_lines=2)
+    assert paragraphs == ["Centro Hospitalario", "", "Paciente con tos\nproductiva.",
+                          "Plan: control", "\n", "Página 1"]
+    assert '\n'.join(paragraphs) == '\n'.join(lines)
+    assert split_paragraphs([], max_lines=2) == []
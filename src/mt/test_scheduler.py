@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the token bucket and the async chunk scheduler
+Run with: python -m pytest src
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from mt.scheduler import AsyncChunkScheduler, RateLimited, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(clock=FakeClock())
+    assert all(bucket.reserve(10_000) == 0.0 for _ in range(100))
+
+
+def test_request_budget_refills_continuously():
+    clock = FakeClock()
+    bucket = TokenBucket(requests_per_minute=60, clock=clock)
+    assert all(bucket.reserve(1) == 0.0 for _ in range(60))
+    assert bucket.reserve(1) == pytest.approx(1.0)  # One request per second
+
+    clock.now += 0.5
+    assert bucket.reserve(1) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.reserve(1) == 0.0
+
+
+def test_token_budget():
+    clock = FakeClock()
+    bucket = TokenBucket(tokens_per_minute=600, clock=clock)
+    assert bucket.reserve(500) == 0.0
+    assert bucket.reserve(200) == pytest.approx(10.0)  # 100 tokens missing at 10/s
+    clock.now += 10
+    assert bucket.reserve(200) == 0.0
+
+
+def test_oversized_request_still_runs():
+    clock = FakeClock()
+    bucket = TokenBucket(tokens_per_minute=600, clock=clock)
+    assert bucket.reserve(5000) == 0.0
+    assert bucket.reserve(1) > 0
+
+
+def test_waiting_does_not_consume_budget():
+    clock = FakeClock()
+    bucket = TokenBucket(requests_per_minute=60, tokens_per_minute=600, clock=clock)
+    assert bucket.reserve(600) == 0.0
+    for _ in range(3):
+        assert bucket.reserve(600) == pytest.approx(60.0)
+    clock.now += 60
+    assert bucket.reserve(600) == 0.0
+
+
+def test_pause():
+    clock = FakeClock()
+    bucket = TokenBucket(clock=clock)
+    bucket.pause(5)
+    bucket.pause(2)  # A shorter pause never cuts a longer one
+    assert bucket.reserve(1) == pytest.approx(5.0)
+    clock.now += 5
+    assert bucket.reserve(1) == 0.0
+
+
+def test_map_keeps_order_and_bounds_concurrency():
+    scheduler = AsyncChunkScheduler(max_concurrency=3)
+    in_flight = peak = 0
+
+    async def call(text):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001 * (10 - len(text)))
+        in_flight -= 1
+        return text.upper()
+
+    items = ["a" * (i % 7 + 1) for i in range(20)]
+    try:
+        assert scheduler.map(items, call) == [item.upper() for item in items]
+    finally:
+        scheduler.close()
+    assert peak == 3
+
+
+def test_rate_limit_burst_halves_window_once():
+    scheduler = AsyncChunkScheduler(max_concurrency=8)
+    limited = set()
+    windows = []
+
+    async def call(text):
+        await asyncio.sleep(0.001)
+        windows.append(scheduler.concurrency)
+        if text not in limited:
+            limited.add(text)
+            raise RateLimited(0.05)
+        return text
+
+    items = [str(i) for i in range(8)]
+    try:
+        assert scheduler.map(items, call) == items
+    finally:
+        scheduler.close()
+    assert scheduler.stats['rate_limited'] == 8
+    assert min(windows) == 4
+
+
+def test_fallback_after_retries():
+    scheduler = AsyncChunkScheduler(max_concurrency=2, max_retries=1, backoff=0.001)
+
+    async def call(text):
+        if text == "bad":
+            raise RateLimited(0.001)
+        return text
+
+    try:
+        assert scheduler.map(["ok", "bad"], call, fallback=lambda text: None) == ["ok", None]
+    finally:
+        scheduler.close()
+    assert scheduler.stats['failed'] == 1
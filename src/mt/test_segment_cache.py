@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite segment cache
+Run with: python -m pytest src
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import mt.segment_cache as segment_cache
+from mt.segment_cache import MEMORY, SegmentCache, prompt_version
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(segment_cache, 'time', fake)
+    return fake
+
+
+def test_round_trip(tmp_path):
+    cache = SegmentCache(tmp_path / 'cache.db')
+    assert cache.get("Fecha", 'openai', 'gpt-4', 'v1') is None
+    cache.put("Fecha", "Date", 'openai', 'gpt-4', 'v1')
+    assert cache.get("Fecha", 'openai', 'gpt-4', 'v1') == "Date"
+    assert cache.get("  Fecha ", 'openai', 'gpt-4', 'v1') == "Date"  # Normalized key
+    assert cache.stats['hits'] == 2 and cache.stats['misses'] == 1
+
+
+def test_backend_model_and_version_are_part_of_the_key(tmp_path):
+    cache = SegmentCache(tmp_path / 'cache.db')
+    cache.put("Fecha", "Date", 'openai', 'gpt-4', 'v1')
+    assert cache.get("Fecha", 'alia', 'gpt-4', 'v1') is None
+    assert cache.get("Fecha", 'openai', 'gpt-3.5-turbo', 'v1') is None
+    assert cache.get("Fecha", 'openai', 'gpt-4', 'v2') is None
+    assert prompt_version("prompt", 0.1) != prompt_version("prompt", 0.2)
+
+
+def test_source_text_is_not_stored(tmp_path):
+    path = tmp_path / 'cache.db'
+    cache = SegmentCache(path)
+    cache.put("Diagnóstico reservado", "Guarded prognosis", 'openai', 'gpt-4')
+    cache._conn.execute("PRAGMA wal_checkpoint(FULL)")
+    assert "Diagnóstico reservado".encode('utf-8') not in path.read_bytes()
+
+
+def test_ttl_expires_entries(tmp_path, clock):
+    cache = SegmentCache(tmp_path / 'cache.db', ttl_days=1)
+    cache.put("Fecha", "Date", 'openai', 'gpt-4')
+    clock.now += 86400 - 1
+    assert cache.get("Fecha", 'openai', 'gpt-4') == "Date"
+    clock.now += 2
+    assert cache.get("Fecha", 'openai', 'gpt-4') is None
+    assert cache.stats['expired'] == 1
+    assert len(cache) == 0
+
+
+def test_lru_eviction(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(segment_cache, 'EVICT_EVERY', 1)
+    cache = SegmentCache(tmp_path / 'cache.db', max_entries=2)
+    cache.put("uno", "one", 'openai', 'gpt-4')
+    clock.now += 1
+    cache.put("dos", "two", 'openai', 'gpt-4')
+    clock.now += 1
+    assert cache.get("uno", 'openai', 'gpt-4') == "one"  # Now more recent than "dos"
+    clock.now += 1
+    cache.put("tres", "three", 'openai', 'gpt-4')
+
+    assert len(cache) == 2
+    assert cache.get("dos", 'openai', 'gpt-4') is None
+    assert cache.get("uno", 'openai', 'gpt-4') == "one"
+    assert cache.get("tres", 'openai', 'gpt-4') == "three"
+    assert cache.stats['evictions'] == 1
+
+
+def test_shared_instance_per_path(tmp_path):
+    path = tmp_path / 'shared.db'
+    assert SegmentCache.shared(path) is SegmentCache.shared(str(path))
+
+
+def test_database_files_are_private(tmp_path):
+    path = tmp_path / 'cache.db'
+    cache = SegmentCache(path)
+    cache.put("Fecha", "Date", 'openai', 'gpt-4')
+    for suffix in ('', '-wal', '-shm'):
+        assert Path(f"{path}{suffix}").stat().st_mode & 0o777 == 0o600
+
+
+def test_memory_cache_writes_nothing_to_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = SegmentCache(MEMORY)
+    cache.put("Fecha", "Date", 'openai', 'gpt-4')
+    assert cache.get("Fecha", 'openai', 'gpt-4') == "Date"
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed OCR Cache for Enfermera Elena
+Skips Tesseract for pages whose pixels and OCR settings were already seen
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'enfermera_elena' / 'ocr'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the cached value format changes
+CACHE_VERSION = 1
+
+
+class NullCipher:
+    """Stores entries as-is (use only on an encrypted volume)"""
+
+    def encrypt(self, data: bytes) -> bytes:
+        return data
+
+    def decrypt(self, data: bytes) -> bytes:
+        return data
+
+
+class FernetCipher:
+    """AES-128-CBC + HMAC (Fernet) encryption at rest; needs `cryptography`"""
+
+    def __init__(self, key: Union[str, bytes]):
+        from cryptography.fernet import Fernet
+        self._fernet = Fernet(key)
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data)
+
+    def decrypt(self, data: bytes) -> bytes:
+        return self._fernet.decrypt(data)
+
+
+def default_cipher():
+    """Fernet if ENFERMERA_OCR_CACHE_KEY is set, otherwise no encryption"""
+    key = os.getenv('ENFERMERA_OCR_CACHE_KEY')
+    if not key:
+        return NullCipher()
+    try:
+        return FernetCipher(key)
+    except ImportError:
+        raise RuntimeError("ENFERMERA_OCR_CACHE_KEY is set but `cryptography` is not installed")
+
+
+class OCRCache:
+    """
+    On-disk OCR result cache keyed by content hash
+
+    Keys hash the page content (rendered pixels, or source PDF bytes plus
+    page number) together with every setting that changes the OCR output,
+    so an entry can never be served for a different image or config.
+    Entries hold PHI: files are private to the user and every value goes
+    through the cipher hook before it touches disk. Without a real cipher
+    the text is stored in plaintext, so callers only enable the cache on
+    request. The cache is bounded by total size and evicts least recently
+    used entries first.
+    """
+
+    def __init__(self,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 cipher=None):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Cache directory (default ENFERMERA_OCR_CACHE_DIR or
+                       ~/.cache/enfermera_elena/ocr)
+            max_bytes: Size bound for all entries together
+            cipher: Object with encrypt(bytes)/decrypt(bytes) methods
+                    (default: Fernet from ENFERMERA_OCR_CACHE_KEY, or none)
+        """
+        self.cache_dir = Path(cache_dir or os.getenv('ENFERMERA_OCR_CACHE_DIR')
+                              or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.cipher = cipher if cipher is not None else default_cipher()
+        if isinstance(self.cipher, NullCipher):
+            logger.warning(f"OCR cache at {self.cache_dir} stores page text (PHI) unencrypted; "
+                           "set ENFERMERA_OCR_CACHE_KEY unless the volume is encrypted")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.cache_dir, 0o700)
+
+        self._pdf_digests: Dict[Tuple[str, int, int], str] = {}
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+    # Keys
+
+    @staticmethod
+    def _key(content_digest: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({'v': CACHE_VERSION, 'content': content_digest,
+                              'params': params}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def key_for_image(self, image: Union[str, Path, Image.Image], **params) -> str:
+        """Key for a rendered page (pixels) or an image file (bytes)"""
+        digest = hashlib.sha256()
+        if isinstance(image, (str, Path)):
+            with open(image, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        else:
+            digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+            digest.update(image.tobytes())
+        return self._key(digest.hexdigest(), params)
+
+    def key_for_pdf_page(self, pdf_path: Union[str, Path], page_num: int, **params) -> str:
+        """Key for a PDF page before rendering (PDF bytes + page number)"""
+        return self._key(f"{self._pdf_digest(pdf_path)}:{page_num}", params)
+
+    def _pdf_digest(self, pdf_path: Union[str, Path]) -> str:
+        stat = os.stat(pdf_path)
+        memo_key = (str(Path(pdf_path).resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._pdf_digests.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(pdf_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(block)
+            digest = self._pdf_digests[memo_key] = sha.hexdigest()
+        return digest
+
+    # Entries
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached value, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = self.cipher.decrypt(f.read())
+        except FileNotFoundError:
+            self.stats['misses'] += 1
+            return None
+        except Exception as e:
+            # Corrupt entry or wrong key: drop it and recompute
+            logger.warning(f"Discarding unreadable OCR cache entry {key[:12]}: {e}")
+            self._remove(path)
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            pass  # Evicted by another process in the meantime
+        self.stats['hits'] += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store a value, evicting old entries if over the size bound"""
+        path = self._path(key)
+        path.parent.mkdir(mode=0o700, exist_ok=True)
+        payload = self.cipher.encrypt(data)
+
+        previous = path.stat().st_size if path.exists() else 0
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)  # Atomic, readers never see partial entries
+        except Exception:
+            self._remove(Path(tmp_path))
+            raise
+
+        self._total_bytes += len(payload) - previous
+        self.stats['writes'] += 1
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def get_json(self, key: str) -> Optional[Any]:
+        data = self.get(key)
+        return json.loads(data.decode('utf-8')) if data is not None else None
+
+    def put_json(self, key: str, value: Any):
+        self.put(key, json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+    def clear(self):
+        """Remove every entry"""
+        for path, _, _ in self._entries():
+            self._remove(path)
+        self._total_bytes = 0
+
+    def _entries(self):
+        """(path, size, last_used) for every entry on disk"""
+        for path in self.cache_dir.glob('??/*'):
+            if path.name.startswith('.tmp-'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of the bound"""
+        # Rescan: other processes may share the directory
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._total_bytes = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for path, size, _ in entries:
+            if self._total_bytes <= target:
+                break
+            self._remove(path)
+            self._total_bytes -= size
+            self.stats['evictions'] += 1
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
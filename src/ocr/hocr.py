@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Streaming hOCR Reader for Enfermera Elena
+Collects Tesseract paragraphs and lines in one event-driven pass, without building a tree
+"""
+
+import logging
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple, Union
+from xml.parsers import expat
+
+logger = logging.getLogger(__name__)
+
+# (tag, class) pairs collected, as Tesseract writes them
+PARAGRAPH = ('p', 'ocr_par')
+LINE = ('span', 'ocr_line')
+WORD_CLASS = 'ocrx_word'
+
+
+@dataclass
+class HOCRElement:
+    """A paragraph or line of an hOCR page"""
+    kind: str    # 'par' or 'line'
+    title: str   # Raw title attribute (bbox, baseline, x_wconf...)
+    text: str    # Words separated by single spaces
+
+
+class _HOCRCollector:
+    """
+    Event handler shared by the expat and HTMLParser front ends
+
+    Keeps a stack of open elements and the words of every open paragraph
+    and line; each element's text is final as soon as it closes.
+    """
+
+    def __init__(self):
+        self.paragraphs: List[HOCRElement] = []
+        self.lines: List[HOCRElement] = []
+        self._stack: List[Tuple[str, Optional[str], str]] = []  # (tag, kind, title)
+        self._open_words: List[List[str]] = []  # Words of each open par/line
+        self._word: Optional[List[str]] = None  # Pieces of the current word
+        self._text: List[str] = []  # Character data of the current text node
+
+    def start(self, tag: str, attrs: Dict[str, str]):
+        self._flush_text()
+        classes = (attrs.get('class') or '').split()
+        kind = None
+        if tag == PARAGRAPH[0] and PARAGRAPH[1] in classes:
+            kind = 'par'
+        elif tag == LINE[0] and LINE[1] in classes:
+            kind = 'line'
+        elif WORD_CLASS in classes and self._word is None:
+            kind = 'word'
+            self._word = []
+
+        if kind in ('par', 'line'):
+            self._open_words.append([])
+        self._stack.append((tag, kind, attrs.get('title', '')))
+
+    def end(self, tag: str):
+        self._flush_text()
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return  # Stray end tag (HTML input)
+        # Tolerate unclosed elements (HTML input): close up to the match
+        while self._stack:
+            open_tag, kind, title = self._stack.pop()
+            self._close(kind, title)
+            if open_tag == tag:
+                break
+
+    def data(self, text: str):
+        self._text.append(text)
+
+    def close(self):
+        self._flush_text()
+        while self._stack:
+            _, kind, title = self._stack.pop()
+            self._close(kind, title)
+
+    def _close(self, kind: Optional[str], title: str):
+        if kind == 'word':
+            self._add_word(''.join(self._word))
+            self._word = None
+        elif kind in ('par', 'line'):
+            element = HOCRElement(kind, title, ' '.join(self._open_words.pop()))
+            (self.paragraphs if kind == 'par' else self.lines).append(element)
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        text = ''.join(self._text).strip()
+        self._text = []
+        if not text or not self._open_words:
+            return
+        if self._word is not None:
+            self._word.append(text)
+        else:
+            self._add_word(text)  # Text outside word spans counts as a word
+
+    def _add_word(self, word: str):
+        if word:
+            for words in self._open_words:
+                words.append(word)
+
+
+class _HTMLFrontEnd(HTMLParser):
+    """Lenient fallback for hOCR that is not well-formed XML"""
+
+    def __init__(self, collector: _HOCRCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, {name: value or '' for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def parse_hocr_elements(hocr_data: Union[bytes, str]) -> Tuple[List[HOCRElement], List[HOCRElement]]:
+    """
+    Paragraphs and lines of an hOCR document, each in document order
+
+    Tesseract writes well-formed XHTML, which goes through expat (C, one
+    pass, no tree). Anything expat rejects is re-read with the lenient
+    HTMLParser.
+
+    Returns:
+        Tuple of (paragraphs, lines)
+    """
+    collector = _HOCRCollector()
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = collector.start
+    parser.EndElementHandler = collector.end
+    parser.CharacterDataHandler = collector.data
+
+    try:
+        parser.Parse(hocr_data, True)
+        collector.close()
+    except expat.ExpatError as e:
+        logger.debug(f"hOCR is not well-formed XML ({e}), using HTMLParser")
+        collector = _HOCRCollector()
+        front_end = _HTMLFrontEnd(collector)
+        if isinstance(hocr_data, bytes):
+            hocr_data = hocr_data.decode('utf-8', errors='replace')
+        front_end.feed(hocr_data)
+        front_end.close()
+        collector.close()
+
+    return collector.paragraphs, collector.lines
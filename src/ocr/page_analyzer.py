@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Ink-Density Page Analyzer for Enfermera Elena
+Spots blank and handwritten pages in milliseconds, before any Tesseract pass
+"""
+
+import time
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+BLANK = "blank"
+HANDWRITTEN = "handwritten"
+PRINTED = "printed"
+SPARSE = "sparse"
+
+# Bump when verdicts change, so cached OCR results of skipped pages are redone
+ANALYZER_VERSION = 2
+
+# Analysis resolution: longest side after downscaling (about 70 dpi for letter)
+ANALYSIS_SIZE = 800
+
+# Ignore scanner edges and punch holes
+MARGIN = 0.04
+
+# A page is blank only with next to no ink AND no marks left after noise
+# removal. A single line of text ("Alergia: PENICILINA") is about 0.0006
+# and 16 marks, so any real mark makes the page sparse, never blank.
+BLANK_INK_DENSITY = 0.0005
+BLANK_MAX_COMPONENTS = 0
+
+# Below this share of ink pixels (or with few marks) there is too little to
+# tell handwriting from print: the page is sparse and goes to Tesseract
+SPARSE_INK_DENSITY = 0.002
+SPARSE_MIN_COMPONENTS = 8
+
+# Handwriting: glyph heights vary widely and most ink sits in long
+# connected strokes. Anything in between (forms filled in by hand, poor
+# scans) is treated as printed, so only clear cases skip OCR.
+HANDWRITTEN_MAX_HEIGHT_REGULARITY = 0.75
+HANDWRITTEN_MIN_CONNECTED_INK = 0.5
+
+# A mark this many times wider than tall is a joined stroke, not a glyph
+CONNECTED_ASPECT = 1.5
+
+
+@dataclass
+class PageInkAnalysis:
+    """Ink statistics and verdict for one page"""
+    verdict: str                # blank, sparse, handwritten or printed
+    ink_density: float          # Share of ink pixels
+    components: int             # Connected marks (noise excluded)
+    median_height: float        # Typical mark height, in analysis pixels
+    height_regularity: float    # Share of marks close to the typical height
+    connected_ink: float        # Share of ink in marks much wider than tall (joined strokes)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {key: round(value, 4) if isinstance(value, float) else value
+                for key, value in asdict(self).items()}
+
+
+def downscale(image: Image.Image, size: int = ANALYSIS_SIZE) -> np.ndarray:
+    """Grayscale page as a uint8 array, reduced so its longest side is about `size`"""
+    gray = image if image.mode == 'L' else image.convert('L')
+    factor = max(1, round(max(gray.size) / size))
+    if factor > 1:
+        gray = gray.reduce(factor)  # Box filter: thin strokes fade but do not vanish
+    return np.asarray(gray, dtype=np.uint8)
+
+
+def ink_mask(gray: np.ndarray) -> np.ndarray:
+    """Boolean ink mask, with the threshold relative to the paper brightness"""
+    rows, cols = gray.shape
+    top, left = int(rows * MARGIN), int(cols * MARGIN)
+    gray = gray[top:rows - top, left:cols - left]
+    if gray.size == 0:
+        return np.zeros((0, 0), dtype=bool)
+
+    paper = float(np.percentile(gray, 90))
+    return gray < paper * 0.65
+
+
+def connected_components(ink: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    8-connected components of an ink mask, via horizontal runs
+
+    Runs are found with NumPy and merged across adjacent rows with a
+    union-find, so cost grows with the number of runs, not of pixels.
+
+    Returns:
+        Tuple of (heights, widths, areas) per component
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if not ink.any():
+        return empty, empty, empty
+
+    padded = np.zeros((ink.shape[0], ink.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = ink
+    edges = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)  # Exclusive; same row-major order
+
+    count = len(run_rows)
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    row_first = np.searchsorted(run_rows, np.arange(ink.shape[0] + 1))
+    starts_list = run_starts.tolist()
+    ends_list = run_ends.tolist()
+
+    for row in range(1, ink.shape[0]):
+        a, a_end = row_first[row - 1], row_first[row]
+        b, b_end = row_first[row], row_first[row + 1]
+        # Two pointers over the runs of the previous and current row
+        while a < a_end and b < b_end:
+            if starts_list[b] <= ends_list[a] and starts_list[a] <= ends_list[b]:
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+            if ends_list[a] < ends_list[b]:
+                a += 1
+            else:
+                b += 1
+
+    roots = np.fromiter((find(i) for i in range(count)), dtype=np.int64, count=count)
+    labels, inverse = np.unique(roots, return_inverse=True)
+    n = len(labels)
+
+    top = np.full(n, np.iinfo(np.int64).max)
+    bottom = np.zeros(n, dtype=np.int64)
+    left = np.full(n, np.iinfo(np.int64).max)
+    right = np.zeros(n, dtype=np.int64)
+    area = np.zeros(n, dtype=np.int64)
+    np.minimum.at(top, inverse, run_rows)
+    np.maximum.at(bottom, inverse, run_rows)
+    np.minimum.at(left, inverse, run_starts)
+    np.maximum.at(right, inverse, run_ends)
+    np.add.at(area, inverse, run_ends - run_starts)
+
+    return bottom - top + 1, right - left, area
+
+
+def analyze_page(image: Image.Image) -> PageInkAnalysis:
+    """
+    Classify a page image as blank, sparse, handwritten or printed
+
+    Works on a downscaled grayscale copy and takes a few milliseconds, so
+    it can run on every page before deciding whether to call Tesseract.
+    Only blank and handwritten pages may skip OCR; sparse pages (a few
+    words on an otherwise empty sheet) must still be read.
+    """
+    start = time.perf_counter()
+
+    ink = ink_mask(downscale(image))
+    density = float(ink.mean()) if ink.size else 0.0
+    heights, widths, areas = connected_components(ink)
+
+    # Drop specks and ruled lines (form borders, table rules)
+    keep = (areas >= 3) & ~((heights <= 2) & (widths >= 20)) & ~((widths <= 2) & (heights >= 20))
+    heights, widths, areas = heights[keep], widths[keep], areas[keep]
+
+    if density < BLANK_INK_DENSITY and len(heights) <= BLANK_MAX_COMPONENTS:
+        verdict = BLANK
+        median_height = regularity = connected = 0.0
+    elif density < SPARSE_INK_DENSITY or len(heights) < SPARSE_MIN_COMPONENTS:
+        verdict = SPARSE
+        median_height = regularity = connected = 0.0
+    else:
+        median_height = float(np.median(heights))
+        regularity = float(np.mean(np.abs(heights - median_height) <= 0.35 * median_height))
+        connected = float(areas[widths > CONNECTED_ASPECT * heights].sum() / areas.sum())
+
+        if (regularity < HANDWRITTEN_MAX_HEIGHT_REGULARITY
+                and connected > HANDWRITTEN_MIN_CONNECTED_INK):
+            verdict = HANDWRITTEN
+        else:
+            verdict = PRINTED
+
+    return PageInkAnalysis(
+        verdict=verdict,
+        ink_density=density,
+        components=int(len(heights)),
+        median_height=median_height,
+        height_regularity=regularity,
+        connected_ink=connected,
+        elapsed_ms=(time.perf_counter() - start) * 1000
+    )
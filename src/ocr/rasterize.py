@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Bounded-Memory PDF Rasterization for Enfermera Elena
+Renders scanned PDF pages one small window at a time for OCR
+"""
+
+import logging
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+logger = logging.getLogger(__name__)
+
+# Pages per poppler call: each call re-parses the PDF, while each extra page
+# held costs about 11 MB (RGB, 200 dpi, Letter)
+DEFAULT_RASTER_WINDOW = 4
+
+
+def pdf_page_count(pdf_path: str) -> int:
+    """Number of pages in a PDF (reads the document info only)"""
+    return int(pdfinfo_from_path(pdf_path)['Pages'])
+
+
+def render_pages(pdf_path: str,
+                 first_page: int,
+                 last_page: int,
+                 dpi: int = 200,
+                 grayscale: bool = False) -> List[Image.Image]:
+    """
+    Render a contiguous page range with one poppler invocation
+
+    Args:
+        pdf_path: PDF file
+        first_page: First page (1-based, inclusive)
+        last_page: Last page (1-based, inclusive)
+        dpi: Render resolution
+        grayscale: Render 8-bit grayscale (a third of the RGB memory;
+                   Tesseract converts to grayscale anyway)
+    """
+    return convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        first_page=first_page,
+        last_page=last_page,
+        grayscale=grayscale
+    )
+
+
+def render_page(pdf_path: str, page_num: int, dpi: int = 200,
+                grayscale: bool = False) -> Image.Image:
+    """Render a single page (1-based)"""
+    return render_pages(pdf_path, page_num, page_num, dpi, grayscale)[0]
+
+
+def page_windows(pages: Iterable[int], window: int = 1) -> List[Tuple[int, int]]:
+    """
+    Split sorted page numbers into (first, last) ranges for rendering
+
+    Each range covers consecutive pages only and at most `window` of them,
+    so pages that were not requested are never rendered.
+    """
+    window = max(1, window)
+    ranges: List[Tuple[int, int]] = []
+    for page_num in pages:
+        if (ranges and ranges[-1][1] == page_num - 1
+                and ranges[-1][1] - ranges[-1][0] + 1 < window):
+            ranges[-1] = (ranges[-1][0], page_num)
+        else:
+            ranges.append((page_num, page_num))
+    return ranges
+
+
+def iter_page_images(pdf_path: str,
+                     dpi: int = 200,
+                     grayscale: bool = False,
+                     window: int = 1,
+                     first_page: int = 1,
+                     last_page: Optional[int] = None,
+                     pages: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Yield (page_num, image) pairs, rendering `window` pages at a time
+
+    Only the current window is held in memory, so peak memory depends on
+    the window size and resolution, not on the page count. Drop the
+    image reference after use so each page is released as soon as it is
+    processed.
+
+    Args:
+        pages: Sorted 1-based page numbers to render instead of the
+               first_page..last_page range
+    """
+    if pages is None:
+        if last_page is None:
+            last_page = pdf_page_count(pdf_path)
+        pages = range(first_page, last_page + 1)
+
+    for start, end in page_windows(pages, window):
+        images = render_pages(pdf_path, start, end, dpi, grayscale)
+        logger.debug(f"Rendered pages {start}-{end} of {pdf_path}")
+
+        for offset in range(len(images)):
+            image = images[offset]
+            images[offset] = None  # Release with the caller's reference
+            yield start + offset, image
+            del image
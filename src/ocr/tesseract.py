@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Tesseract OCR Engine for Enfermera Elena
+Keeps the Spanish model loaded in long-lived workers instead of one process per call
+"""
+
+import os
+import queue
+import shlex
+import logging
+import importlib.util
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+import pytesseract
+
+from ocr.rasterize import render_page
+
+logger = logging.getLogger(__name__)
+
+# Column order of Tesseract TSV output (the API omits the header row)
+TSV_COLUMNS = ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+               'left', 'top', 'width', 'height', 'conf', 'text']
+
+HOCR_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"\n'
+    '    "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+    '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+    ' <head>\n'
+    '  <title></title>\n'
+    '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+    "  <meta name='ocr-system' content='tesseract'/>\n"
+    "  <meta name='ocr-capabilities' content='ocr_page ocr_carea ocr_par ocr_line ocrx_word'/>\n"
+    ' </head>\n'
+    ' <body>\n'
+)
+HOCR_FOOTER = ' </body>\n</html>\n'
+
+ImageSource = Union[str, Path, Image.Image]
+
+
+def tesserocr_available() -> bool:
+    """True when the tesserocr bindings (Tesseract C++ API) are installed"""
+    return importlib.util.find_spec('tesserocr') is not None
+
+
+def parse_config(config: str) -> Tuple[Optional[int], Optional[int], List[str]]:
+    """
+    Split a Tesseract CLI config string
+
+    Returns:
+        Tuple of (oem, psm, other_options)
+    """
+    oem = psm = None
+    other = []
+    args = shlex.split(config or '')
+    i = 0
+    while i < len(args):
+        if args[i] in ('--oem', '--psm') and i + 1 < len(args) and args[i + 1].isdigit():
+            if args[i] == '--oem':
+                oem = int(args[i + 1])
+            else:
+                psm = int(args[i + 1])
+            i += 2
+        else:
+            other.append(args[i])
+            i += 1
+    return oem, psm, other
+
+
+def tsv_to_dict(tsv: str) -> Dict[str, List]:
+    """TSV rows (with header) to the dict pytesseract returns for Output.DICT"""
+    result: Dict[str, List] = {}
+    rows = [row.split('\t') for row in tsv.strip().split('\n')]
+    if len(rows) < 2:
+        return result
+
+    header = rows.pop(0)
+    text_column = len(header) - 1
+    if len(rows[-1]) < len(header):
+        rows[-1].append('')  # strip() removed the empty text of the last row
+
+    for i, head in enumerate(header):
+        result[head] = []
+        for row in rows:
+            if len(row) <= i:
+                continue
+            value = row[i]
+            if i != text_column:
+                try:
+                    value = int(float(value))
+                except ValueError:
+                    pass
+            result[head].append(value)
+
+    return result
+
+
+class SubprocessTesseract:
+    """pytesseract backend: spawns tesseract (and reloads the model) for every call"""
+
+    name = 'subprocess'
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    def run(self, op: str, image: ImageSource, config: str) -> Any:
+        image = str(image) if isinstance(image, Path) else image
+        if op == 'data':
+            return pytesseract.image_to_data(image, lang=self.lang, config=config,
+                                             output_type=pytesseract.Output.DICT)
+        if op == 'text':
+            return pytesseract.image_to_string(image, lang=self.lang, config=config)
+        if op == 'hocr':
+            return pytesseract.image_to_pdf_or_hocr(image, lang=self.lang, config=config,
+                                                    extension='hocr')
+        raise ValueError(f"Unknown OCR operation: {op}")
+
+    def close(self):
+        pass
+
+
+class _TesseractSession:
+    """One loaded Tesseract API (tesserocr); not thread-safe"""
+
+    def __init__(self, lang: str, oem: Optional[int]):
+        import tesserocr
+        self._tesserocr = tesserocr
+        oem_value = tesserocr.OEM(oem) if oem is not None else tesserocr.OEM.DEFAULT
+        self.api = tesserocr.PyTessBaseAPI(lang=lang, oem=oem_value)
+
+    def run(self, op: str, image: ImageSource, psm: Optional[int]) -> Any:
+        api = self.api
+        # The CLI default is fully automatic segmentation (psm 3)
+        api.SetPageSegMode(self._tesserocr.PSM(psm if psm is not None else 3))
+        if isinstance(image, Image.Image):
+            api.SetImage(image)
+        else:
+            api.SetImageFile(str(image))
+
+        if op == 'data':
+            return tsv_to_dict('\t'.join(TSV_COLUMNS) + '\n' + api.GetTSVText(0))
+        if op == 'text':
+            return api.GetUTF8Text()
+        if op == 'hocr':
+            return (HOCR_HEADER + api.GetHOCRText(0) + HOCR_FOOTER).encode('utf-8')
+        raise ValueError(f"Unknown OCR operation: {op}")
+
+    def close(self):
+        self.api.End()
+
+
+class InProcessTesseract:
+    """tesserocr backend: the model is loaded once in this process"""
+
+    name = 'inprocess'
+
+    def __init__(self, lang: str, oem: Optional[int]):
+        import threading
+        self.lang = lang
+        self.oem = oem
+        self._session = _TesseractSession(lang, oem)
+        self._lock = threading.Lock()
+
+    def run(self, op: str, image: ImageSource, psm: Optional[int]) -> Any:
+        with self._lock:
+            return self._session.run(op, image, psm)
+
+    def close(self):
+        self._session.close()
+
+
+def _encode_image(image: ImageSource) -> Tuple:
+    """Picklable page image: raw pixels, or a path the worker opens itself"""
+    if isinstance(image, Image.Image):
+        return ('raw', image.mode, image.size, image.tobytes())
+    return ('path', str(image))
+
+
+def _decode_image(payload: Tuple) -> ImageSource:
+    if payload[0] == 'raw':
+        _, mode, size, data = payload
+        return Image.frombytes(mode, size, data)
+    return payload[1]
+
+
+def _worker_main(conn, lang: str, oem: Optional[int], threads: Optional[int]):
+    """OCR worker process: load the model once, then serve requests until closed"""
+    if threads:
+        os.environ['OMP_THREAD_LIMIT'] = str(threads)  # Before Tesseract is loaded
+    try:
+        session = _TesseractSession(lang, oem)
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+        return
+    conn.send((True, os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        op, psm, payload = request
+        try:
+            result = session.run(op, _decode_image(payload), psm)
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+    session.close()
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, context, lang: str, oem: Optional[int], threads: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, lang, oem, threads),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        ok, detail = self.conn.recv()
+        if not ok:
+            self.process.join()
+            raise RuntimeError(f"OCR worker failed to start: {detail}")
+
+    def close(self, timeout: float = 5.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class PersistentTesseract:
+    """
+    Pool of long-lived OCR worker processes
+
+    Each worker loads the model once and receives page images over a pipe,
+    so there is no process start, model load or temp file per page. A
+    Tesseract crash or a page taking longer than `timeout` only takes down
+    its worker, which is restarted; if restarts fail and no worker is
+    left, calls raise instead of waiting for one.
+    """
+
+    name = 'persistent'
+
+    def __init__(self, lang: str, oem: Optional[int], workers: int = 1,
+                 threads_per_worker: Optional[int] = None, timeout: float = 300.0):
+        self.lang = lang
+        self.oem = oem
+        self.threads_per_worker = threads_per_worker
+        self.timeout = timeout
+        self._context = multiprocessing.get_context()
+        self._idle: queue.Queue = queue.Queue()
+        self._workers: List[_Worker] = []
+
+        try:
+            for _ in range(max(1, workers)):
+                self._start_worker()
+        except Exception:
+            self.close()
+            raise
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self._context, self.lang, self.oem, self.threads_per_worker)
+        self._workers.append(worker)
+        self._idle.put(worker)
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        """Whether any worker is left to serve requests"""
+        return bool(self._workers)
+
+    def _acquire(self) -> _Worker:
+        while True:
+            if not self._workers:
+                raise RuntimeError("No OCR workers left")
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                continue  # All busy; re-check that some are still alive
+
+    def _replace(self, worker: _Worker):
+        self._workers.remove(worker)
+        worker.close(timeout=0)
+        try:
+            self._start_worker()
+        except Exception as e:
+            logger.error(f"Could not restart OCR worker ({e}); {len(self._workers)} left")
+
+    def run(self, op: str, image: ImageSource, psm: Optional[int]) -> Any:
+        payload = _encode_image(image)
+        worker = self._acquire()
+        try:
+            worker.conn.send((op, psm, payload))
+            if not worker.conn.poll(self.timeout):
+                raise TimeoutError(f"no result after {self.timeout:.0f}s")
+            ok, result = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            # Worker died or hung mid-page: replace it and report this page as failed
+            logger.warning(f"OCR worker {worker.process.pid} failed ({e}), restarting")
+            self._replace(worker)
+            raise RuntimeError(f"OCR worker crashed: {type(e).__name__} {e}".strip()) from e
+
+        self._idle.put(worker)
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+
+
+class TesseractOCREngine:
+    """
+    Tesseract behind one interface, whatever runs it
+
+    Backends:
+        persistent: `workers` long-lived processes fed over pipes (tesserocr)
+        inprocess:  the Tesseract API loaded in this process (tesserocr)
+        subprocess: pytesseract, one tesseract process per call
+
+    'auto' uses persistent workers (or the in-process API when workers=0)
+    if tesserocr is installed, and pytesseract otherwise. Calls with
+    options the API backends do not handle go through pytesseract.
+    """
+
+    def __init__(self,
+                 lang: str = 'spa',
+                 dpi: int = 300,
+                 config: str = '--oem 1 --psm 6',
+                 workers: int = 1,
+                 threads_per_worker: Optional[int] = None,
+                 backend: str = 'auto'):
+        """
+        Initialize OCR engine
+
+        Args:
+            lang: Tesseract language(s)
+            dpi: Rasterization resolution for ocr_page
+            config: Default Tesseract options
+            workers: Persistent worker processes (0 = in this process)
+            threads_per_worker: OMP_THREAD_LIMIT for each worker (None = no limit)
+            backend: 'auto', 'persistent', 'inprocess' or 'subprocess'
+        """
+        self.lang = lang
+        self.dpi = dpi
+        self.config = config
+        self.oem, _, _ = parse_config(config)
+        self._subprocess = SubprocessTesseract(lang)
+        self.backend = self._create_backend(backend, workers, threads_per_worker)
+        logger.info(f"OCR engine: {self.backend.name} backend ({lang})")
+
+    def _create_backend(self, backend: str, workers: int, threads_per_worker: Optional[int]):
+        if backend == 'auto':
+            if not tesserocr_available():
+                return self._subprocess
+            backend = 'persistent' if workers > 0 else 'inprocess'
+
+        if backend == 'subprocess':
+            return self._subprocess
+        if backend not in ('persistent', 'inprocess'):
+            raise ValueError(f"Unknown OCR backend: {backend}")
+
+        try:
+            if backend == 'inprocess':
+                return InProcessTesseract(self.lang, self.oem)
+            return PersistentTesseract(self.lang, self.oem, workers, threads_per_worker)
+        except Exception as e:
+            logger.warning(f"{backend} OCR backend unavailable ({e}), using pytesseract")
+            return self._subprocess
+
+    @property
+    def backend_name(self) -> str:
+        return self.backend.name
+
+    def _run(self, op: str, image: ImageSource, config: Optional[str]) -> Any:
+        config = self.config if config is None else config
+        if self.backend is self._subprocess:
+            return self._subprocess.run(op, image, config)
+
+        if not getattr(self.backend, 'alive', True):
+            logger.warning(f"No {self.backend.name} OCR workers left, using pytesseract")
+            self.backend.close()
+            self.backend = self._subprocess
+            return self._subprocess.run(op, image, config)
+
+        oem, psm, other = parse_config(config)
+        if other or (oem is not None and oem != self.oem):
+            return self._subprocess.run(op, image, config)
+        return self.backend.run(op, image, psm)
+
+    def image_to_data(self, image: ImageSource, config: Optional[str] = None) -> Dict[str, List]:
+        """Word boxes and confidences, as pytesseract.image_to_data(output_type=DICT)"""
+        return self._run('data', image, config)
+
+    def image_to_string(self, image: ImageSource, config: Optional[str] = None) -> str:
+        """Page text, as pytesseract.image_to_string"""
+        return self._run('text', image, config)
+
+    def image_to_hocr(self, image: ImageSource, config: Optional[str] = None) -> bytes:
+        """hOCR document, as pytesseract.image_to_pdf_or_hocr(extension='hocr')"""
+        return self._run('hocr', image, config)
+
+    def ocr_page(self, pdf_path: str, page_index: int) -> str:
+        """Rasterize one PDF page (0-based) and return its text"""
+        image = render_page(pdf_path, page_index + 1, self.dpi, grayscale=True)
+        return self.image_to_string(image)
+
+    def close(self):
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_engines: Dict[str, TesseractOCREngine] = {}
+
+
+def default_engine(lang: str = 'spa') -> TesseractOCREngine:
+    """
+    Process-wide engine for `lang`, created on first use
+
+    Runs Tesseract in this process, so it suits callers that are already
+    long-lived workers (e.g. a ProcessPoolExecutor worker).
+    """
+    engine = _default_engines.get(lang)
+    if engine is None:
+        engine = _default_engines[lang] = TesseractOCREngine(lang=lang, config='', workers=0)
+    return engine
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the ink-density page analyzer, on synthetic 300 dpi letter pages
+Run with: python -m pytest src
+"""
+
+import sys
+import math
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ocr.page_analyzer import (BLANK, HANDWRITTEN, PRINTED, SPARSE, analyze_page,
+                               connected_components)
+
+PAGE_SIZE = (2550, 3300)
+TEXT_SCALE = 4
+
+
+def page(lines=(), specks: int = 0) -> Image.Image:
+    """White page with printed lines (12 pt) and optional scanner dust"""
+    image = Image.new('L', PAGE_SIZE, 255)
+    font = ImageFont.load_default()
+    for i, line in enumerate(lines):
+        # The bitmap font is about 11 px tall: draw small, scale to 12 pt
+        left, top, right, bottom = font.getbbox(line)
+        strip = Image.new('L', (right + 2, bottom + 2), 255)
+        ImageDraw.Draw(strip).text((1, 1), line, fill=0, font=font)
+        strip = strip.resize((strip.width * TEXT_SCALE, strip.height * TEXT_SCALE), Image.NEAREST)
+        image.paste(strip, (300, 400 + i * 80))
+    draw = ImageDraw.Draw(image)
+
+    rng = random.Random(0)
+    for _ in range(specks):
+        x, y = rng.randrange(200, 2350), rng.randrange(200, 3100)
+        draw.rectangle((x, y, x + 2, y + 2), fill=0)
+    return image
+
+
+def handwritten_page() -> Image.Image:
+    """Joined strokes of irregular height, like cursive"""
+    image = Image.new('L', PAGE_SIZE, 255)
+    draw = ImageDraw.Draw(image)
+    rng = random.Random(1)
+    for row in range(25):
+        y, x = 400 + row * 110, 300
+        while x < 2200:
+            width, amplitude, period = rng.randint(150, 400), rng.randint(10, 45), rng.uniform(8, 20)
+            draw.line([(x + t, y + amplitude * math.sin(t / period)) for t in range(width)],
+                      fill=0, width=6)
+            x += width + rng.randint(40, 80)
+    return image
+
+
+def test_empty_page_is_blank():
+    analysis = analyze_page(page())
+    assert analysis.verdict == BLANK
+    assert analysis.ink_density == 0.0 and analysis.components == 0
+
+
+def test_dust_is_blank():
+    assert analyze_page(page(specks=200)).verdict == BLANK
+
+
+@pytest.mark.parametrize('line', ["Alergia: PENICILINA", "Fecha: 12/03/2024 Firma: Dr. Ruiz", "Sí"])
+def test_sparse_text_is_never_blank(line):
+    analysis = analyze_page(page([line], specks=40))
+    assert analysis.verdict == SPARSE
+    assert analysis.components >= 1
+
+
+def test_printed_page():
+    analysis = analyze_page(page(["Paciente con HTA controlada y DM2, glucosa 110 mg/dL"] * 30))
+    assert analysis.verdict == PRINTED
+    assert analysis.height_regularity > 0.75
+
+
+def test_handwritten_page():
+    analysis = analyze_page(handwritten_page())
+    assert analysis.verdict == HANDWRITTEN
+    assert analysis.connected_ink > 0.5
+
+
+def test_form_rules_are_not_marks():
+    image = page()
+    draw = ImageDraw.Draw(image)
+    for y in range(500, 3000, 100):
+        draw.line([(250, y), (2300, y)], fill=0, width=3)
+    analysis = analyze_page(image)
+    assert analysis.components == 0
+    assert analysis.verdict == SPARSE  # Ink, but nothing to classify: left to Tesseract
+
+
+def test_rgb_pages():
+    assert analyze_page(page(["Alergia: PENICILINA"]).convert('RGB')).verdict == SPARSE
+
+
+def test_connected_components():
+    ink = np.zeros((8, 10), dtype=bool)
+    ink[1:4, 1:3] = True          # 3x2 block
+    ink[4, 3] = True              # Diagonal neighbour joins it (8-connected)
+    ink[6, 6:10] = True           # Separate run
+    heights, widths, areas = connected_components(ink)
+    assert sorted(zip(heights.tolist(), widths.tolist(), areas.tolist())) == [(1, 4, 4), (4, 3, 7)]
+    assert [len(part) for part in connected_components(np.zeros((3, 3), dtype=bool))] == [0, 0, 0]
@@ -7,17 +7,18 @@ Maintains original document structure during translation
 import os
 import json
 import logging
+from bisect import bisect_left
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 import tempfile
 import subprocess
 
+import numpy as np
 import pdfplumber
-from pdf2image import convert_from_path
 from PIL import Image
-import pytesseract
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.pdfbase import pdfmetrics
@@ -25,6 +26,13 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import black, blue, red
 import fitz  # PyMuPDF for better PDF manipulation
 
+from ocr.cache import OCRCache
+from ocr.hocr import parse_hocr_elements
+from ocr.rasterize import DEFAULT_RASTER_WINDOW, iter_page_images
+from ocr.tesseract import TesseractOCREngine
+from mt.batching import DEFAULT_MAX_BATCH_CHARS, translate_batched
+from mt.dedup import SegmentDeduplicator
+
 logger = logging.getLogger(__name__)
 
 
@@ -72,14 +80,22 @@ class TextBlock:
 class LayoutAnalyzer:
     """Analyzes document layout and extracts structured text blocks"""
     
-    def __init__(self, use_deep_learning: bool = False):
+    def __init__(self, use_deep_learning: bool = False, ocr_cache: Optional[OCRCache] = None,
+                 ocr_engine: Optional[TesseractOCREngine] = None):
         """
         Initialize layout analyzer
         
         Args:
             use_deep_learning: Use LayoutParser with Detectron2 (requires GPU)
+            ocr_cache: Reuse hOCR of previously seen page images
+            ocr_engine: OCR engine for scanned pages (default: a persistent
+                        Tesseract worker, started on first use)
         """
         self.use_deep_learning = use_deep_learning
+        self.ocr_cache = ocr_cache
+        self.ocr_lang = 'spa'
+        self.ocr_config = '--oem 1 --psm 6'
+        self._ocr_engine = ocr_engine
         
         if use_deep_learning:
             try:
@@ -94,115 +110,153 @@ class LayoutAnalyzer:
                 logger.warning("LayoutParser not available, falling back to heuristics")
                 self.use_deep_learning = False
                 
-    def analyze_digital_page(self, pdf_path: str, page_num: int) -> List[TextBlock]:
-        """Extract layout from born-digital PDF page using pdfplumber"""
+    def analyze_digital_page(self, source: Union[str, Any], page_num: int) -> List[TextBlock]:
+        """
+        Extract layout from born-digital PDF page using pdfplumber
+
+        Args:
+            source: Open pdfplumber document or page (preferred when analyzing
+                    several pages), or a PDF path, which is opened for this call
+            page_num: Page index (0-based)
+        """
+        if isinstance(source, (str, Path)):
+            with pdfplumber.open(source) as pdf:
+                return self.analyze_digital_page(pdf, page_num)
+
+        if isinstance(source, pdfplumber.PDF):  # Page objects also have a (None) .pages
+            if page_num >= len(source.pages):
+                return []
+            page = source.pages[page_num]
+        else:
+            page = source
+
         blocks = []
-        
-        with pdfplumber.open(pdf_path) as pdf:
-            if page_num >= len(pdf.pages):
-                return blocks
-                
-            page = pdf.pages[page_num]
-            
-            # Extract words with positions
-            words = page.extract_words(
-                x_tolerance=3,
-                y_tolerance=3,
-                keep_blank_chars=False
-            )
-            
-            # Extract tables separately
-            tables = page.find_tables()
-            
-            # Group words into lines
-            lines = self._group_words_into_lines(words)
-            
-            # Group lines into blocks
-            text_blocks = self._group_lines_into_blocks(lines, page_num)
-            
-            # Handle tables
-            for table in tables:
-                if table.bbox:
-                    table_text = self._extract_table_text(table)
-                    blocks.append(TextBlock(
-                        page_num=page_num,
-                        bbox=table.bbox,
-                        text=table_text,
-                        block_type=BlockType.TABLE,
-                        confidence=1.0
-                    ))
-                    
-            blocks.extend(text_blocks)
-            
+
+        # Extract words with positions
+        words = page.extract_words(
+            x_tolerance=3,
+            y_tolerance=3,
+            keep_blank_chars=False
+        )
+
+        # Extract tables separately
+        tables = page.find_tables()
+
+        # Group words into lines and lines into blocks
+        text_blocks = self._group_words_into_blocks(words, page_num)
+
+        # Handle tables
+        for table in tables:
+            if table.bbox:
+                table_text = self._extract_table_text(table)
+                blocks.append(TextBlock(
+                    page_num=page_num,
+                    bbox=table.bbox,
+                    text=table_text,
+                    block_type=BlockType.TABLE,
+                    confidence=1.0
+                ))
+
+        blocks.extend(text_blocks)
+
         return blocks
         
-    def analyze_scanned_page(self, image_path: str, page_num: int) -> List[TextBlock]:
-        """Extract layout from scanned page using OCR with hOCR"""
+    def analyze_scanned_page(self, image: Union[str, Image.Image], page_num: int) -> List[TextBlock]:
+        """
+        Extract layout from scanned page using OCR with hOCR
+
+        Args:
+            image: Rendered page image, or path to an image file
+            page_num: Page index (0-based)
+        """
         blocks = []
         
         # Get hOCR output from Tesseract
-        hocr_data = pytesseract.image_to_pdf_or_hocr(
-            image_path,
-            lang='spa',
-            config='--oem 1 --psm 6',
-            extension='hocr'
-        )
+        hocr_data = self._hocr(image)
         
         # Parse hOCR to extract blocks with coordinates
         blocks = self._parse_hocr(hocr_data, page_num)
         
         # If deep learning is enabled, refine block types
         if self.use_deep_learning:
-            blocks = self._refine_with_layout_model(image_path, blocks)
+            blocks = self._refine_with_layout_model(image, blocks)
             
         return blocks
         
-    def _group_words_into_lines(self, words: List[Dict]) -> List[List[Dict]]:
-        """Group words into lines based on vertical position"""
+    @property
+    def ocr_engine(self) -> TesseractOCREngine:
+        if self._ocr_engine is None:
+            self._ocr_engine = TesseractOCREngine(lang=self.ocr_lang, config=self.ocr_config)
+        return self._ocr_engine
+        
+    def _hocr(self, image: Union[str, Image.Image]) -> bytes:
+        """Tesseract hOCR for a page image, served from the OCR cache when possible"""
+        key = None
+        if self.ocr_cache is not None:
+            key = self.ocr_cache.key_for_image(image, lang=self.ocr_lang,
+                                               config=self.ocr_config, output='hocr')
+            hocr_data = self.ocr_cache.get(key)
+            if hocr_data is not None:
+                return hocr_data
+                
+        hocr_data = self.ocr_engine.image_to_hocr(image, self.ocr_config)
+        
+        if key is not None:
+            try:
+                self.ocr_cache.put(key, hocr_data)
+            except OSError as e:
+                logger.warning(f"Could not cache hOCR: {e}")
+        return hocr_data
+        
+    # Words on a line start within this distance of the line's first word
+    LINE_TOLERANCE = 5
+    # Vertical gap between lines that starts a new block
+    BLOCK_GAP = 15
+        
+    def _group_words_into_blocks(self, words: List[Dict], page_num: int) -> List[TextBlock]:
+        """
+        Group words into lines, and lines into logical blocks (paragraphs, titles, etc.)
+        
+        Word coordinates are copied into NumPy arrays once; sorting, line
+        clustering, paragraph gaps and bounding boxes are array operations,
+        so Python only loops once per line and once per block.
+        """
         if not words:
             return []
             
-        # Sort by vertical position, then horizontal
-        words.sort(key=lambda w: (w['top'], w['x0']))
-        
-        lines = []
-        current_line = [words[0]]
-        current_top = words[0]['top']
+        x0, top, x1, bottom = (
+            np.fromiter(map(itemgetter(key), words), dtype=float, count=len(words))
+            for key in ('x0', 'top', 'x1', 'bottom')
+        )
         
-        for word in words[1:]:
-            # If word is on same line (within threshold)
-            if abs(word['top'] - current_top) < 5:
-                current_line.append(word)
-            else:
-                lines.append(current_line)
-                current_line = [word]
-                current_top = word['top']
-                
-        if current_line:
-            lines.append(current_line)
-            
-        return lines
+        # Sort by vertical position, then horizontal (stable, like list.sort)
+        order = np.lexsort((x0, top))
+        words = list(itemgetter(*order.tolist())(words)) if len(words) > 1 else list(words)
+        x0, top, x1, bottom = x0[order], top[order], x1[order], bottom[order]
+        
+        # Lines, then blocks where the gap to the previous line is large
+        line_starts = self._line_starts(top)
+        line_top = np.minimum.reduceat(top, line_starts)
+        line_bottom = np.maximum.reduceat(bottom, line_starts)
+        gaps = line_top[1:] - line_bottom[:-1]
+        block_lines = np.concatenate(([0], np.flatnonzero(~(gaps < self.BLOCK_GAP)) + 1))
+        block_starts = line_starts[block_lines]
+        
+        # Bounding boxes of all blocks at once
+        bbox_x0 = np.minimum.reduceat(x0, block_starts).tolist()
+        bbox_y0 = np.minimum.reduceat(top, block_starts).tolist()
+        bbox_x1 = np.maximum.reduceat(x1, block_starts).tolist()
+        bbox_y1 = np.maximum.reduceat(bottom, block_starts).tolist()
+        block_ends = block_starts[1:].tolist() + [len(words)]
         
-    def _group_lines_into_blocks(self, lines: List[List[Dict]], page_num: int) -> List[TextBlock]:
-        """Group lines into logical blocks (paragraphs, titles, etc.)"""
         blocks = []
-        
-        for line_group in self._identify_line_groups(lines):
-            # Combine words in lines
-            text = ' '.join(' '.join(word['text'] for word in line) for line in line_group)
-            
-            # Calculate bounding box
-            all_words = [word for line in line_group for word in line]
-            if not all_words:
-                continue
-                
-            x0 = min(w['x0'] for w in all_words)
-            y0 = min(w['top'] for w in all_words)
-            x1 = max(w['x1'] for w in all_words)
-            y1 = max(w['bottom'] for w in all_words)
+        for i, (start, end) in enumerate(zip(block_starts.tolist(), block_ends)):
+            all_words = words[start:end]
+            text = ' '.join(map(itemgetter('text'), all_words))
+            bbox = (bbox_x0[i], bbox_y0[i], bbox_x1[i], bbox_y1[i])
             
             # Determine block type based on heuristics
-            block_type = self._classify_block(text, (x1-x0), (y1-y0), all_words)
+            block_type = self._classify_block(text, (bbox[2]-bbox[0]), (bbox[3]-bbox[1]), all_words)
             
             # Get font info from first word
             font_size = all_words[0].get('height', 12)
@@ -210,7 +264,7 @@ class LayoutAnalyzer:
             
             blocks.append(TextBlock(
                 page_num=page_num,
-                bbox=(x0, y0, x1, y1),
+                bbox=bbox,
                 text=text,
                 block_type=block_type,
                 font_size=font_size,
@@ -219,34 +273,30 @@ class LayoutAnalyzer:
             
         return blocks
         
-    def _identify_line_groups(self, lines: List[List[Dict]]) -> List[List[List[Dict]]]:
-        """Identify groups of lines that form logical blocks"""
-        if not lines:
-            return []
-            
-        groups = []
-        current_group = [lines[0]]
+    def _line_starts(self, tops: np.ndarray) -> np.ndarray:
+        """
+        Index of the first word of every line (tops sorted ascending)
         
-        for i in range(1, len(lines)):
-            prev_line = lines[i-1]
-            curr_line = lines[i]
-            
-            # Calculate vertical gap
-            prev_bottom = max(w['bottom'] for w in prev_line)
-            curr_top = min(w['top'] for w in curr_line)
-            gap = curr_top - prev_bottom
-            
-            # If gap is small, same paragraph
-            if gap < 15:  # Threshold for paragraph break
-                current_group.append(curr_line)
-            else:
-                groups.append(current_group)
-                current_group = [curr_line]
-                
-        if current_group:
-            groups.append(current_group)
-            
-        return groups
+        A line holds the words whose top is within LINE_TOLERANCE of the top
+        of its first word, so each boundary is one binary search.
+        """
+        tops = tops.tolist()
+        starts = []
+        start = 0
+        count = len(tops)
+        
+        while start < count:
+            starts.append(start)
+            line_top = tops[start]
+            end = bisect_left(tops, line_top + self.LINE_TOLERANCE, start)
+            # Settle float rounding with the same comparison as the word loop
+            while end > start + 1 and not tops[end - 1] - line_top < self.LINE_TOLERANCE:
+                end -= 1
+            while end < count and tops[end] - line_top < self.LINE_TOLERANCE:
+                end += 1
+            start = max(end, start + 1)
+            
+        return np.array(starts, dtype=np.intp)
         
     def _classify_block(self, text: str, width: float, height: float, words: List[Dict]) -> BlockType:
         """Classify block type based on heuristics"""
@@ -286,45 +336,29 @@ class LayoutAnalyzer:
         return '\n'.join(rows_text)
         
     def _parse_hocr(self, hocr_data: bytes, page_num: int) -> List[TextBlock]:
-        """Parse hOCR output to extract text blocks with coordinates"""
-        from bs4 import BeautifulSoup
-        
+        """Parse hOCR output to extract text blocks with coordinates (single streaming pass)"""
         blocks = []
-        soup = BeautifulSoup(hocr_data, 'html.parser')
+        paragraphs, lines = parse_hocr_elements(hocr_data)
         
-        # Find all paragraph blocks
-        for para in soup.find_all('p', class_='ocr_par'):
+        # Paragraph blocks
+        for para in paragraphs:
             # Extract bounding box
-            title = para.get('title', '')
-            bbox = self._extract_bbox_from_title(title)
-            if not bbox:
-                continue
-                
-            # Extract text
-            text = para.get_text(strip=True)
-            if not text:
+            bbox = self._extract_bbox_from_title(para.title)
+            if not bbox or not para.text:
                 continue
                 
-            # Get confidence if available
-            confidence = self._extract_confidence_from_title(title)
-            
             blocks.append(TextBlock(
                 page_num=page_num,
                 bbox=bbox,
-                text=text,
+                text=para.text,
                 block_type=BlockType.PARAGRAPH,
-                confidence=confidence
+                confidence=self._extract_confidence_from_title(para.title)
             ))
             
         # Also extract line-level blocks for finer control
-        for line in soup.find_all('span', class_='ocr_line'):
-            title = line.get('title', '')
-            bbox = self._extract_bbox_from_title(title)
-            if not bbox:
-                continue
-                
-            text = line.get_text(strip=True)
-            if not text:
+        for line in lines:
+            bbox = self._extract_bbox_from_title(line.title)
+            if not bbox or not line.text:
                 continue
                 
             # Check if this line is already part of a paragraph
@@ -332,7 +366,7 @@ class LayoutAnalyzer:
                 blocks.append(TextBlock(
                     page_num=page_num,
                     bbox=bbox,
-                    text=text,
+                    text=line.text,
                     block_type=BlockType.PARAGRAPH,
                     confidence=0.9
                 ))
@@ -360,7 +394,7 @@ class LayoutAnalyzer:
         return (outer[0] <= inner[0] and outer[1] <= inner[1] and
                 outer[2] >= inner[2] and outer[3] >= inner[3])
         
-    def _refine_with_layout_model(self, image_path: str, blocks: List[TextBlock]) -> List[TextBlock]:
+    def _refine_with_layout_model(self, image: Union[str, Image.Image], blocks: List[TextBlock]) -> List[TextBlock]:
         """Refine block types using deep learning model"""
         # This would use LayoutParser to improve classification
         # Implementation depends on model availability
@@ -370,56 +404,106 @@ class LayoutAnalyzer:
 class LayoutPreservingTranslator:
     """Translates text while preserving document layout"""
     
-    def __init__(self, translator, glossary_path: Optional[str] = None):
+    def __init__(self,
+                 translator,
+                 glossary_path: Optional[str] = None,
+                 batch_pages: int = 1,
+                 max_batch_chars: int = DEFAULT_MAX_BATCH_CHARS,
+                 deduplicate: bool = True):
         """
         Initialize layout-preserving translator
         
         Args:
             translator: Translation backend (LibreTranslate, ALIA, etc.)
             glossary_path: Path to UMLS glossary
+            batch_pages: Pages whose blocks share one backend request (0 = one request per block)
+            max_batch_chars: Size bound for one batched request
+            deduplicate: Translate repeated headers, footers and labels once per document
         """
         self.translator = translator
         self.glossary_path = glossary_path
+        self.batch_pages = batch_pages
+        self.max_batch_chars = max_batch_chars
+        self.deduplicate = deduplicate
+        self.stats = {'requests': 0, 'batched': 0, 'fallbacks': 0,
+                      'segments_total': 0, 'segments_unique': 0}
         
     def translate_blocks(self, blocks: List[TextBlock]) -> List[TextBlock]:
         """Translate text blocks while preserving structure"""
-        translated_blocks = []
+        # Skip non-text and empty blocks
+        pending = [i for i, block in enumerate(blocks)
+                   if block.block_type not in [BlockType.SIGNATURE, BlockType.STAMP]
+                   and block.text.strip()]
+        if self.deduplicate:
+            # Repeated segments reuse the translation of their first occurrence
+            dedup = SegmentDeduplicator()
+            translations = dedup.translate(
+                [blocks[i].text for i in pending],
+                lambda first: self._translate_texts([blocks[pending[i]] for i in first])
+            )
+            for key, value in dedup.stats.items():
+                self.stats[key] += value
+        else:
+            translations = self._translate_texts([blocks[i] for i in pending])
+            self.stats['segments_total'] += len(pending)
+            self.stats['segments_unique'] += len(pending)
+        translated_by_index = dict(zip(pending, translations))
         
-        for block in blocks:
-            # Skip non-text blocks
-            if block.block_type in [BlockType.SIGNATURE, BlockType.STAMP]:
+        translated_blocks = []
+        for i, block in enumerate(blocks):
+            if i not in translated_by_index:
                 translated_blocks.append(block)
                 continue
                 
-            # Translate text
-            if block.text.strip():
-                translated_text = self.translator.translate(block.text)
-                
-                # Adjust for text expansion/contraction
-                translated_text = self._adjust_text_length(
-                    translated_text,
-                    block.bbox,
-                    block.font_size
-                )
-                
-                # Create new block with translated text
-                translated_block = TextBlock(
-                    page_num=block.page_num,
-                    bbox=block.bbox,
-                    text=translated_text,
-                    block_type=block.block_type,
-                    confidence=block.confidence,
-                    font_size=block.font_size,
-                    font_name=block.font_name,
-                    is_bold=block.is_bold,
-                    is_italic=block.is_italic
-                )
-                translated_blocks.append(translated_block)
-            else:
-                translated_blocks.append(block)
+            # Adjust for text expansion/contraction
+            translated_text = self._adjust_text_length(
+                translated_by_index[i],
+                block.bbox,
+                block.font_size
+            )
+            
+            # Create new block with translated text
+            translated_block = TextBlock(
+                page_num=block.page_num,
+                bbox=block.bbox,
+                text=translated_text,
+                block_type=block.block_type,
+                confidence=block.confidence,
+                font_size=block.font_size,
+                font_name=block.font_name,
+                is_bold=block.is_bold,
+                is_italic=block.is_italic
+            )
+            translated_blocks.append(translated_block)
                 
         return translated_blocks
         
+    def _translate_texts(self, blocks: List[TextBlock]) -> List[str]:
+        """Block texts translated with one request per batch_pages pages"""
+        if self.batch_pages <= 0:
+            self.stats['requests'] += len(blocks)
+            return [self.translator.translate(block.text) for block in blocks]
+            
+        # Blocks arrive in page order; cut a window every batch_pages pages
+        translations = []
+        window: List[TextBlock] = []
+        window_start = None
+        for block in blocks + [None]:
+            if block is None or (window and block.page_num >= window_start + self.batch_pages):
+                translations.extend(translate_batched(
+                    [b.text for b in window],
+                    self.translator.translate,
+                    max_chars=self.max_batch_chars,
+                    stats=self.stats
+                ))
+                window = []
+            if block is not None:
+                if not window:
+                    window_start = block.page_num
+                window.append(block)
+                
+        return translations
+        
     def _adjust_text_length(self, text: str, bbox: Tuple, font_size: Optional[float]) -> str:
         """Adjust text to fit within bounding box"""
         # Simple heuristic: truncate if too long
@@ -589,7 +673,10 @@ class LayoutPreservingPipeline:
     def __init__(self,
                  translator,
                  use_deep_learning: bool = False,
-                 maintain_images: bool = True):
+                 maintain_images: bool = True,
+                 use_ocr_cache: bool = False,
+                 batch_pages: int = 1,
+                 raster_window: int = DEFAULT_RASTER_WINDOW):
         """
         Initialize complete pipeline
         
@@ -597,10 +684,19 @@ class LayoutPreservingPipeline:
             translator: Translation backend
             use_deep_learning: Use LayoutParser for analysis
             maintain_images: Keep original pages as background
+            use_ocr_cache: Reuse OCR of unchanged scanned pages across runs
+                           (stores page text on disk; see ENFERMERA_OCR_CACHE_KEY)
+            batch_pages: Pages whose blocks share one translation request (0 = per block)
+            raster_window: Most scanned pages rendered per poppler call; each
+                           contiguous run of scanned pages is rendered in calls of
+                           up to this many pages. Peak memory grows with it, not
+                           with the page count
         """
-        self.analyzer = LayoutAnalyzer(use_deep_learning)
-        self.translator = LayoutPreservingTranslator(translator)
+        self.analyzer = LayoutAnalyzer(use_deep_learning,
+                                       ocr_cache=OCRCache() if use_ocr_cache else None)
+        self.translator = LayoutPreservingTranslator(translator, batch_pages=batch_pages)
         self.writer = LayoutPreservingPDFWriter(maintain_images)
+        self.raster_window = max(1, raster_window)
         
     def process_document(self,
                         input_pdf: str,
@@ -626,8 +722,10 @@ class LayoutPreservingPipeline:
         
         # Extract layout structure
         logger.info("Extracting document layout...")
-        all_blocks = []
+        blocks_by_page: Dict[int, List[TextBlock]] = {}
+        scanned_pages = []
         
+        # One pdfplumber session for the whole document
         with pdfplumber.open(input_pdf) as pdf:
             num_pages = min(len(pdf.pages), page_limit) if page_limit else len(pdf.pages)
             
@@ -638,17 +736,27 @@ class LayoutPreservingPipeline:
                 page = pdf.pages[page_num]
                 if page.extract_text():
                     # Digital page
-                    blocks = self.analyzer.analyze_digital_page(input_pdf, page_num)
+                    blocks_by_page[page_num] = self.analyzer.analyze_digital_page(page, page_num)
                 else:
-                    # Scanned page - need OCR
-                    # Convert to image first
-                    images = convert_from_path(input_pdf, first_page=page_num+1, last_page=page_num+1)
-                    if images:
-                        with tempfile.NamedTemporaryFile(suffix='.png') as tmp:
-                            images[0].save(tmp.name)
-                            blocks = self.analyzer.analyze_scanned_page(tmp.name, page_num)
-                            
-                all_blocks.extend(blocks)
+                    # Scanned page - OCR after the text pass
+                    scanned_pages.append(page_num)
+                    
+                # Drop pdfplumber's cached objects for pages already analyzed
+                if hasattr(page, 'flush_cache'):
+                    page.flush_cache()
+                    
+        # Rasterize contiguous runs of scanned pages a window per poppler call,
+        # releasing each page once analyzed
+        images = iter_page_images(input_pdf, window=self.raster_window,
+                                  pages=[page_num + 1 for page_num in scanned_pages])
+        for page_number, image in images:
+            logger.info(f"OCR of scanned page {page_number}")
+            blocks_by_page[page_number - 1] = self.analyzer.analyze_scanned_page(image, page_number - 1)
+            del image
+                
+        all_blocks = []
+        for page_num in sorted(blocks_by_page):
+            all_blocks.extend(blocks_by_page[page_num])
                 
         stats['pages_processed'] = num_pages
         stats['blocks_extracted'] = len(all_blocks)
@@ -657,6 +765,10 @@ class LayoutPreservingPipeline:
         logger.info(f"Translating {len(all_blocks)} text blocks...")
         translated_blocks = self.translator.translate_blocks(all_blocks)
         stats['blocks_translated'] = len(translated_blocks)
+        stats['translation_requests'] = self.translator.stats['requests']
+        stats['batch_fallbacks'] = self.translator.stats['fallbacks']
+        stats['segments_total'] = self.translator.stats['segments_total']
+        stats['segments_unique'] = self.translator.stats['segments_unique']
         
         # Recreate PDF with layout
         logger.info("Creating translated PDF with preserved layout...")
@@ -704,4 +816,6 @@ if __name__ == "__main__":
     print(f"  Pages: {stats['pages_processed']}")
     print(f"  Blocks extracted: {stats['blocks_extracted']}")
     print(f"  Blocks translated: {stats['blocks_translated']}")
+    print(f"  Unique segments: {stats['segments_unique']}/{stats['segments_total']}")
+    print(f"  Translation requests: {stats['translation_requests']}")
     print(f"  Output: {output_pdf}")
\ No newline at end of file
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Per-Page Text Layer Classifier for Enfermera Elena
+Decides page by page whether a PDF needs OCR, using PyMuPDF
+"""
+
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+# A page with fewer visible characters than this has no usable text layer
+MIN_TEXT_CHARS = 50
+
+# A page mostly covered by images is a scan; a small text layer on top of
+# it (scanner header, stamped footer) does not make it digital
+SCAN_IMAGE_COVERAGE = 0.6
+MIN_TEXT_CHARS_ON_SCAN = 200
+
+
+@dataclass
+class PageTextLayer:
+    """Text layer statistics and routing decision for one page"""
+    page_num: int           # 1-based
+    char_count: int         # Non-whitespace characters in the text layer
+    image_coverage: float   # Fraction of the page area covered by images
+    needs_ocr: bool
+
+    @property
+    def route(self) -> str:
+        return "ocr" if self.needs_ocr else "text_layer"
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['image_coverage'] = round(self.image_coverage, 3)
+        result['route'] = self.route
+        return result
+
+
+def image_coverage(page: "fitz.Page") -> float:
+    """Fraction of the page area covered by placed images (capped at 1.0)"""
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    if page_area <= 0:
+        return 0.0
+
+    covered = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info['bbox']) & page_rect
+        if not bbox.is_empty:
+            covered += bbox.width * bbox.height
+
+    return min(1.0, covered / page_area)
+
+
+def needs_ocr(char_count: int, coverage: float) -> bool:
+    """Routing rule shared by all callers"""
+    if char_count < MIN_TEXT_CHARS:
+        return True
+    return coverage >= SCAN_IMAGE_COVERAGE and char_count < MIN_TEXT_CHARS_ON_SCAN
+
+
+def classify_pages(pdf_path: str) -> List[PageTextLayer]:
+    """
+    Classify every page of a PDF as text-layer or OCR
+
+    Only reads the content streams (no rendering), so it costs a few
+    milliseconds per page even on long records.
+
+    Args:
+        pdf_path: PDF file
+
+    Returns:
+        One PageTextLayer per page, in page order
+    """
+    layers = []
+    with fitz.open(pdf_path) as doc:
+        for index, page in enumerate(doc):
+            text = page.get_text("text")
+            char_count = sum(1 for char in text if not char.isspace())
+            coverage = image_coverage(page)
+            layers.append(PageTextLayer(
+                page_num=index + 1,
+                char_count=char_count,
+                image_coverage=coverage,
+                needs_ocr=needs_ocr(char_count, coverage)
+            ))
+
+    ocr_count = sum(layer.needs_ocr for layer in layers)
+    logger.debug(f"Classified {len(layers)} pages of {pdf_path}: "
+                 f"{len(layers) - ocr_count} text layer, {ocr_count} OCR")
+    return layers
+
+
+def extract_page_texts(pdf_path: str) -> List[str]:
+    """Text layer of every page, in page order (PyMuPDF extraction)"""
+    with fitz.open(pdf_path) as doc:
+        return [page.get_text("text") for page in doc]
@@ -9,11 +9,14 @@ import re
 import time
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-import pickle
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from glossary.compiled import GlossaryCacheError, glossary_sources, open_compiled_glossary
+
 # Load environment variables from .env file
 from pathlib import Path
 env_file = Path('.env')
@@ -36,7 +39,8 @@ except ImportError:
 class AIEnhancedMedicalTranslator:
     def __init__(self, glossary_dir: str = "data/glossaries", api_key: Optional[str] = None):
         self.glossary_dir = Path(glossary_dir)
-        self.cache_file = self.glossary_dir / "glossary_cache.pkl"
+        self.cache_file = self.glossary_dir / "glossary_cache.bin"
+        self.compiled_glossary = None
         
         # OpenAI setup
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
@@ -73,18 +77,18 @@ class AIEnhancedMedicalTranslator:
         }
     
     def load_optimized_glossaries(self):
-        """Load cached glossaries for performance"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'rb') as f:
-                    cache_data = pickle.load(f)
-                    self.critical_terms = cache_data.get('critical', {})
-                    self.common_terms = cache_data.get('common', {})
-                    print(f"✓ Loaded {len(self.critical_terms):,} critical terms")
-                    print(f"✓ Loaded {len(self.common_terms):,} common terms")
-                    return
-            except:
-                pass
+        """Load the compiled (memory-mapped) glossary cache for performance"""
+        try:
+            # Sources make a cache built from older CSVs count as stale
+            self.compiled_glossary = open_compiled_glossary(
+                self.cache_file, glossary_sources(self.glossary_dir))
+            self.critical_terms = self.compiled_glossary['critical']
+            self.common_terms = self.compiled_glossary['common']
+            print(f"✓ Loaded {len(self.critical_terms):,} critical terms")
+            print(f"✓ Loaded {len(self.common_terms):,} common terms")
+            return
+        except (GlossaryCacheError, KeyError) as e:
+            print(f"⚠ Glossary cache unavailable ({e}), loading CSV")
         
         # Load from CSV if no cache
         self._load_from_csv()
@@ -10,6 +10,7 @@ Combines multiple strategies for 90%+ accuracy:
 
 import csv
 import re
+import sys
 import requests
 import json
 from pathlib import Path
@@ -17,14 +18,19 @@ from typing import Dict, List, Tuple, Set, Optional
 import time
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from glossary.service import load_glossary
+from mt.sessions import DEFAULT_POOL_SIZE, pooled_session
+
 
 class HybridMedicalTranslator:
     """High-accuracy medical translator using multi-strategy approach"""
     
-    def __init__(self, libretranslate_url: str = "http://localhost:5000"):
+    def __init__(self, libretranslate_url: str = "http://localhost:5000",
+                 pool_size: int = DEFAULT_POOL_SIZE):
         self.api_url = libretranslate_url
-        self.glossary = {}
-        self.reverse_glossary = {}  # English to Spanish for validation
+        self.session = pooled_session(pool_size)  # Keep-alive, shared across threads
+        self.glossary = None
         self.critical_terms = set()
         self.medical_patterns = []
         
@@ -35,15 +41,8 @@ class HybridMedicalTranslator:
         self.test_libretranslate()
         
     def load_glossary(self, path: str = "data/glossaries/glossary_comprehensive.csv"):
-        """Load UMLS glossary with reverse mapping"""
-        with open(path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                es_term = row['es_term'].lower()
-                en_term = row['en_term']
-                self.glossary[es_term] = en_term
-                # Create reverse mapping for validation
-                self.reverse_glossary[en_term.lower()] = es_term
+        """Load UMLS glossary (from the glossary service when running)"""
+        self.glossary = load_glossary(path)
                 
         print(f"📚 Loaded {len(self.glossary)} medical terms from UMLS")
         
@@ -98,7 +97,7 @@ class HybridMedicalTranslator:
     def test_libretranslate(self):
         """Test LibreTranslate connection"""
         try:
-            response = requests.get(f"{self.api_url}/languages", timeout=2)
+            response = self.session.get(f"{self.api_url}/languages", timeout=2)
             if response.status_code == 200:
                 print("✅ LibreTranslate connected")
                 self.libretranslate_available = True
@@ -121,12 +120,10 @@ class HybridMedicalTranslator:
             for match in re.finditer(pattern, text, re.IGNORECASE):
                 entities[entity_type].append((match.group(), match.start(), match.end()))
                 
-        # Extract known medical terms from glossary
-        for es_term in self.glossary:
-            if len(es_term) > 3:  # Skip very short terms
-                pattern = r'\b' + re.escape(es_term) + r'\b'
-                for match in re.finditer(pattern, text, re.IGNORECASE):
-                    entities['MEDICAL_TERM'].append((match.group(), match.start(), match.end()))
+        # Extract known medical terms from glossary (single automaton pass)
+        for match in self.glossary.find_all(text):
+            if len(match.term) > 3:  # Skip very short terms
+                entities['MEDICAL_TERM'].append((text[match.start:match.end], match.start, match.end))
                     
         return entities
         
@@ -180,8 +177,9 @@ class HybridMedicalTranslator:
             return term
             
         # Check UMLS glossary first
-        if term_lower in self.glossary:
-            return self.glossary[term_lower]
+        glossary_term = self.glossary.get(term_lower)
+        if glossary_term is not None:
+            return glossary_term
             
         # Department/section translations
         departments = {
@@ -233,7 +231,7 @@ class HybridMedicalTranslator:
             
         try:
             # Translate with LibreTranslate
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/translate",
                 data={
                     'q': text,
@@ -5,23 +5,49 @@ High-performance translation with 1.2M term glossary
 """
 
 import re
+import sys
 import time
 import json
 from pathlib import Path
 from typing import Dict, List, Tuple, Set
 from collections import defaultdict
-import pickle
+
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from glossary.matcher import GlossaryMatcher, merge_tiers, apply_matches
+from glossary.compiled import (
+    GlossaryCacheError, glossary_sources, open_compiled_glossary, write_compiled_glossary
+)
+from glossary.service import GlossaryServiceError, RemoteGlossary, connect_service
 
 class OptimizedMedicalTranslator:
-    def __init__(self, glossary_dir: str = "data/glossaries"):
+    def __init__(self, glossary_dir: str = "data/glossaries", mmap_glossary: bool = True,
+                 use_service: bool = True):
+        """
+        Args:
+            glossary_dir: Directory with the glossary CSVs and compiled cache
+            mmap_glossary: Serve tiers straight from the memory-mapped cache
+                           (fast startup, pages shared between workers);
+                           False also compiles the critical and common
+                           tiers into Aho-Corasick automata, for long
+                           runs where per-line matching dominates
+            use_service: Match against the glossary service's automata
+                         when the service is running
+        """
         self.glossary_dir = Path(glossary_dir)
-        self.cache_file = self.glossary_dir / "glossary_cache.pkl"
+        self.cache_file = self.glossary_dir / "glossary_cache.bin"
+        self.mmap_glossary = mmap_glossary
+        self.use_service = use_service
+        self.compiled_glossary = None
         
         # Tiered glossary system for performance
         self.critical_terms = {}  # Priority 1: Critical medical terms
         self.common_terms = {}    # Priority 2: Common medical words
         self.full_glossary = {}   # Priority 3: Complete glossary
         
+        # Compiled matchers, built once the tiers are loaded
+        self.critical_matcher = GlossaryMatcher()
+        self.common_matcher = GlossaryMatcher()
+        
         # Pre-compiled patterns for efficiency
         self.number_pattern = re.compile(r'\b\d+[\d.,]*\b')
         self.dosage_pattern = re.compile(r'\b\d+\s*(?:mg|g|ml|cc|mcg|ug|UI|U)\b', re.IGNORECASE)
@@ -30,37 +56,42 @@ class OptimizedMedicalTranslator:
         self.load_optimized_glossaries()
     
     def load_optimized_glossaries(self):
-        """Load glossaries with caching and tiering"""
+        """Load glossaries from the compiled cache, rebuilding it when stale"""
         print("Loading optimized glossaries...")
         start = time.time()
+        sources = glossary_sources(self.glossary_dir)
         
         # Try to load from cache first
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'rb') as f:
-                    cache_data = pickle.load(f)
-                    self.critical_terms = cache_data['critical']
-                    self.common_terms = cache_data['common']
-                    self.full_glossary = cache_data['full']
-                    print(f"✓ Loaded from cache in {time.time()-start:.1f}s")
-                    self._print_stats()
-                    return
-            except:
-                print("Cache invalid, rebuilding...")
-        
-        # Build tiered glossaries
-        self._build_tiered_glossaries()
-        
-        # Save to cache
-        cache_data = {
-            'critical': self.critical_terms,
-            'common': self.common_terms,
-            'full': self.full_glossary
-        }
-        with open(self.cache_file, 'wb') as f:
-            pickle.dump(cache_data, f)
+        try:
+            self.compiled_glossary = open_compiled_glossary(self.cache_file, sources)
+            print(f"✓ Loaded from cache in {time.time()-start:.1f}s")
+        except GlossaryCacheError as e:
+            print(f"Cache invalid ({e}), rebuilding...")
+            
+            # Build tiered glossaries and compile them to the cache
+            self._build_tiered_glossaries()
+            write_compiled_glossary(self.cache_file, {
+                'critical': self.critical_terms,
+                'common': self.common_terms,
+                'full': self.full_glossary
+            }, sources)
+            self.compiled_glossary = open_compiled_glossary(self.cache_file, sources)
+            print(f"✓ Glossaries loaded in {time.time()-start:.1f}s")
+        
+        # Lookups go straight to the mapped file; no tier is copied into a dict
+        tiers = self.compiled_glossary.tiers
+        self.critical_terms = tiers['critical']
+        self.common_terms = tiers['common']
+        self.full_glossary = tiers['full']
+        if self.mmap_glossary:
+            self.critical_matcher = self.critical_terms
+            self.common_matcher = self.common_terms
+        else:
+            self._compile_matchers()
+        
+        if self.use_service:
+            self._connect_glossary_service()
         
-        print(f"✓ Glossaries loaded in {time.time()-start:.1f}s")
         self._print_stats()
     
     def _build_tiered_glossaries(self):
@@ -121,12 +152,32 @@ class OptimizedMedicalTranslator:
                         if es_term not in self.common_terms:
                             self.common_terms[es_term] = en_term
     
+    def _compile_matchers(self):
+        """Compile the critical and common tiers (the only ones matched) into glossary automata"""
+        self.critical_matcher = GlossaryMatcher(self.critical_terms)
+        self.common_matcher = GlossaryMatcher(self.common_terms)
+    
+    def _connect_glossary_service(self):
+        """Use the glossary service's automata for matching if it is running"""
+        client = connect_service()
+        if not client:
+            return
+        try:
+            critical = RemoteGlossary(client, str(self.cache_file), 'critical')
+            common = RemoteGlossary(client, str(self.cache_file), 'common')
+        except (GlossaryServiceError, OSError) as e:
+            print(f"⚠️  Glossary service unavailable ({e}), matching in-process")
+            return
+        self.critical_matcher = critical
+        self.common_matcher = common
+        print("✓ Using glossary service for term matching")
+    
     def _print_stats(self):
         """Print glossary statistics"""
         print(f"  Critical terms: {len(self.critical_terms):,}")
         print(f"  Common terms: {len(self.common_terms):,}")
         print(f"  Full glossary: {len(self.full_glossary):,}")
-        print(f"  Total unique: {len(set(self.critical_terms) | set(self.common_terms) | set(self.full_glossary)):,}")
+        print(f"  Total unique: {self.compiled_glossary.unique_terms:,}")
     
     def translate_line_optimized(self, line: str) -> Tuple[str, float]:
         """Translate a single line with optimized performance"""
@@ -155,32 +206,14 @@ class OptimizedMedicalTranslator:
         words = translated.lower().split()
         word_count = len(words)
         
-        # Phase 1: Translate critical terms (highest priority)
-        for es_term, en_term in self.critical_terms.items():
-            if es_term in translated.lower():
-                pattern = re.compile(r'\b' + re.escape(es_term) + r'\b', re.IGNORECASE)
-                if pattern.search(translated):
-                    translated = pattern.sub(en_term, translated)
-                    matches_found += 1
-        
-        # Phase 2: Translate common single words
-        translated_words = []
-        for word in translated.split():
-            # Skip placeholders
-            if word.startswith('__PRESERVE_') and word.endswith('__'):
-                translated_words.append(word)
-                continue
-                
-            word_lower = word.lower().strip('.,;:!?')
-            if word_lower in self.common_terms:
-                # Preserve original punctuation
-                prefix = word[:len(word) - len(word.lstrip('.,;:!?'))]
-                suffix = word[len(word.rstrip('.,;:!?')):]
-                translated_words.append(prefix + self.common_terms[word_lower] + suffix)
-                matches_found += 1
-            else:
-                translated_words.append(word)
-        translated = ' '.join(translated_words)
+        # Phase 1+2: Critical terms, then common terms in the remaining gaps
+        # (one automaton pass per tier, one rebuild of the line)
+        glossary_matches = merge_tiers(
+            self.critical_matcher.find_all(translated),
+            self.common_matcher.find_all(translated)
+        )
+        translated = apply_matches(translated, glossary_matches)
+        matches_found += len(glossary_matches)
         
         # Phase 3: Basic Spanish connectors (fast replacement)
         basic_replacements = [
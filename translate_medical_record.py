@@ -7,32 +7,39 @@ Translates the hospital billing and medical record
 import csv
 import re
 import os
+import sys
 from pathlib import Path
 from typing import Dict
 
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from glossary.matcher import GlossaryMatcher
+from glossary.service import load_glossary as load_glossary_service
 
-def load_glossary(path: str = "data/glossaries/glossary_comprehensive.csv") -> Dict[str, str]:
-    """Load enhanced UMLS glossary"""
-    glossary = {}
-    
+
+def load_glossary(path: str = "data/glossaries/glossary_comprehensive.csv"):
+    """Load enhanced UMLS glossary (from the glossary service when running)"""
     # Try comprehensive glossary first, fall back to production if not found
     if not Path(path).exists():
         path = "data/glossaries/glossary_es_en_production.csv"
         print(f"Using fallback glossary: {path}")
     
-    with open(path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            es_term = row['es_term'].lower()
-            en_term = row['en_term']
-            glossary[es_term] = en_term
+    glossary = load_glossary_service(path)
             
     print(f"Loaded {len(glossary)} medical terms")
     return glossary
 
 
-def translate_medical_document(text: str, glossary: Dict[str, str]) -> str:
-    """Translate medical document text"""
+def translate_medical_document(text: str, glossary) -> str:
+    """
+    Translate medical document text
+    
+    Args:
+        text: Spanish document text
+        glossary: Loaded glossary (GlossaryMatcher / RemoteGlossary) or
+                  a plain {es_term: en_term} dict
+    """
+    if isinstance(glossary, dict):
+        glossary = GlossaryMatcher(glossary)
     
     # Key translations for this document
     translations = {
@@ -164,13 +171,11 @@ def translate_medical_document(text: str, glossary: Dict[str, str]) -> str:
             translated = pattern.sub(english, translated)
             
         # Translate using glossary for medical terms
-        line_lower = translated.lower()
-        for es_term, en_term in glossary.items():
-            if es_term in line_lower and len(es_term) > 3:  # Skip very short terms
-                pattern = re.compile(r'\b' + re.escape(es_term) + r'\b', re.IGNORECASE)
-                if pattern.search(translated):
-                    translated = pattern.sub(en_term, translated)
-                    break  # One replacement per line to avoid over-translation
+        for match in glossary.find(translated):
+            if len(match.term) > 3:  # Skip very short terms
+                pattern = re.compile(r'\b' + re.escape(match.term) + r'\b', re.IGNORECASE)
+                translated = pattern.sub(match.value, translated)
+                break  # One replacement per line to avoid over-translation
                     
         # Basic word translations for remaining Spanish
         basic_words = {
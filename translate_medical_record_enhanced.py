@@ -6,24 +6,31 @@ Uses LibreTranslate API for neural translation with UMLS glossary enhancement
 
 import csv
 import re
+import sys
 import requests
 import json
 from pathlib import Path
 from typing import Dict, List, Optional
 import time
 
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from mt.sessions import DEFAULT_POOL_SIZE, pooled_session
+
 
 class EnhancedMedicalTranslator:
     """Enhanced translator using LibreTranslate + UMLS glossary"""
     
-    def __init__(self, libretranslate_url: str = "http://localhost:5000"):
+    def __init__(self, libretranslate_url: str = "http://localhost:5000",
+                 pool_size: int = DEFAULT_POOL_SIZE):
         """
         Initialize enhanced translator
         
         Args:
             libretranslate_url: URL where LibreTranslate is running
+            pool_size: Keep-alive connections to LibreTranslate
         """
         self.api_url = libretranslate_url
+        self.session = pooled_session(pool_size)
         self.glossary = {}
         self.load_glossary()
         
@@ -33,7 +40,7 @@ class EnhancedMedicalTranslator:
     def test_connection(self):
         """Test if LibreTranslate is accessible"""
         try:
-            response = requests.get(f"{self.api_url}/languages", timeout=5)
+            response = self.session.get(f"{self.api_url}/languages", timeout=5)
             if response.status_code == 200:
                 print("✅ LibreTranslate connected successfully")
                 languages = response.json()
@@ -114,7 +121,7 @@ class EnhancedMedicalTranslator:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/translate",
                 data=payload,
                 timeout=30
@@ -7,12 +7,17 @@ Works with minimal dependencies
 
 import csv
 import re
+import sys
 import json
 import subprocess
 from pathlib import Path
 from typing import Dict, List, Tuple
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from glossary.matcher import GlossaryMatcher, GlossaryMatch, apply_matches
+from glossary.service import load_glossary
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -21,7 +26,7 @@ class SimpleUMLSTranslator:
     """Simple translator using UMLS glossary"""
     
     def __init__(self, glossary_path: str = "data/glossaries/glossary_es_en_production.csv"):
-        self.glossary = {}
+        self.glossary = GlossaryMatcher()
         self.load_glossary(glossary_path)
         
         # Common medical abbreviations
@@ -73,17 +78,12 @@ class SimpleUMLSTranslator:
         }
         
     def load_glossary(self, path: str):
-        """Load UMLS glossary"""
+        """Load UMLS glossary (from the glossary service when running)"""
         if not Path(path).exists():
             logger.warning(f"Glossary not found at {path}")
             return
             
-        with open(path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                es_term = row['es_term'].lower()
-                en_term = row['en_term']
-                self.glossary[es_term] = en_term
+        self.glossary = load_glossary(path)
                 
         logger.info(f"Loaded {len(self.glossary)} glossary terms")
         
@@ -122,15 +122,12 @@ class SimpleUMLSTranslator:
             pattern = r'\b' + re.escape(abbrev) + r'\b'
             result = re.sub(pattern, translation, result, flags=re.IGNORECASE)
             
-        # Translate terms from glossary (longest first to handle phrases)
-        terms_to_translate = sorted(
-            [(term, trans) for term, trans in self.glossary.items() if term in result],
-            key=lambda x: -len(x[0])
-        )
-        
-        for es_term, en_term in terms_to_translate[:100]:  # Limit to avoid over-translation
-            if es_term in result:
-                result = result.replace(es_term, en_term.lower())
+        # Translate terms from glossary (one pass, longest match wins)
+        matches = [
+            GlossaryMatch(m.start, m.end, m.term, m.value.lower())
+            for m in self.glossary.find(result)[:100]  # Limit to avoid over-translation
+        ]
+        result = apply_matches(result, matches)
                 
         # Preserve numbers and measurements
         result = self.preserve_measurements(original, result)
@@ -233,22 +230,28 @@ class SimpleUMLSTranslator:
         words = text.split()
         translated_words = []
         
+        # Strip trailing punctuation for lookup
+        lookups = []
         for word in words:
-            # Preserve capitalization info
-            is_capitalized = word and word[0].isupper()
             word_lower = word.lower()
-            
-            # Remove punctuation for lookup
-            punct = ''
             if word_lower and word_lower[-1] in '.,;:!?':
-                punct = word_lower[-1]
                 word_lower = word_lower[:-1]
+            lookups.append(word_lower)
+        
+        # One batched glossary lookup for the words basic_dict doesn't cover
+        missing = sorted({w for w in lookups if w and w not in basic_dict})
+        found = dict(zip(missing, self.glossary.lookup_many(missing)))
+        
+        for word, word_lower in zip(words, lookups):
+            # Preserve capitalization info
+            is_capitalized = word and word[0].isupper()
+            punct = word[-1] if len(word_lower) < len(word) else ''
                 
             # Translate
             if word_lower in basic_dict:
                 translated = basic_dict[word_lower]
-            elif word_lower in self.glossary:
-                translated = self.glossary[word_lower]
+            elif found.get(word_lower) is not None:
+                translated = found[word_lower]
             else:
                 translated = word_lower  # Keep original if no translation
                 
@@ -352,7 +355,7 @@ def translate_medical_pdf(input_pdf: str, output_path: str, glossary_path: str):
     print(f"\n📊 Statistics:")
     print(f"  Spanish words: {spanish_words}")
     print(f"  English words: {english_words}")
-    print(f"  Glossary terms used: ~{len([t for t in translator.glossary if t in text.lower()])}")
+    print(f"  Glossary terms used: ~{len(set(m.term for m in translator.glossary.find(text)))}")
     
     return True
 